@@ -0,0 +1,45 @@
+# benchmarks/ast_codec.py
+"""
+Compares stored size and decode time of JSON and binary rule ASTs.
+
+Run from the backend directory:
+
+    python -m benchmarks.ast_codec --rules 10000
+"""
+import argparse
+import json
+import time
+
+from src.models import ast_codec
+from src.models.compact_node import CompactNode
+from benchmarks.ast_memory import rule_dicts
+
+
+def timed(label: str, decode, rows, nodes: int):
+    started = time.perf_counter()
+    for row in rows:
+        decode(row)
+    elapsed = time.perf_counter() - started
+    print(f"{label:34} {elapsed:7.3f}s  {elapsed / nodes * 1e6:6.2f} us/node")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rules", type=int, default=10000)
+    args = parser.parse_args()
+
+    dicts = rule_dicts(args.rules)
+    json_rows = [json.dumps(data) for data in dicts]
+    binary_rows = [ast_codec.encode(data) for data in dicts]
+    nodes = args.rules * 7
+    print(f"{args.rules} rules, 7 nodes each")
+    print(f"{'average row size':34} JSON {sum(map(len, json_rows)) / args.rules:6.0f} B, "
+          f"binary {sum(map(len, binary_rows)) / args.rules:4.0f} B")
+    timed("JSON -> CompactNode", lambda row: CompactNode.from_dict(json.loads(row)), json_rows, nodes)
+    timed("binary -> CompactNode", ast_codec.decode, binary_rows, nodes)
+    timed("JSON -> dict view", json.loads, json_rows, nodes)
+    timed("binary -> dict view", ast_codec.decode_dict, binary_rows, nodes)
+
+
+if __name__ == "__main__":
+    main()
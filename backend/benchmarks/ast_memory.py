@@ -0,0 +1,60 @@
+# benchmarks/ast_memory.py
+"""
+Compares memory use and construction time of ASTNode and CompactNode trees.
+
+Run from the backend directory:
+
+    python -m benchmarks.ast_memory --rules 100000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from src.models.ast_node import ASTNode
+from src.models.compact_node import CompactNode
+from src.services.rule_parser import RuleParser
+
+
+def rule_dicts(count: int):
+    parser = RuleParser()
+    return [
+        parser.parse_compact(
+            f"(age > {i % 90} AND department = 'D{i % 17}') OR (salary >= {i} AND experience < {i % 40})"
+        ).to_dict()
+        for i in range(count)
+    ]
+
+
+def measure(label: str, build, dicts):
+    # Timed and traced separately: tracemalloc slows allocation down a lot
+    gc.collect()
+    started = time.perf_counter()
+    trees = [build(data) for data in dicts]
+    elapsed = time.perf_counter() - started
+    del trees
+
+    gc.collect()
+    tracemalloc.start()
+    trees = [build(data) for data in dicts]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    nodes = len(trees) * 7
+    print(f"{label:12} {elapsed:7.2f}s  {elapsed / nodes * 1e6:6.2f} us/node  "
+          f"{size / 2 ** 20:8.1f} MiB  {size / nodes:6.0f} B/node")
+    return trees
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rules", type=int, default=100000)
+    args = parser.parse_args()
+
+    dicts = rule_dicts(args.rules)
+    print(f"{args.rules} rules, 7 nodes each")
+    measure("ASTNode", ASTNode.from_dict, dicts)
+    measure("CompactNode", CompactNode.from_dict, dicts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/connection_pool.py
+"""
+Measures SQLite read throughput under concurrent load for different numbers of
+read connections.
+
+Each run stores the rules, then keeps `--concurrency` tasks issuing queries for a
+fixed time, as concurrent API requests would: "lookup" mixes keyset pages and
+get_rules batches, "offset" asks for deep skip/limit pages, where SQLite itself
+does most of the work. With one reader every query queues on one aiosqlite thread.
+
+Run from the backend directory:
+
+    python -m benchmarks.connection_pool --readers 1 2 4 8
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from src.models.connection_pool import PoolConfig
+from src.models.database import SQLiteDatabase
+from src.models.rule import Rule
+from src.services.rule_parser import RuleParser
+
+
+async def run(path: str, readers: int, concurrency: int, seconds: float, rule_ids, mode: str) -> float:
+    db = SQLiteDatabase(path, PoolConfig(sqlite_readers=readers))
+    await db.connect()
+    queries = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client(seed: int):
+        nonlocal queries
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            if mode == "offset":
+                # Deep OFFSET pages: SQLite steps over every skipped row
+                await db.list_rules(skip=rng.randrange(len(rule_ids)), limit=10)
+            elif rng.random() < 0.5:
+                await db.list_rules(limit=100, after_id=rng.choice(rule_ids))
+            else:
+                await db.get_rules(rng.sample(rule_ids, 50))
+            queries += 1
+
+    try:
+        await asyncio.gather(*(client(seed) for seed in range(concurrency)))
+        stats = db.pool_stats()["read"]
+    finally:
+        await db.close()
+    print(f"{mode:6s} readers={readers:2d}  {queries / seconds:8.0f} queries/s  "
+          f"avg wait {stats['avg_wait_ms']:6.2f} ms  avg query {stats['avg_query_ms']:6.2f} ms")
+    return queries / seconds
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--readers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rules", type=int, default=5000)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--mode", choices=["lookup", "offset"], nargs="+", default=["lookup", "offset"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "rules.db")
+        db = SQLiteDatabase(path)
+        await db.connect()
+        rule_parser = RuleParser()
+        rules = [Rule(name=f"rule {index}", rule_string=f"age > {index % 60} AND salary < {index * 10}",
+                      ast=rule_parser.parse_compact(f"age > {index % 60} AND salary < {index * 10}").to_dict())
+                 for index in range(args.rules)]
+        rule_ids = [rule.id for rule in await db.create_rules(rules)]
+        await db.close()
+
+        for mode in args.mode:
+            for readers in args.readers:
+                await run(path, readers, args.concurrency, args.seconds, rule_ids, mode)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
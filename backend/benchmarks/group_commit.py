@@ -0,0 +1,68 @@
+# benchmarks/group_commit.py
+"""
+Measures SQLite rule creation throughput with and without group commit.
+
+`--concurrency` tasks each call create_rule in a loop for a fixed time, as
+concurrent POST /rules/ requests would. Without group commit every rule is its
+own transaction; with it, rules queued together share one commit.
+
+Run from the backend directory:
+
+    python -m benchmarks.group_commit --delays-ms 0 1 5
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from src.models.database import SQLiteDatabase
+from src.models.rule import Rule
+from src.services.rule_parser import RuleParser
+
+
+async def run(path: str, concurrency: int, seconds: float, max_batch: int, delay_ms) -> float:
+    db = SQLiteDatabase(path)
+    if delay_ms is not None:
+        db.enable_group_commit(max_batch, delay_ms / 1000)
+    await db.connect()
+    ast = RuleParser().parse_compact("age > 30 AND department = 'Sales'").to_dict()
+    created = 0
+    latencies = []
+    deadline = time.perf_counter() + seconds
+
+    async def client():
+        nonlocal created
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await db.create_rule(Rule(name="rule", rule_string="age > 30 AND department = 'Sales'", ast=ast))
+            latencies.append(time.perf_counter() - started)
+            created += 1
+
+    try:
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+    finally:
+        await db.close()
+    label = "off" if delay_ms is None else f"{delay_ms:g} ms"
+    latencies.sort()
+    print(f"group commit {label:7s} {created / seconds:8.0f} rules/s  "
+          f"p50 {1000 * latencies[len(latencies) // 2]:6.2f} ms  p99 {1000 * latencies[int(len(latencies) * 0.99)]:6.2f} ms")
+    return created / seconds
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--max-batch", type=int, default=128)
+    parser.add_argument("--delays-ms", type=float, nargs="+", default=[0, 1, 5])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for index, delay_ms in enumerate([None] + args.delays_ms):
+            path = os.path.join(directory, f"rules{index}.db")
+            await run(path, args.concurrency, args.seconds, args.max_batch, delay_ms)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
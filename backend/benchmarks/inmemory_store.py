@@ -0,0 +1,90 @@
+# benchmarks/inmemory_store.py
+"""
+Measures how long the in-memory store takes to boot from its snapshot compared
+with replaying the same rules from its log, and with reading them from SQLite.
+
+Run from the backend directory:
+
+    python -m benchmarks.inmemory_store --rules 50000
+"""
+import argparse
+import asyncio
+import gc
+import os
+import tempfile
+import time
+
+from src.models.database import SQLiteDatabase
+from src.models.inmemory_database import InMemoryDatabase
+from src.models.rule import Rule
+from src.services.rule_parser import RuleParser
+
+
+def abandon(db: InMemoryDatabase):
+    """Leaves a store without compacting, as a crash would; exiting would also release its lock"""
+    db._log.close()
+    db._log = None
+    db._lock_file.close()
+    db._lock_file = None
+
+
+async def timed_boot(label: str, open_database, read_all: bool):
+    # Collect what earlier runs left behind so it is not charged to this boot
+    gc.collect()
+    started = time.perf_counter()
+    db = open_database()
+    await db.connect()
+    booted = time.perf_counter()
+    if read_all:
+        count = sum([1 async for _ in db.iter_rules()])
+    else:
+        count = len(await db.get_rules([str(index) for index in range(1, 101)]))
+    finished = time.perf_counter()
+    await db.close()
+    print(f"{label:22s} boot {1000 * (booted - started):8.1f} ms  "
+          f"{'read all' if read_all else 'read 100'} {1000 * (finished - booted):8.1f} ms  ({count} rules)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rules", type=int, default=50000)
+    args = parser.parse_args()
+
+    rule_parser = RuleParser()
+    rules = [Rule(name=f"rule {index}", rule_string=f"age > {index % 60} AND salary < {index * 10}",
+                  ast=rule_parser.parse_compact(f"age > {index % 60} AND salary < {index * 10}").to_dict())
+             for index in range(args.rules)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = os.path.join(directory, "store")
+        sqlite_path = os.path.join(directory, "rules.db")
+
+        # A snapshot interval above the rule count keeps every write in the log
+        db = InMemoryDatabase(store, snapshot_every=args.rules + 1)
+        await db.connect()
+        await db.create_rules(rules)
+        abandon(db)
+
+        db = SQLiteDatabase(sqlite_path)
+        await db.connect()
+        await db.create_rules(rules)
+        await db.close()
+
+        for read_all in (False, True):
+            await timed_boot("inmemory, log replay", lambda: InMemoryDatabase(store, snapshot_every=args.rules + 1), read_all)
+            # The replay above compacted on close, so later boots start from the snapshot
+            await timed_boot("inmemory, snapshot", lambda: InMemoryDatabase(store), read_all)
+            await timed_boot("sqlite", lambda: SQLiteDatabase(sqlite_path), read_all)
+            if not read_all:
+                # Back to a log-only store for the second round
+                os.remove(os.path.join(store, "rules.snapshot"))
+                with open(os.path.join(store, "rules.log"), "wb"):
+                    pass
+                db = InMemoryDatabase(store, snapshot_every=args.rules + 1)
+                await db.connect()
+                await db.create_rules(rules)
+                abandon(db)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
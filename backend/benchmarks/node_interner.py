@@ -0,0 +1,76 @@
+# benchmarks/node_interner.py
+"""
+Measures hash-consing on rules that share clauses: node memory of a combined rule
+and per-record cost of evaluating the whole set, with and without interning.
+
+Run from the backend directory:
+
+    python -m benchmarks.node_interner --rules 5000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from src.models.node_interner import NodeInterner
+from src.services.rule_combiner import RuleCombiner
+from src.services.rule_parser import RuleParser
+from src.services.rule_set_evaluator import RuleSetEvaluator
+
+
+def shared_clause_rules(count: int, interner: NodeInterner = None):
+    # Every rule repeats one of 20 department clauses and one of 10 salary bands
+    parser = RuleParser()
+    rules = {}
+    for i in range(count):
+        ast = parser.parse_compact(
+            f"((department = 'D{i % 20}' AND age > 30) OR (salary >= {i % 10 * 10000} AND experience < 5))"
+            f" AND (experience > {i % 7} OR age < 25)"
+        )
+        rules[str(i)] = interner.intern(ast) if interner is not None else ast
+    return rules
+
+
+def traced(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rules", type=int, default=5000)
+    parser.add_argument("--records", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.rules} rules sharing clauses")
+    _, plain_size = traced(lambda: RuleCombiner().combine_rules(
+        list(shared_clause_rules(args.rules).values()), "OR"
+    ))
+    interner = NodeInterner()
+    _, interned_size = traced(lambda: RuleCombiner(interner).combine_rules(
+        list(shared_clause_rules(args.rules, interner).values()), "OR"
+    ))
+    print(f"combined    tree {plain_size / 2 ** 20:6.2f} MiB   dag {interned_size / 2 ** 20:6.2f} MiB "
+          f"(incl. intern table, {len(interner)} distinct nodes)")
+    del interner
+
+    rules = shared_clause_rules(args.rules)
+
+    records = [{"department": f"D{i % 25}", "age": 20 + i % 30, "salary": i * 700,
+                "experience": i % 9} for i in range(args.records)]
+    for label, evaluator in (("tree", RuleSetEvaluator(intern=False)), ("dag", RuleSetEvaluator())):
+        prepared = evaluator.prepare(rules)
+        started = time.perf_counter()
+        for record in records:
+            prepared.evaluate(record)
+        elapsed = time.perf_counter() - started
+        print(f"rule set {label:5} {elapsed / len(records) * 1e3:7.2f} ms/record  "
+              f"{prepared.predicate_count} predicates, {prepared.shared_count} memoized subtrees")
+
+
+if __name__ == "__main__":
+    main()
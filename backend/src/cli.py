@@ -0,0 +1,246 @@
+import argparse
+import asyncio
+import csv
+import io
+import json
+import mmap
+import os
+import sys
+import time
+from typing import Any, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from src.config import database_type, database_url
+from src.models.compact_node import CompactNode
+from src.services.rule_parser import RuleParser
+from src.services.rule_compiler import RuleCompiler
+from src.services.parallel_evaluator import ParallelEvaluator
+from src.utils.exceptions import RuleEngineException
+
+
+def load_stored_rule(rule_id: str, db_type: str, db_url: str) -> CompactNode:
+    """Loads a stored rule's AST from the configured database"""
+    from src.models.database import create_database
+
+    async def load():
+        db = create_database(db_type, db_url)
+        await db.connect()
+        try:
+            return await db.get_rule(rule_id)
+        finally:
+            await db.close()
+
+    rule = asyncio.run(load())
+    if not rule:
+        raise RuleEngineException(f"Rule with id {rule_id} not found")
+    return rule.compact_ast()
+
+
+def read_lines(path: str, use_mmap: bool) -> Iterator[str]:
+    """Streams the lines of a file, optionally through a memory map"""
+    if path == "-":
+        yield from sys.stdin
+        return
+    with open(path, "rb") as handle:
+        if use_mmap and os.fstat(handle.fileno()).st_size > 0:
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for line in iter(mapped.readline, b""):
+                    yield line.decode("utf-8")
+        else:
+            for line in io.TextIOWrapper(handle, encoding="utf-8", newline=""):
+                yield line
+
+
+def coerce(value: str) -> Any:
+    """Converts a CSV cell to int or float when it looks numeric"""
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class StreamEvaluator:
+    """Evaluates a rule over a JSONL or CSV stream chunk by chunk, with bounded memory"""
+
+    def __init__(self, ast: CompactNode, mode: str = "annotate", result_field: str = "result",
+                 error_field: str = "error", chunk_size: int = 10000,
+                 parallel: Optional[ParallelEvaluator] = None):
+        self.ast = ast
+        self.evaluate = RuleCompiler().compile(ast)
+        self.mode = mode
+        self.result_field = result_field
+        self.error_field = error_field
+        self.chunk_size = chunk_size
+        self.parallel = parallel
+        self.rows = 0
+        self.matched = 0
+        self.errors = 0
+
+    def _outcomes(self, records: List[Any]) -> List[Any]:
+        if self.parallel is not None:
+            return self.parallel.evaluate(self.ast, records, self.evaluate)
+        outcomes = []
+        for record in records:
+            try:
+                if not isinstance(record, dict):
+                    raise TypeError("Record must be a JSON object")
+                outcomes.append(self.evaluate(record))
+            except Exception as e:
+                outcomes.append({"error": str(e)})
+        return outcomes
+
+    def _count(self, outcome: Any):
+        self.rows += 1
+        if isinstance(outcome, dict):
+            self.errors += 1
+        elif outcome:
+            self.matched += 1
+
+    @staticmethod
+    def _parse_jsonl(lines: Iterable[str]) -> Iterator[Tuple[str, Any, Optional[dict]]]:
+        """Yields (line, record, parse error) for each non-blank line"""
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line, json.loads(line), None
+            except ValueError as e:
+                yield line, None, {"error": f"Invalid JSON on line {number}: {e}"}
+
+    def run_jsonl(self, lines: Iterable[str], output: TextIO):
+        for chunk in chunked(self._parse_jsonl(lines), self.chunk_size):
+            evaluated = iter(self._outcomes([record for _, record, error in chunk if error is None]))
+            out = []
+            for line, record, error in chunk:
+                outcome = error or next(evaluated)
+                self._count(outcome)
+                if self.mode == "filter":
+                    if outcome is True:
+                        out.append(line if line.endswith("\n") else line + "\n")
+                    continue
+                if not isinstance(record, dict):
+                    record = {}
+                if isinstance(outcome, dict):
+                    record[self.result_field] = None
+                    record[self.error_field] = outcome["error"]
+                else:
+                    record[self.result_field] = outcome
+                out.append(json.dumps(record) + "\n")
+            output.write("".join(out))
+
+    def run_csv(self, lines: Iterable[str], output: TextIO):
+        reader = csv.reader(lines)
+        header = next(reader, None)
+        if header is None:
+            return
+        writer = csv.writer(output)
+        if self.mode == "filter":
+            writer.writerow(header)
+        else:
+            writer.writerow(header + [self.result_field, self.error_field])
+
+        for chunk in chunked(reader, self.chunk_size):
+            records = [{name: coerce(cell) for name, cell in zip(header, row)} for row in chunk]
+            outcomes = self._outcomes(records)
+            out = []
+            for row, outcome in zip(chunk, outcomes):
+                self._count(outcome)
+                if self.mode == "filter":
+                    if outcome is True:
+                        out.append(row)
+                elif isinstance(outcome, dict):
+                    out.append(row + ["", outcome["error"]])
+                else:
+                    out.append(row + [str(outcome).lower(), ""])
+            writer.writerows(out)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="rule-engine-eval",
+        description="Evaluate a rule over a large JSONL or CSV file as a stream"
+    )
+    rule = parser.add_mutually_exclusive_group(required=True)
+    rule.add_argument("--rule", help="Rule string, e.g. \"age > 30 AND department = 'Sales'\"")
+    rule.add_argument("--rule-id", help="ID of a stored rule")
+    parser.add_argument("input", help="Input file (JSONL or CSV), or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="Output file, or - for stdout")
+    parser.add_argument("--format", choices=["jsonl", "csv"],
+                        help="Input format (default: from the file extension, else jsonl)")
+    parser.add_argument("--mode", choices=["annotate", "filter"], default="annotate",
+                        help="annotate: add a result column; filter: keep matching rows only")
+    parser.add_argument("--result-field", default="result")
+    parser.add_argument("--error-field", default="error")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows evaluated per chunk")
+    parser.add_argument("--mmap", action="store_true", help="Read the input through a memory map")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Evaluate chunks on a pool of this many processes")
+    parser.add_argument("--db-type", default=database_type())
+    parser.add_argument("--db-url", help="Connection string for --rule-id (default: from environment)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    try:
+        if args.rule:
+            ast = RuleParser().parse_compact(args.rule)
+        else:
+            db_url = args.db_url if args.db_url is not None else database_url(args.db_type)
+            ast = load_stored_rule(args.rule_id, args.db_type, db_url)
+    except (RuleEngineException, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    input_format = args.format or ("csv" if args.input.lower().endswith(".csv") else "jsonl")
+    parallel = None
+    if args.workers > 0:
+        parallel = ParallelEvaluator(max_workers=args.workers, chunk_size=max(args.chunk_size // args.workers, 1),
+                                     min_parallel_size=args.chunk_size // 2)
+    stream = StreamEvaluator(ast, args.mode, args.result_field, args.error_field,
+                             max(args.chunk_size, 1), parallel)
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    started = time.perf_counter()
+    try:
+        lines = read_lines(args.input, args.mmap)
+        if input_format == "csv":
+            stream.run_csv(lines, output)
+        else:
+            stream.run_jsonl(lines, output)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if parallel is not None:
+            parallel.shutdown()
+
+    elapsed = time.perf_counter() - started
+    rate = stream.rows / elapsed if elapsed > 0 else float("inf")
+    print(
+        f"{stream.rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec), "
+        f"{stream.matched} matched, {stream.errors} errors",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
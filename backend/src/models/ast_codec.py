@@ -0,0 +1,269 @@
+"""
+Versioned binary encoding of rule ASTs, shared by every database backend.
+
+Layout (version 1), all integers are unsigned LEB128 varints unless noted:
+
+    b"RA" version
+    string count, then each string as (byte length, UTF-8 bytes)
+    nodes in pre-order, each one:
+        header byte: bits 0-2 operator code, bits 3-4 node type code,
+                     bit 5 has left child, bit 6 has right child,
+                     bit 7 has field/value payload
+        payload:     field (0 for None, else string index + 1),
+                     value tag byte followed by the typed constant
+
+Field names and string constants are interned in the string table, so a
+name repeated across the tree is stored once. Value tags are None, int
+(zigzag varint), float (8-byte little-endian double), string (table index),
+False and True.
+
+`decode_legacy` reads the formats written before this codec existed: JSON
+text, nested documents, and the `str(dict)` text older SQLite rows hold.
+"""
+import ast as python_ast
+import json
+import re
+import struct
+from typing import Any, Dict, List, Union
+from .ast_node import ASTNode, NodeType, Operator
+from .compact_node import CompactNode
+
+MAGIC = b"RA"
+VERSION = 1
+
+_OPERATOR_CODES = {None: 0, Operator.AND: 1, Operator.OR: 2, Operator.GT: 3, Operator.LT: 4,
+                   Operator.EQ: 5, Operator.GTE: 6, Operator.LTE: 7}
+_CODE_OPERATORS = {code: operator for operator, code in _OPERATOR_CODES.items()}
+_TYPE_CODES = {NodeType.OPERATOR: 0, NodeType.COMPARISON: 1, NodeType.OPERAND: 2}
+_CODE_TYPES = {code: node_type for node_type, code in _TYPE_CODES.items()}
+
+_HAS_LEFT = 0x20
+_HAS_RIGHT = 0x40
+_HAS_PAYLOAD = 0x80
+
+_VALUE_NONE, _VALUE_INT, _VALUE_FLOAT, _VALUE_STR, _VALUE_FALSE, _VALUE_TRUE = range(6)
+
+_DOUBLE = struct.Struct("<d")
+
+# header byte -> (node type, operator), None for codes no encoder writes
+_HEADERS = [
+    (_CODE_TYPES[(header >> 3) & 0x3], _CODE_OPERATORS[header & 0x7])
+    if (header >> 3) & 0x3 in _CODE_TYPES else None
+    for header in range(256)
+]
+
+# "<NodeType.OPERATOR: 'operator'>" as written by str() of a dict holding enums
+_ENUM_REPR = re.compile(r"""<\w+\.\w+: ('[^']*'|"[^"]*")>""")
+
+AST = Union[CompactNode, ASTNode, Dict[str, Any]]
+
+
+class ASTCodecError(ValueError):
+    """Raised when a stored AST cannot be decoded"""
+
+
+def _write_varint(out: bytearray, value: int):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def encode(root: AST) -> bytes:
+    """
+    Encodes an AST in the current binary format
+
+    Args:
+        root: CompactNode, ASTNode or the dict form produced by to_dict
+
+    Returns:
+        bytes: Encoded AST
+    """
+    if isinstance(root, dict):
+        root = CompactNode.from_dict(root)
+
+    strings: Dict[str, int] = {}
+    body = bytearray()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        header = _OPERATOR_CODES[node.operator] | (_TYPE_CODES[node.type] << 3)
+        if node.left is not None:
+            header |= _HAS_LEFT
+        if node.right is not None:
+            header |= _HAS_RIGHT
+        field, value = node.field, node.value
+        if field is None and value is None:
+            body.append(header)
+        else:
+            body.append(header | _HAS_PAYLOAD)
+            _write_varint(body, 0 if field is None else strings.setdefault(field, len(strings)) + 1)
+            if value is None:
+                body.append(_VALUE_NONE)
+            elif value is True or value is False:
+                body.append(_VALUE_TRUE if value else _VALUE_FALSE)
+            elif isinstance(value, int):
+                body.append(_VALUE_INT)
+                _write_varint(body, value * 2 if value >= 0 else -value * 2 - 1)
+            elif isinstance(value, float):
+                body.append(_VALUE_FLOAT)
+                body += _DOUBLE.pack(value)
+            else:
+                body.append(_VALUE_STR)
+                _write_varint(body, strings.setdefault(str(value), len(strings)))
+        # Pre-order: the left subtree follows its parent, then the right one
+        if node.right is not None:
+            stack.append(node.right)
+        if node.left is not None:
+            stack.append(node.left)
+
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    _write_varint(out, len(strings))
+    for text in strings:
+        encoded = text.encode("utf-8")
+        _write_varint(out, len(encoded))
+        out += encoded
+    return bytes(out + body)
+
+
+def decode(data: bytes) -> CompactNode:
+    """Decodes a binary AST straight into CompactNodes"""
+    return _decode(data, False)
+
+
+def decode_dict(data: bytes) -> Dict[str, Any]:
+    """Decodes a binary AST into the dict layout of ASTNode.to_dict (the JSON view)"""
+    return _decode(data, True)
+
+
+def is_encoded(data: Any) -> bool:
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:2]) == MAGIC
+
+
+def decode_legacy(stored: Any) -> Dict[str, Any]:
+    """
+    Reads an AST stored before the binary format: a dict, JSON text or str(dict) text
+
+    Returns:
+        Dict[str, Any]: The AST in the dict layout of ASTNode.to_dict
+    """
+    if isinstance(stored, dict):
+        return stored
+    if isinstance(stored, (bytes, bytearray, memoryview)):
+        stored = bytes(stored).decode("utf-8")
+    if not isinstance(stored, str):
+        raise ASTCodecError(f"Unsupported stored AST of type {type(stored).__name__}")
+    try:
+        return json.loads(stored)
+    except json.JSONDecodeError:
+        pass
+    try:
+        # Python literal with enum reprs; literal_eval never executes code
+        value = python_ast.literal_eval(_ENUM_REPR.sub(r"\1", stored))
+    except (ValueError, SyntaxError) as e:
+        raise ASTCodecError(f"Unreadable stored AST: {e}")
+    if not isinstance(value, dict):
+        raise ASTCodecError("Stored AST is not an object")
+    return value
+
+
+def _decode(data: bytes, as_dict: bool) -> Any:
+    data = bytes(data)
+    if len(data) < 3 or data[:2] != MAGIC:
+        raise ASTCodecError("Not a binary AST")
+    if data[2] != VERSION:
+        raise ASTCodecError(f"Unsupported binary AST version {data[2]}")
+
+    try:
+        position = 3
+        count, position = _read_varint(data, position)
+        strings: List[str] = []
+        for _ in range(count):
+            length, position = _read_varint(data, position)
+            strings.append(data[position:position + length].decode("utf-8"))
+            position += length
+
+        root = None
+        # Child slots still to fill, in pre-order: (parent, is_left)
+        slots: List[Any] = []
+        end = len(data)
+        while position < end:
+            header = data[position]
+            position += 1
+            field = value = None
+            if header & _HAS_PAYLOAD:
+                index = data[position]
+                if index < 0x80:
+                    position += 1
+                else:
+                    index, position = _read_varint(data, position)
+                if index:
+                    field = strings[index - 1]
+                tag = data[position]
+                position += 1
+                if tag == _VALUE_STR:
+                    index = data[position]
+                    if index < 0x80:
+                        position += 1
+                    else:
+                        index, position = _read_varint(data, position)
+                    value = strings[index]
+                elif tag == _VALUE_INT:
+                    raw = data[position]
+                    if raw < 0x80:
+                        position += 1
+                    else:
+                        raw, position = _read_varint(data, position)
+                    value = raw >> 1 if not raw & 1 else -((raw + 1) >> 1)
+                elif tag == _VALUE_FLOAT:
+                    value = _DOUBLE.unpack_from(data, position)[0]
+                    position += 8
+                elif tag == _VALUE_TRUE:
+                    value = True
+                elif tag == _VALUE_FALSE:
+                    value = False
+                elif tag != _VALUE_NONE:
+                    raise ASTCodecError(f"Unknown value tag {tag}")
+
+            node_type, operator = _HEADERS[header]
+            if as_dict:
+                node = {"type": node_type, "operator": operator, "field": field, "value": value}
+            else:
+                node = CompactNode(node_type, operator, None, None, field, value)
+
+            if slots:
+                parent, is_left = slots.pop()
+                if as_dict:
+                    parent["left" if is_left else "right"] = node
+                elif is_left:
+                    parent.left = node
+                else:
+                    parent.right = node
+            elif root is None:
+                root = node
+            else:
+                raise ASTCodecError("Trailing data after binary AST")
+
+            if header & _HAS_RIGHT:
+                slots.append((node, False))
+            if header & _HAS_LEFT:
+                slots.append((node, True))
+    except (IndexError, TypeError, UnicodeDecodeError, struct.error) as e:
+        raise ASTCodecError(f"Corrupt binary AST: {e!r}")
+
+    if root is None or slots:
+        raise ASTCodecError("Truncated binary AST")
+    return root
+
+
+def _read_varint(data: bytes, position: int):
+    result = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, position
+        shift += 7
@@ -22,7 +22,7 @@ class ASTNode(BaseModel):
     left: Optional[Union['ASTNode', None]] = None
     right: Optional[Union['ASTNode', None]] = None
     field: Optional[str] = None
-    value: Optional[Union[str, int, float]] = None
+    value: Optional[Union[str, bool, int, float]] = None
 
     class Config:
         arbitrary_types_allowed = True
@@ -42,6 +42,8 @@ class ASTNode(BaseModel):
 
     @classmethod
     def from_dict(cls, data: Dict) -> 'ASTNode':
+        # Copy so the caller's dict (often a cached rule's AST) is left untouched
+        data = dict(data)
         if data.get("left"):
             data["left"] = cls.from_dict(data["left"])
         if data.get("right"):
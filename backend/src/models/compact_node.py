@@ -0,0 +1,135 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+from .ast_node import ASTNode, NodeType, Operator
+
+_NODE_TYPES = {node_type.value: node_type for node_type in NodeType}
+_OPERATORS = {operator.value: operator for operator in Operator}
+
+
+def _rebuild(root: Any, children: Callable[[Any], Tuple[Any, Any]],
+             build: Callable[[Any, Any, Any], Any]) -> Any:
+    """
+    Rebuilds a tree bottom-up without recursing on its depth
+
+    Args:
+        root: Root of the source tree
+        children: Returns the (left, right) children of a source node
+        build: Builds a target node from a source node and its converted children
+
+    Returns:
+        Any: Root of the rebuilt tree
+    """
+    # Reversed pre-order visits every child before its parent
+    order = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        for child in children(node):
+            if child is not None:
+                stack.append(child)
+
+    built: Dict[int, Any] = {}
+    for node in reversed(order):
+        left, right = children(node)
+        built[id(node)] = build(
+            node,
+            built[id(left)] if left is not None else None,
+            built[id(right)] if right is not None else None
+        )
+    return built[id(root)]
+
+
+def _node_children(node: Any) -> Tuple[Any, Any]:
+    return node.left, node.right
+
+
+def _dict_children(data: Dict) -> Tuple[Any, Any]:
+    return data.get("left") or None, data.get("right") or None
+
+
+class CompactNode:
+    """
+    Lightweight AST node used internally on the evaluation hot path.
+
+    Has the same attributes as ASTNode, so the evaluator, compiler and combiner
+    accept either, but it is a plain `__slots__` object: construction does no
+    validation and each node carries no per-instance dict or pydantic state.
+    ASTNode stays the representation at the API boundary; `from_ast`, `to_ast`,
+    `from_dict` and `to_dict` convert losslessly between the two.
+
+    Nodes held in caches are shared, so treat them as read-only.
+    """
+
+    __slots__ = ("type", "operator", "left", "right", "field", "value")
+
+    def __init__(self, type: NodeType, operator: Optional[Operator] = None,
+                 left: Optional["CompactNode"] = None, right: Optional["CompactNode"] = None,
+                 field: Optional[str] = None, value: Any = None):
+        self.type = type
+        self.operator = operator
+        self.left = left
+        self.right = right
+        self.field = field
+        self.value = value
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, CompactNode):
+            return NotImplemented
+        stack = [(self, other)]
+        while stack:
+            a, b = stack.pop()
+            if a is b:
+                continue
+            if a is None or b is None:
+                return False
+            if (a.type, a.operator, a.field, a.value) != (b.type, b.operator, b.field, b.value):
+                return False
+            stack.append((a.left, b.left))
+            stack.append((a.right, b.right))
+        return True
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        if self.type == NodeType.COMPARISON:
+            return f"CompactNode({self.field} {self.operator.value if self.operator else None} {self.value!r})"
+        return f"CompactNode({self.type.value}, {self.operator.value if self.operator else None})"
+
+    @classmethod
+    def from_ast(cls, ast: ASTNode) -> "CompactNode":
+        return _rebuild(ast, _node_children, lambda node, left, right: cls(
+            node.type, node.operator, left, right, node.field, node.value
+        ))
+
+    def to_ast(self) -> ASTNode:
+        return _rebuild(self, _node_children, lambda node, left, right: ASTNode(
+            type=node.type, operator=node.operator, left=left, right=right,
+            field=node.field, value=node.value
+        ))
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CompactNode":
+        """Builds a tree from the dict form produced by to_dict or ASTNode.to_dict"""
+        def build(item: Dict, left: Optional["CompactNode"], right: Optional["CompactNode"]) -> "CompactNode":
+            node_type = _NODE_TYPES.get(item["type"]) or NodeType(item["type"])
+            operator = item.get("operator")
+            if operator is not None:
+                operator = _OPERATORS.get(operator) or Operator(operator)
+            return cls(node_type, operator, left, right, item.get("field"), item.get("value"))
+        return _rebuild(data, _dict_children, build)
+
+    def to_dict(self) -> Dict:
+        """Same layout as ASTNode.to_dict"""
+        def build(node: "CompactNode", left: Optional[Dict], right: Optional[Dict]) -> Dict:
+            result = {
+                "type": node.type,
+                "operator": node.operator,
+                "field": node.field,
+                "value": node.value
+            }
+            if left is not None:
+                result["left"] = left
+            if right is not None:
+                result["right"] = right
+            return result
+        return _rebuild(self, _node_children, build)
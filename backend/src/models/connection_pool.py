@@ -0,0 +1,178 @@
+# src/models/connection_pool.py
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+import aiosqlite
+
+
+class PoolConfig:
+    """Connection pool settings shared by the SQL backends"""
+
+    def __init__(self, pool_size: int = 10, max_overflow: int = 10, pool_timeout: float = 30.0,
+                 pool_recycle: int = -1, statement_cache_size: Optional[int] = None,
+                 sqlite_readers: int = 4):
+        """
+        Args:
+            pool_size: Postgres connections kept open
+            max_overflow: Extra Postgres connections opened under load and closed when returned
+            pool_timeout: Seconds to wait for a free Postgres connection before failing
+            pool_recycle: Seconds after which a Postgres connection is replaced, -1 for never
+            statement_cache_size: Prepared statements cached per asyncpg connection, None
+                for the driver default (0 is needed behind pgbouncer in transaction mode)
+            sqlite_readers: Read connections next to the single SQLite writer
+        """
+        if sqlite_readers < 1:
+            raise ValueError("SQLite needs at least one read connection")
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.statement_cache_size = statement_cache_size
+        self.sqlite_readers = sqlite_readers
+
+    def engine_options(self, url: str) -> Dict[str, Any]:
+        """Keyword arguments for create_async_engine"""
+        if url.startswith("sqlite"):
+            # SQLAlchemy picks a pool suited to the SQLite file or memory database itself
+            return {}
+        options = {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_recycle": self.pool_recycle,
+            "pool_pre_ping": True,
+        }
+        if self.statement_cache_size is not None and "+asyncpg" in url:
+            options["connect_args"] = {"statement_cache_size": self.statement_cache_size}
+        return options
+
+
+class PoolStats:
+    """Counts and timings of connection checkouts and of the work done while holding them"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.waiting = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.max_query_seconds = 0.0
+
+    def record_wait(self, seconds: float):
+        self.checkouts += 1
+        self.wait_seconds += seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def record_query(self, seconds: float):
+        self.queries += 1
+        self.query_seconds += seconds
+        self.max_query_seconds = max(self.max_query_seconds, seconds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "waiting": self.waiting,
+            "avg_wait_ms": 1000 * self.wait_seconds / self.checkouts if self.checkouts else 0.0,
+            "max_wait_ms": 1000 * self.max_wait_seconds,
+            "queries": self.queries,
+            "avg_query_ms": 1000 * self.query_seconds / self.queries if self.queries else 0.0,
+            "max_query_ms": 1000 * self.max_query_seconds
+        }
+
+    @asynccontextmanager
+    async def checkout(self, acquire, release) -> AsyncIterator[Any]:
+        """Times waiting for `await acquire()` and the use of what it returns until `release(it)`"""
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            connection = await acquire()
+        finally:
+            self.waiting -= 1
+        acquired = time.perf_counter()
+        self.record_wait(acquired - started)
+        try:
+            yield connection
+        finally:
+            self.record_query(time.perf_counter() - acquired)
+            release(connection)
+
+
+class SQLitePool:
+    """
+    One write connection and a pool of read connections to a SQLite database in WAL mode.
+
+    Each aiosqlite connection runs its queries one at a time on its own thread, so a
+    single connection queues every request behind the others. In WAL mode readers
+    see the last committed state without blocking the writer or each other, so reads
+    spread over `readers` connections run concurrently while writes stay serialized
+    on the writer. An in-memory database cannot be shared between connections, so
+    there every read uses the writer.
+    """
+
+    def __init__(self, path: str, readers: int = 4):
+        self.path = path
+        self.readers = readers
+        self.writer: Optional[aiosqlite.Connection] = None
+        self._readers: List[aiosqlite.Connection] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._write_lock = asyncio.Lock()
+        self.read_stats = PoolStats()
+        self.write_stats = PoolStats()
+
+    @property
+    def shared(self) -> bool:
+        return self.path == ":memory:" or self.path.startswith("file::memory:")
+
+    async def open(self):
+        self.writer = await aiosqlite.connect(self.path)
+        if not self.shared:
+            async with self.writer.execute("PRAGMA journal_mode=WAL") as cursor:
+                await cursor.fetchone()
+        self._idle = asyncio.Queue()
+        if self.shared:
+            return
+        for _ in range(self.readers):
+            reader = await aiosqlite.connect(self.path)
+            # Readers never write; the pragma keeps a stray write from taking the lock
+            await reader.execute("PRAGMA query_only=ON")
+            self._readers.append(reader)
+            self._idle.put_nowait(reader)
+
+    async def close(self):
+        for reader in self._readers:
+            await reader.close()
+        self._readers = []
+        if self.writer is not None:
+            await self.writer.close()
+            self.writer = None
+
+    @asynccontextmanager
+    async def read(self) -> AsyncIterator[aiosqlite.Connection]:
+        """A connection for queries that do not write, seeing every committed write"""
+        if not self._readers:
+            async with self.read_stats.checkout(self._return_writer, lambda connection: None) as connection:
+                yield connection
+            return
+        async with self.read_stats.checkout(self._idle.get, self._idle.put_nowait) as connection:
+            yield connection
+
+    @asynccontextmanager
+    async def write(self) -> AsyncIterator[aiosqlite.Connection]:
+        """The write connection, held exclusively until the block exits"""
+        async with self.write_stats.checkout(self._write_lock.acquire,
+                                             lambda connection: self._write_lock.release()):
+            yield self.writer
+
+    async def _return_writer(self) -> aiosqlite.Connection:
+        return self.writer
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "journal_mode": "memory" if self.shared else "wal",
+            "readers": len(self._readers),
+            "idle_readers": self._idle.qsize() if self._idle is not None else 0,
+            "read": self.read_stats.to_dict(),
+            "write": self.write_stats.to_dict()
+        }
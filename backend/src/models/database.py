@@ -1,17 +1,48 @@
 # src/models/database.py
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
-from sqlalchemy import create_engine, Column, String, JSON, Integer
+import asyncio
+import time
+from datetime import datetime
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, List, Optional, Dict, Any, Callable, Set
+from sqlalchemy import create_engine, event, func, Column, String, JSON, Integer, LargeBinary, delete, inspect, select, text, update
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import OperationFailure
 import aiosqlite
 from bson import ObjectId
-from .rule import Rule
+from .rule import Rule, RuleChange, RuleMetadata, RuleSet
+from . import ast_codec
+from .compact_node import CompactNode
+from ..utils.exceptions import RuleVersionConflictError
+from .connection_pool import PoolConfig, PoolStats, SQLitePool
+from .group_commit import GroupCommitter
 import json
 from typing import Optional
 
+# Legacy rows are converted to the binary AST format in batches of this size
+MIGRATION_BATCH_SIZE = 1000
+
+# IDs per "IN (...)" query, below SQLite's default limit of 999 bound parameters
+# (and far below the 32767 asyncpg allows)
+ID_BATCH_SIZE = 900
+
+# Rules fetched per round trip while streaming every rule with iter_rules
+STREAM_BATCH_SIZE = 1000
+
+# Change feed entries fetched per poll
+CHANGE_BATCH_SIZE = 1000
+
+# prune_changes keeps this many of the newest change log entries by default
+CHANGE_LOG_RETENTION = 100000
+
+# Polls re-read this many entries before the last one seen: concurrent writers can
+# commit change log entries out of sequence order, and a late one must not be missed
+CHANGE_LOOKBACK = 100
+
 Base = declarative_base()
 
 class SQLRule(Base):
@@ -22,11 +53,114 @@ class SQLRule(Base):
     name = Column(String)
     description = Column(String)
     rule_string = Column(String)
-    ast = Column(JSON)
+    ast = Column(JSON(none_as_null=True))  # Legacy JSON AST, NULL once a row is migrated
+    ast_bin = Column(LargeBinary)  # AST in the binary format of ast_codec
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    meta = Column(JSON)  # RuleMetadata of the AST
+
+class SQLRuleChange(Base):
+    """SQLAlchemy model of the rule change log polled by watch_changes"""
+    __tablename__ = "rule_changes"
+
+    seq = Column(Integer, primary_key=True)
+    rule_id = Column(String, nullable=False)
+    version = Column(Integer)
+    operation = Column(String, nullable=False)
+
+class SQLRuleSet(Base):
+    """SQLAlchemy RuleSet model"""
+    __tablename__ = "rule_sets"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+    description = Column(String)
+    rule_ids = Column(JSON)
+    strategy = Column(String)
+
+def _rule_from_storage(ast_bin: Optional[bytes], legacy_ast: Any, **fields) -> Rule:
+    """Builds a Rule from a stored row, falling back to the legacy AST formats"""
+    if ast_bin is not None:
+        return Rule.from_storage(ast_bin, **fields)
+    return Rule(ast=ast_codec.decode_legacy(legacy_ast), **fields)
+
+def _migrated_ast(rule_id: Any, ast_bin: Optional[bytes], legacy_ast: Any) -> Optional[tuple]:
+    """
+    The binary AST and metadata for a row written before either was stored, None
+    for a row whose AST cannot be read, which is left as it is
+    """
+    try:
+        if ast_bin is None:
+            ast = CompactNode.from_dict(ast_codec.decode_legacy(legacy_ast))
+            ast_bin = ast_codec.encode(ast)
+        else:
+            ast = ast_codec.decode(ast_bin)
+    except (KeyError, TypeError, ValueError) as e:
+        # ASTCodecError is a ValueError; KeyError and TypeError come from malformed dicts
+        print(f"Skipping rule {rule_id} with an unreadable stored AST: {e!r}")
+        return None
+    return ast_bin, RuleMetadata.from_ast(ast, ast_bin).model_dump()
+
+def _integer_id(rule_id: str) -> Optional[int]:
+    """The SQL key for a rule ID, None when the ID cannot match a row"""
+    try:
+        return int(rule_id)
+    except (TypeError, ValueError):
+        return None
+
+def _version_conflict(rule_id: str, expected_version: int, current_version: int) -> RuleVersionConflictError:
+    return RuleVersionConflictError(
+        f"Rule {rule_id} is at version {current_version}, not {expected_version}", current_version
+    )
+
+def _after_key(after_id: str) -> int:
+    """The SQL key to page after; raises ValueError for an ID no row can have"""
+    key = _integer_id(after_id)
+    if key is None:
+        raise ValueError(f"Invalid rule id: {after_id}")
+    return key
 
 class DatabaseInterface(ABC):
     """Abstract base class for database implementations"""
     
+    # Backends whose create_rule goes through the group committer once it is enabled
+    supports_group_commit = False
+    
+    def __init__(self):
+        self._change_listeners: List[Callable[[str], None]] = []
+        self.group_committer: Optional[GroupCommitter] = None
+    
+    def add_change_listener(self, listener: Callable[[str], None]):
+        """Registers a callback invoked with the rule ID whenever a rule changes"""
+        self._change_listeners.append(listener)
+    
+    def remove_change_listener(self, listener: Callable[[str], None]):
+        self._change_listeners.remove(listener)
+    
+    def _notify_change(self, rule_id: str):
+        for listener in list(self._change_listeners):
+            listener(rule_id)
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool size, wait and query latency statistics, if the backend keeps them"""
+        return {}
+    
+    def enable_group_commit(self, max_batch: int = 128, max_delay: float = 0.002):
+        """
+        Makes concurrent create_rule calls share transactions, see GroupCommitter
+        for the latency and durability trade-off
+        
+        Raises:
+            NotImplementedError: If the backend does not support group commit
+        """
+        if not self.supports_group_commit:
+            raise NotImplementedError(f"{type(self).__name__} does not support group commit")
+        self.group_committer = GroupCommitter(self.create_rules, max_batch, max_delay)
+    
+    def _group_commit_stats(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        if self.group_committer is not None:
+            stats["group_commit"] = self.group_committer.stats()
+        return stats
+    
     @abstractmethod
     async def connect(self):
         pass
@@ -39,202 +173,983 @@ class DatabaseInterface(ABC):
     async def create_rule(self, rule: Rule) -> Rule:
         pass
     
+    @abstractmethod
+    async def create_rules(self, rules: List[Rule]) -> List[Rule]:
+        """Inserts many rules with one batched write and sets their IDs, in order"""
+        pass
+    
     @abstractmethod
     async def get_rule(self, rule_id: str) -> Optional[Rule]:
         pass
     
     @abstractmethod
-    async def list_rules(self, skip: int = 0, limit: int = 100) -> List[Rule]:
+    async def get_rules(self, rule_ids: List[str]) -> List[Optional[Rule]]:
+        """
+        Fetches many rules in one round trip
+
+        Returns:
+            List[Optional[Rule]]: One entry per requested ID, in request order, None
+            where the ID does not exist or is not a valid ID for the backend
+        """
+        pass
+    
+    @abstractmethod
+    async def list_rules(self, skip: int = 0, limit: int = 100,
+                         after_id: Optional[str] = None) -> List[Rule]:
+        """
+        Lists rules in ID order
+
+        With after_id, the page starts right after that rule using the ID index
+        (keyset pagination), so deep pages cost the same as the first one.
+
+        Raises:
+            ValueError: If after_id is not a valid ID for the backend
+        """
+        pass
+    
+    @abstractmethod
+    def iter_rules(self, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[Rule]:
+        """Yields every rule in ID order from a server-side cursor, batch_size rows at a time"""
+        pass
+    
+    @abstractmethod
+    async def update_rule(self, rule_id: str, rule: Rule,
+                          expected_version: Optional[int] = None) -> Optional[Rule]:
+        """
+        Replaces a rule's name, description, rule string and AST and bumps its version
+
+        Returns:
+            Optional[Rule]: The rule with its ID and new version set, None if no rule has the ID
+
+        Raises:
+            RuleVersionConflictError: If expected_version is given and the rule is at another version
+        """
+        pass
+    
+    @abstractmethod
+    async def delete_rule(self, rule_id: str) -> bool:
+        """Deletes a rule; returns False if it did not exist"""
+        pass
+    
+    @abstractmethod
+    async def changes_since(self, seq: int, limit: int = CHANGE_BATCH_SIZE) -> List[RuleChange]:
+        """Entries of the change log with a sequence number above seq, oldest first"""
+        pass
+    
+    @abstractmethod
+    async def latest_change_seq(self) -> int:
+        """Sequence number of the newest change log entry, 0 when there is none"""
+        pass
+    
+    @abstractmethod
+    async def prune_changes(self, keep: int = CHANGE_LOG_RETENTION) -> int:
+        """Deletes all but the newest `keep` change log entries; returns how many were deleted"""
+        pass
+    
+    async def watch_changes(self, poll_interval: float = 1.0) -> AsyncIterator[RuleChange]:
+        """
+        Yields every rule change made from now on, by this or any other process
+
+        Every create, update and delete appends to a change log, which is polled
+        every poll_interval seconds. The entry is committed in the same transaction
+        as the write, except on MongoDB servers without transactions (see
+        MongoDBDatabase). Entries committed more than CHANGE_LOOKBACK positions out
+        of order would be missed, and so would entries pruned by prune_changes
+        before a lagging watcher read them.
+        """
+        seq = floor = await self.latest_change_seq()
+        seen: Set[int] = set()
+        while True:
+            changes = await self.changes_since(max(seq - CHANGE_LOOKBACK, floor))
+            for change in changes:
+                if change.seq in seen:
+                    continue
+                seen.add(change.seq)
+                seq = max(seq, change.seq)
+                yield change
+            seen = {entry for entry in seen if entry > seq - CHANGE_LOOKBACK}
+            if len(changes) < CHANGE_BATCH_SIZE:
+                await asyncio.sleep(poll_interval)
+    
+    @abstractmethod
+    async def create_rule_set(self, rule_set: RuleSet) -> RuleSet:
+        """Stores a named combination of rules and sets its ID"""
+        pass
+    
+    @abstractmethod
+    async def get_rule_set(self, rule_set_id: str) -> Optional[RuleSet]:
+        pass
+    
+    @abstractmethod
+    async def list_rule_sets(self, skip: int = 0, limit: int = 100) -> List[RuleSet]:
+        pass
+    
+    @abstractmethod
+    async def delete_rule_set(self, rule_set_id: str) -> bool:
+        """Deletes a rule set; returns False if it did not exist"""
         pass
 
 class MongoDBDatabase(DatabaseInterface):
     """MongoDB implementation"""
     
     def __init__(self, url: str):
+        super().__init__()
         self.url = url
         self.client = None
         self.db = None
+        # Replica sets and sharded clusters commit a write and its change log entries together
+        self.transactions = False
     
     async def connect(self):
         self.client = AsyncIOMotorClient(self.url)
         self.db = self.client.rule_engine
+        hello = await self.client.admin.command("hello")
+        self.transactions = "setName" in hello or hello.get("msg") == "isdbgrid"
+        await self._migrate_ast_storage()
+        await self.db.rules.update_many({"version": {"$exists": False}}, {"$set": {"version": 1}})
+    
+    async def _migrate_ast_storage(self):
+        """
+        Rewrites documents holding a nested AST document into the binary format, and
+        adds the metadata to documents written before it was stored
+        """
+        batch = []
+        async for document in self.db.rules.find({"metadata": {"$exists": False}}, {"ast": 1, "ast_bin": 1}):
+            migrated = _migrated_ast(document["_id"], document.get("ast_bin"), document.get("ast"))
+            if migrated is None:
+                continue
+            ast_bin, metadata = migrated
+            batch.append(UpdateOne(
+                {"_id": document["_id"]},
+                {"$set": {"ast_bin": ast_bin, "metadata": metadata}, "$unset": {"ast": ""}}
+            ))
+            if len(batch) >= MIGRATION_BATCH_SIZE:
+                await self.db.rules.bulk_write(batch, ordered=False)
+                batch = []
+        if batch:
+            await self.db.rules.bulk_write(batch, ordered=False)
+    
+    @staticmethod
+    def _to_document(rule: Rule) -> Dict[str, Any]:
+        ast_bin = rule.encode_ast()
+        document = rule.dict(exclude={'id', 'ast'})
+        document['ast_bin'] = ast_bin
+        return document
+    
+    @staticmethod
+    def _from_document(document: Dict[str, Any]) -> Rule:
+        document['id'] = str(document.pop('_id'))
+        return _rule_from_storage(document.pop('ast_bin', None), document.pop('ast', None), **document)
     
     async def close(self):
         if self.client:
             self.client.close()
     
+    async def _transaction(self, write: Callable[[Any], Awaitable[Any]]) -> Any:
+        """
+        Runs write(session) in a transaction, retried on transient errors, so that a
+        rule write and its change log entries commit together. A standalone server has
+        no transactions: write then runs without a session, and a crash between the
+        two writes loses the change log entry
+        """
+        if not self.transactions:
+            return await write(None)
+        async with await self.client.start_session() as session:
+            return await session.with_transaction(write)
+    
+    async def _next_change_seqs(self, count: int, session: Any = None) -> int:
+        """Reserves count change log sequence numbers and returns the first"""
+        counter = await self.db.counters.find_one_and_update(
+            {"_id": "rule_changes"}, {"$inc": {"seq": count}},
+            upsert=True, return_document=ReturnDocument.AFTER, session=session
+        )
+        return counter["seq"] - count + 1
+    
+    async def _log_changes(self, changes: List[tuple], session: Any = None):
+        """Appends (rule ID, version, operation) entries to the change log"""
+        first = await self._next_change_seqs(len(changes), session)
+        await self.db.rule_changes.insert_many([
+            {"_id": first + offset, "rule_id": rule_id, "version": version, "operation": operation}
+            for offset, (rule_id, version, operation) in enumerate(changes)
+        ], session=session)
+    
     async def create_rule(self, rule: Rule) -> Rule:
-        result = await self.db.rules.insert_one(rule.dict(exclude={'id'}))
-        rule.id = str(result.inserted_id)
+        rule.version = 1
+        document = self._to_document(rule)
+        
+        async def write(session):
+            result = await self.db.rules.insert_one(document, session=session)
+            await self._log_changes([(str(result.inserted_id), 1, "create")], session)
+            return result.inserted_id
+        rule.id = str(await self._transaction(write))
+        self._notify_change(rule.id)
         return rule
     
+    async def create_rules(self, rules: List[Rule]) -> List[Rule]:
+        if not rules:
+            return rules
+        for rule in rules:
+            rule.version = 1
+        documents = [self._to_document(rule) for rule in rules]
+        
+        async def write(session):
+            result = await self.db.rules.insert_many(documents, ordered=True, session=session)
+            await self._log_changes([(str(inserted_id), 1, "create") for inserted_id in result.inserted_ids], session)
+            return result.inserted_ids
+        for rule, inserted_id in zip(rules, await self._transaction(write)):
+            rule.id = str(inserted_id)
+        for rule in rules:
+            self._notify_change(rule.id)
+        return rules
+    
     async def get_rule(self, rule_id: str) -> Optional[Rule]:
         rule_dict = await self.db.rules.find_one({"_id": ObjectId(rule_id)})
         if rule_dict:
-            rule_dict['id'] = str(rule_dict.pop('_id'))
-            return Rule(**rule_dict)
+            return self._from_document(rule_dict)
         return None
     
-    async def list_rules(self, skip: int = 0, limit: int = 100) -> List[Rule]:
+    async def get_rules(self, rule_ids: List[str]) -> List[Optional[Rule]]:
+        keys = [ObjectId(rule_id) if ObjectId.is_valid(rule_id) else None for rule_id in rule_ids]
+        object_ids = list(dict.fromkeys(key for key in keys if key is not None))
+        found: Dict[ObjectId, Rule] = {}
+        if object_ids:
+            async for rule_dict in self.db.rules.find({"_id": {"$in": object_ids}}):
+                found[rule_dict["_id"]] = self._from_document(rule_dict)
+        return [found.get(key) for key in keys]
+    
+    async def list_rules(self, skip: int = 0, limit: int = 100,
+                         after_id: Optional[str] = None) -> List[Rule]:
+        query = {}
+        if after_id is not None:
+            if not ObjectId.is_valid(after_id):
+                raise ValueError(f"Invalid rule id: {after_id}")
+            query["_id"] = {"$gt": ObjectId(after_id)}
         rules = []
-        cursor = self.db.rules.find().skip(skip).limit(limit)
+        cursor = self.db.rules.find(query).sort("_id").skip(skip).limit(limit)
         async for rule_dict in cursor:
-            rule_dict['id'] = str(rule_dict.pop('_id'))
-            rules.append(Rule(**rule_dict))
+            rules.append(self._from_document(rule_dict))
         return rules
+    
+    async def iter_rules(self, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[Rule]:
+        async for rule_dict in self.db.rules.find().sort("_id").batch_size(batch_size):
+            yield self._from_document(rule_dict)
+    
+    async def update_rule(self, rule_id: str, rule: Rule,
+                          expected_version: Optional[int] = None) -> Optional[Rule]:
+        if not ObjectId.is_valid(rule_id):
+            return None
+        query: Dict[str, Any] = {"_id": ObjectId(rule_id)}
+        if expected_version is not None:
+            query["version"] = expected_version
+        document = self._to_document(rule)
+        for field in ("version", "created_at"):
+            document.pop(field, None)
+        document["updated_at"] = datetime.utcnow()
+        
+        async def write(session):
+            updated = await self.db.rules.find_one_and_update(
+                query, {"$set": document, "$inc": {"version": 1}},
+                projection={"version": 1}, return_document=ReturnDocument.AFTER, session=session
+            )
+            if updated is not None:
+                await self._log_changes([(rule_id, updated["version"], "update")], session)
+            return updated
+        updated = await self._transaction(write)
+        if updated is None:
+            current = await self.db.rules.find_one({"_id": ObjectId(rule_id)}, {"version": 1})
+            if current is None:
+                return None
+            raise _version_conflict(rule_id, expected_version, current["version"])
+        rule.id = rule_id
+        rule.version = updated["version"]
+        self._notify_change(rule_id)
+        return rule
+    
+    async def delete_rule(self, rule_id: str) -> bool:
+        if not ObjectId.is_valid(rule_id):
+            return False
+        
+        async def write(session):
+            deleted = await self.db.rules.find_one_and_delete(
+                {"_id": ObjectId(rule_id)}, projection={"version": 1}, session=session
+            )
+            if deleted is not None:
+                await self._log_changes([(rule_id, deleted.get("version"), "delete")], session)
+            return deleted
+        if await self._transaction(write) is None:
+            return False
+        self._notify_change(rule_id)
+        return True
+    
+    @staticmethod
+    def _change_from_document(document: Dict[str, Any]) -> RuleChange:
+        return RuleChange(seq=document["_id"], rule_id=document["rule_id"],
+                          version=document.get("version"), operation=document["operation"])
+    
+    async def changes_since(self, seq: int, limit: int = CHANGE_BATCH_SIZE) -> List[RuleChange]:
+        cursor = self.db.rule_changes.find({"_id": {"$gt": seq}}).sort("_id").limit(limit)
+        return [self._change_from_document(document) async for document in cursor]
+    
+    async def latest_change_seq(self) -> int:
+        document = await self.db.rule_changes.find_one(sort=[("_id", -1)])
+        return document["_id"] if document else 0
+    
+    async def prune_changes(self, keep: int = CHANGE_LOG_RETENTION) -> int:
+        result = await self.db.rule_changes.delete_many({"_id": {"$lte": await self.latest_change_seq() - keep}})
+        return result.deleted_count
+    
+    async def watch_changes(self, poll_interval: float = 1.0) -> AsyncIterator[RuleChange]:
+        """Follows the change log with a change stream, or polls it on servers without one"""
+        try:
+            async with self.db.rule_changes.watch([{"$match": {"operationType": "insert"}}]) as stream:
+                async for event in stream:
+                    yield self._change_from_document(event["fullDocument"])
+        except OperationFailure:
+            # Change streams need a replica set or sharded cluster
+            async for change in super().watch_changes(poll_interval):
+                yield change
+    
+    @staticmethod
+    def _from_rule_set_document(document: Dict[str, Any]) -> RuleSet:
+        document['id'] = str(document.pop('_id'))
+        return RuleSet(**document)
+    
+    async def create_rule_set(self, rule_set: RuleSet) -> RuleSet:
+        result = await self.db.rule_sets.insert_one(rule_set.dict(exclude={'id'}))
+        rule_set.id = str(result.inserted_id)
+        return rule_set
+    
+    async def get_rule_set(self, rule_set_id: str) -> Optional[RuleSet]:
+        if not ObjectId.is_valid(rule_set_id):
+            return None
+        document = await self.db.rule_sets.find_one({"_id": ObjectId(rule_set_id)})
+        return self._from_rule_set_document(document) if document else None
+    
+    async def list_rule_sets(self, skip: int = 0, limit: int = 100) -> List[RuleSet]:
+        cursor = self.db.rule_sets.find().sort("_id").skip(skip).limit(limit)
+        return [self._from_rule_set_document(document) async for document in cursor]
+    
+    async def delete_rule_set(self, rule_set_id: str) -> bool:
+        if not ObjectId.is_valid(rule_set_id):
+            return False
+        result = await self.db.rule_sets.delete_one({"_id": ObjectId(rule_set_id)})
+        return result.deleted_count > 0
 
 class PostgresDatabase(DatabaseInterface):
     """PostgreSQL implementation using SQLAlchemy"""
     
-    def __init__(self, url: str):
+    supports_group_commit = True
+    
+    def __init__(self, url: str, pool_config: Optional[PoolConfig] = None):
+        super().__init__()
         self.url = url
+        self.pool_config = pool_config or PoolConfig()
         self.engine = None
         self.session_factory = None
+        self.checkout_stats = PoolStats()
+        self.query_stats = PoolStats()
     
     async def connect(self):
-        self.engine = create_async_engine(self.url)
+        self.engine = create_async_engine(self.url, **self.pool_config.engine_options(self.url))
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self._before_execute)
+        event.listen(self.engine.sync_engine, "after_cursor_execute", self._after_execute)
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            columns = await conn.run_sync(
+                lambda sync_conn: {column["name"] for column in inspect(sync_conn).get_columns("rules")}
+            )
+            if "ast_bin" not in columns:
+                binary_type = LargeBinary().compile(dialect=conn.dialect)
+                await conn.execute(text(f"ALTER TABLE rules ADD COLUMN ast_bin {binary_type}"))
+            if "version" not in columns:
+                await conn.execute(text("ALTER TABLE rules ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+            if "meta" not in columns:
+                await conn.execute(text(f"ALTER TABLE rules ADD COLUMN meta {JSON().compile(dialect=conn.dialect)}"))
         self.session_factory = sessionmaker(
             self.engine, class_=AsyncSession, expire_on_commit=False
         )
+        await self._migrate_ast_storage()
+    
+    @staticmethod
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+    
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.query_stats.record_query(time.perf_counter() - context._query_started)
+    
+    @asynccontextmanager
+    async def _session(self):
+        """A session with its pooled connection already checked out, timing the wait"""
+        async with self.session_factory() as session:
+            async with self.checkout_stats.checkout(session.connection, lambda connection: None):
+                yield session
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        pool = self.engine.pool if self.engine else None
+        checkouts = self.checkout_stats.to_dict()
+        queries = self.query_stats.to_dict()
+        return self._group_commit_stats({
+            "pool": pool.status() if pool is not None else None,
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+            "checkouts": checkouts["checkouts"],
+            "waiting": checkouts["waiting"],
+            "avg_wait_ms": checkouts["avg_wait_ms"],
+            "max_wait_ms": checkouts["max_wait_ms"],
+            "queries": queries["queries"],
+            "avg_query_ms": queries["avg_query_ms"],
+            "max_query_ms": queries["max_query_ms"]
+        })
+    
+    async def _migrate_ast_storage(self):
+        """
+        Rewrites rows that only hold the legacy JSON AST into the binary format, and
+        fills in the metadata of rows written before it was stored
+        """
+        # Walks the keys in order, since unreadable rows keep their NULL metadata
+        last_id = 0
+        async with self._session() as session:
+            while True:
+                rows = (await session.execute(
+                    select(SQLRule.id, SQLRule.ast_bin, SQLRule.ast)
+                    .where(SQLRule.meta.is_(None), SQLRule.id > last_id)
+                    .order_by(SQLRule.id)
+                    .limit(MIGRATION_BATCH_SIZE)
+                )).all()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                updates = []
+                for rule_id, ast_bin, ast in rows:
+                    migrated = _migrated_ast(rule_id, ast_bin, ast)
+                    if migrated is not None:
+                        ast_bin, metadata = migrated
+                        updates.append({"id": rule_id, "ast": None, "ast_bin": ast_bin, "meta": metadata})
+                if updates:
+                    await session.execute(update(SQLRule), updates)
+                    await session.commit()
+    
+    @staticmethod
+    def _to_sql_rule(rule: Rule) -> SQLRule:
+        return SQLRule(
+            name=rule.name,
+            description=rule.description,
+            rule_string=rule.rule_string,
+            ast_bin=rule.encode_ast(),
+            meta=rule.metadata.model_dump()
+        )
+    
+    @staticmethod
+    def _from_sql_rule(sql_rule: SQLRule) -> Rule:
+        return _rule_from_storage(
+            sql_rule.ast_bin,
+            sql_rule.ast,
+            id=str(sql_rule.id),
+            name=sql_rule.name,
+            description=sql_rule.description,
+            rule_string=sql_rule.rule_string,
+            version=sql_rule.version,
+            metadata=sql_rule.meta
+        )
     
     async def close(self):
+        if self.group_committer is not None:
+            await self.group_committer.close()
         if self.engine:
             await self.engine.dispose()
     
     async def create_rule(self, rule: Rule) -> Rule:
-        async with self.session_factory() as session:
-            sql_rule = SQLRule(
-                name=rule.name,
-                description=rule.description,
-                rule_string=rule.rule_string,
-                ast=rule.ast
-            )
+        if self.group_committer is not None:
+            return await self.group_committer.submit(rule)
+        async with self._session() as session:
+            sql_rule = self._to_sql_rule(rule)
             session.add(sql_rule)
-            await session.commit()
+            await session.flush()
             rule.id = str(sql_rule.id)
+            rule.version = 1
+            session.add(SQLRuleChange(rule_id=rule.id, version=1, operation="create"))
+            await session.commit()
+            self._notify_change(rule.id)
             return rule
     
+    async def create_rules(self, rules: List[Rule]) -> List[Rule]:
+        if not rules:
+            return rules
+        async with self._session() as session:
+            sql_rules = [self._to_sql_rule(rule) for rule in rules]
+            session.add_all(sql_rules)
+            # One multi-row INSERT ... RETURNING assigns every primary key
+            await session.flush()
+            for rule, sql_rule in zip(rules, sql_rules):
+                rule.id = str(sql_rule.id)
+                rule.version = 1
+            session.add_all([SQLRuleChange(rule_id=rule.id, version=1, operation="create") for rule in rules])
+            await session.commit()
+        for rule in rules:
+            self._notify_change(rule.id)
+        return rules
+    
     async def get_rule(self, rule_id: str) -> Optional[Rule]:
-        async with self.session_factory() as session:
+        async with self._session() as session:
             sql_rule = await session.get(SQLRule, int(rule_id))
             if sql_rule:
-                return Rule(
-                    id=str(sql_rule.id),
-                    name=sql_rule.name,
-                    description=sql_rule.description,
-                    rule_string=sql_rule.rule_string,
-                    ast=sql_rule.ast
-                )
+                return self._from_sql_rule(sql_rule)
             return None
     
-    async def list_rules(self, skip: int = 0, limit: int = 100) -> List[Rule]:
-        async with self.session_factory() as session:
-            sql_rules = await session.query(SQLRule).offset(skip).limit(limit).all()
-            return [
-                Rule(
-                    id=str(sql_rule.id),
-                    name=sql_rule.name,
-                    description=sql_rule.description,
-                    rule_string=sql_rule.rule_string,
-                    ast=sql_rule.ast
-                )
-                for sql_rule in sql_rules
-            ]
+    async def get_rules(self, rule_ids: List[str]) -> List[Optional[Rule]]:
+        keys = [_integer_id(rule_id) for rule_id in rule_ids]
+        distinct = list(dict.fromkeys(key for key in keys if key is not None))
+        found: Dict[int, Rule] = {}
+        if distinct:
+            async with self._session() as session:
+                for start in range(0, len(distinct), ID_BATCH_SIZE):
+                    batch = distinct[start:start + ID_BATCH_SIZE]
+                    result = await session.execute(select(SQLRule).where(SQLRule.id.in_(batch)))
+                    for sql_rule in result.scalars():
+                        found[sql_rule.id] = self._from_sql_rule(sql_rule)
+        return [found.get(key) for key in keys]
+    
+    async def list_rules(self, skip: int = 0, limit: int = 100,
+                         after_id: Optional[str] = None) -> List[Rule]:
+        query = select(SQLRule).order_by(SQLRule.id)
+        if after_id is not None:
+            query = query.where(SQLRule.id > _after_key(after_id))
+        async with self._session() as session:
+            result = await session.execute(query.offset(skip).limit(limit))
+            return [self._from_sql_rule(sql_rule) for sql_rule in result.scalars()]
+    
+    async def iter_rules(self, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[Rule]:
+        async with self._session() as session:
+            result = await session.stream(
+                select(SQLRule).order_by(SQLRule.id).execution_options(yield_per=batch_size)
+            )
+            async for sql_rule in result.scalars():
+                yield self._from_sql_rule(sql_rule)
+    
+    async def update_rule(self, rule_id: str, rule: Rule,
+                          expected_version: Optional[int] = None) -> Optional[Rule]:
+        key = _integer_id(rule_id)
+        if key is None:
+            return None
+        async with self._session() as session:
+            sql_rule = await session.get(SQLRule, key, with_for_update=True)
+            if sql_rule is None:
+                return None
+            if expected_version is not None and sql_rule.version != expected_version:
+                raise _version_conflict(rule_id, expected_version, sql_rule.version)
+            sql_rule.name = rule.name
+            sql_rule.description = rule.description
+            sql_rule.rule_string = rule.rule_string
+            sql_rule.ast = None
+            sql_rule.ast_bin = rule.encode_ast()
+            sql_rule.meta = rule.metadata.model_dump()
+            sql_rule.version += 1
+            session.add(SQLRuleChange(rule_id=rule_id, version=sql_rule.version, operation="update"))
+            await session.commit()
+            rule.id = rule_id
+            rule.version = sql_rule.version
+        self._notify_change(rule_id)
+        return rule
+    
+    async def delete_rule(self, rule_id: str) -> bool:
+        key = _integer_id(rule_id)
+        if key is None:
+            return False
+        async with self._session() as session:
+            sql_rule = await session.get(SQLRule, key, with_for_update=True)
+            if sql_rule is None:
+                return False
+            await session.delete(sql_rule)
+            session.add(SQLRuleChange(rule_id=rule_id, version=sql_rule.version, operation="delete"))
+            await session.commit()
+        self._notify_change(rule_id)
+        return True
+    
+    @staticmethod
+    def _from_sql_rule_change(sql_change: SQLRuleChange) -> RuleChange:
+        return RuleChange(seq=sql_change.seq, rule_id=sql_change.rule_id,
+                          version=sql_change.version, operation=sql_change.operation)
+    
+    async def changes_since(self, seq: int, limit: int = CHANGE_BATCH_SIZE) -> List[RuleChange]:
+        async with self._session() as session:
+            result = await session.execute(
+                select(SQLRuleChange).where(SQLRuleChange.seq > seq).order_by(SQLRuleChange.seq).limit(limit)
+            )
+            return [self._from_sql_rule_change(sql_change) for sql_change in result.scalars()]
+    
+    async def latest_change_seq(self) -> int:
+        async with self._session() as session:
+            result = await session.execute(select(func.max(SQLRuleChange.seq)))
+            return result.scalar() or 0
+    
+    async def prune_changes(self, keep: int = CHANGE_LOG_RETENTION) -> int:
+        async with self._session() as session:
+            cutoff = select(func.max(SQLRuleChange.seq) - keep).scalar_subquery()
+            result = await session.execute(delete(SQLRuleChange).where(SQLRuleChange.seq <= cutoff))
+            await session.commit()
+            return result.rowcount
+    
+    @staticmethod
+    def _from_sql_rule_set(sql_rule_set: SQLRuleSet) -> RuleSet:
+        return RuleSet(
+            id=str(sql_rule_set.id),
+            name=sql_rule_set.name,
+            description=sql_rule_set.description,
+            rule_ids=sql_rule_set.rule_ids,
+            strategy=sql_rule_set.strategy
+        )
+    
+    async def create_rule_set(self, rule_set: RuleSet) -> RuleSet:
+        async with self._session() as session:
+            sql_rule_set = SQLRuleSet(
+                name=rule_set.name,
+                description=rule_set.description,
+                rule_ids=rule_set.rule_ids,
+                strategy=rule_set.strategy
+            )
+            session.add(sql_rule_set)
+            await session.commit()
+            rule_set.id = str(sql_rule_set.id)
+            return rule_set
+    
+    async def get_rule_set(self, rule_set_id: str) -> Optional[RuleSet]:
+        key = _integer_id(rule_set_id)
+        if key is None:
+            return None
+        async with self._session() as session:
+            sql_rule_set = await session.get(SQLRuleSet, key)
+            return self._from_sql_rule_set(sql_rule_set) if sql_rule_set else None
+    
+    async def list_rule_sets(self, skip: int = 0, limit: int = 100) -> List[RuleSet]:
+        async with self._session() as session:
+            result = await session.execute(
+                select(SQLRuleSet).order_by(SQLRuleSet.id).offset(skip).limit(limit)
+            )
+            return [self._from_sql_rule_set(sql_rule_set) for sql_rule_set in result.scalars()]
+    
+    async def delete_rule_set(self, rule_set_id: str) -> bool:
+        key = _integer_id(rule_set_id)
+        if key is None:
+            return False
+        async with self._session() as session:
+            result = await session.execute(delete(SQLRuleSet).where(SQLRuleSet.id == key))
+            await session.commit()
+            return result.rowcount > 0
 
 class SQLiteDatabase(DatabaseInterface):
     """SQLite implementation"""
     
-    def __init__(self, db_path: str):
+    supports_group_commit = True
+    
+    def __init__(self, db_path: str, pool_config: Optional[PoolConfig] = None):
+        super().__init__()
         self.db_path = db_path
-        self.db = None
+        # Writes are serialized on the pool's single writer, so batches get consecutive IDs
+        self.pool = SQLitePool(db_path, readers=(pool_config or PoolConfig()).sqlite_readers)
     
     async def connect(self):
-        self.db = await aiosqlite.connect(self.db_path)
-        await self.db.execute("""
+        await self.pool.open()
+        async with self.pool.write() as db:
+            await self._create_schema(db)
+            await self._migrate_ast_storage(db)
+    
+    async def _create_schema(self, db: aiosqlite.Connection):
+        # `ast` holds the legacy text AST and is left empty once a row is migrated
+        await db.execute("""
             CREATE TABLE IF NOT EXISTS rules (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT NOT NULL,
                 description TEXT,
                 rule_string TEXT NOT NULL,
-                ast TEXT NOT NULL
+                ast TEXT NOT NULL,
+                ast_bin BLOB
             )
         """)
-        await self.db.commit()
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS rule_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                rule_id TEXT NOT NULL,
+                version INTEGER,
+                operation TEXT NOT NULL
+            )
+        """)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS rule_sets (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                description TEXT,
+                rule_ids TEXT NOT NULL,
+                strategy TEXT NOT NULL
+            )
+        """)
+        async with db.execute("PRAGMA table_info(rules)") as cursor:
+            columns = {row[1] for row in await cursor.fetchall()}
+        if "ast_bin" not in columns:
+            await db.execute("ALTER TABLE rules ADD COLUMN ast_bin BLOB")
+        if "version" not in columns:
+            await db.execute("ALTER TABLE rules ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        if "meta" not in columns:
+            await db.execute("ALTER TABLE rules ADD COLUMN meta TEXT")
+        await db.commit()
+    
+    async def _migrate_ast_storage(self, db: aiosqlite.Connection):
+        """
+        Rewrites rows holding a JSON or str(dict) text AST into the binary format, and
+        fills in the metadata of rows written before it was stored
+        """
+        # Walks the keys in order, since unreadable rows keep their NULL metadata
+        last_id = 0
+        while True:
+            async with db.execute(
+                "SELECT id, ast_bin, ast FROM rules WHERE meta IS NULL AND id > ? ORDER BY id LIMIT ?",
+                (last_id, MIGRATION_BATCH_SIZE)
+            ) as cursor:
+                rows = await cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            updates = []
+            for rule_id, ast_bin, ast in rows:
+                migrated = _migrated_ast(rule_id, ast_bin, ast)
+                if migrated is not None:
+                    ast_bin, metadata = migrated
+                    updates.append((ast_bin, json.dumps(metadata), rule_id))
+            await db.executemany("UPDATE rules SET ast_bin = ?, meta = ?, ast = '' WHERE id = ?", updates)
+            await db.commit()
     
     async def close(self):
-        if self.db:
-            await self.db.close()
+        if self.group_committer is not None:
+            await self.group_committer.close()
+        await self.pool.close()
     
-    async def create_rule(self, rule: Rule) -> Rule:
-        cursor = await self.db.execute(
-            """
-            INSERT INTO rules (name, description, rule_string, ast)
-            VALUES (?, ?, ?, ?)
-            """,
-            (rule.name, rule.description, rule.rule_string, str(rule.ast))
+    def pool_stats(self) -> Dict[str, Any]:
+        return self._group_commit_stats(self.pool.stats())
+    
+    @staticmethod
+    def _to_row(rule: Rule) -> tuple:
+        ast_bin = rule.encode_ast()
+        return (rule.name, rule.description, rule.rule_string, ast_bin, json.dumps(rule.metadata.model_dump()))
+    
+    @staticmethod
+    def _from_row(row: tuple) -> Rule:
+        return _rule_from_storage(
+            row[4],
+            row[5],
+            id=str(row[0]),
+            name=row[1],
+            description=row[2],
+            rule_string=row[3],
+            version=row[6],
+            metadata=json.loads(row[7]) if row[7] else None
+        )
+    
+    @staticmethod
+    async def _log_changes(db: aiosqlite.Connection, changes: List[tuple]):
+        """Appends (rule ID, version, operation) entries to the change log, inside the write"""
+        await db.executemany(
+            "INSERT INTO rule_changes (rule_id, version, operation) VALUES (?, ?, ?)", changes
         )
-        await self.db.commit()
-        rule.id = str(cursor.lastrowid)
+    
+    async def create_rule(self, rule: Rule) -> Rule:
+        if self.group_committer is not None:
+            return await self.group_committer.submit(rule)
+        async with self.pool.write() as db:
+            cursor = await db.execute(
+                """
+                INSERT INTO rules (name, description, rule_string, ast, ast_bin, meta)
+                VALUES (?, ?, ?, '', ?, ?)
+                """,
+                self._to_row(rule)
+            )
+            rule.id = str(cursor.lastrowid)
+            rule.version = 1
+            await self._log_changes(db, [(rule.id, 1, "create")])
+            await db.commit()
+        self._notify_change(rule.id)
         return rule
     
-    # async def get_rule(self, rule_id: str) -> Optional[Rule]:
-    #     cursor = await self.db.execute(
-    #         "SELECT * FROM rules WHERE id = ?",
-    #         (int(rule_id),)
-    #     )
-    #     row = await cursor.fetchone()
-    #     if row:
-    #         return Rule(
-    #             id=str(row[0]),
-    #             name=row[1],
-    #             description=row[2],
-    #             rule_string=row[3],
-    #             ast=eval(row[4])  # Note: Use json.loads in production
-    #         )
-    #     return None
+    async def create_rules(self, rules: List[Rule]) -> List[Rule]:
+        if not rules:
+            return rules
+        async with self.pool.write() as db:
+            await db.executemany(
+                """
+                INSERT INTO rules (name, description, rule_string, ast, ast_bin, meta)
+                VALUES (?, ?, ?, '', ?, ?)
+                """,
+                [self._to_row(rule) for rule in rules]
+            )
+            # The batch ran in one write transaction, so its IDs are consecutive
+            async with db.execute("SELECT last_insert_rowid()") as cursor:
+                last_id = (await cursor.fetchone())[0]
+            for offset, rule in enumerate(rules):
+                rule.id = str(last_id - len(rules) + 1 + offset)
+                rule.version = 1
+            await self._log_changes(db, [(rule.id, 1, "create") for rule in rules])
+            await db.commit()
+        for rule in rules:
+            self._notify_change(rule.id)
+        return rules
+    
     async def get_rule(self, rule_id: str) -> Optional[Rule]:
-        async with self.db.execute(
-            "SELECT * FROM rules WHERE id = ?",
-            (int(rule_id),)  # Ensure this matches your id type
+        async with self.pool.read() as db, db.execute(
+            "SELECT id, name, description, rule_string, ast_bin, ast, version, meta FROM rules WHERE id = ?",
+            (int(rule_id),)
         ) as cursor:
             row = await cursor.fetchone()
             if row:
-                return Rule(
-                    id=str(row[0]),
-                    name=row[1],
-                    description=row[2],
-                    rule_string=row[3],
-                    ast=json.loads(row[4])  # Safely parse the AST
-                )
+                return self._from_row(row)
         return None
     
-    async def list_rules(self, skip: int = 0, limit: int = 100) -> List[Rule]:
-        cursor = await self.db.execute(
-            "SELECT * FROM rules LIMIT ? OFFSET ?",
-            (limit, skip)
-        )
-        rows = await cursor.fetchall()
-        return [
-            Rule(
-                id=str(row[0]),
-                name=row[1],
-                description=row[2],
-                rule_string=row[3],
-                ast=eval(row[4])  # Note: Use json.loads in production
+    async def get_rules(self, rule_ids: List[str]) -> List[Optional[Rule]]:
+        keys = [_integer_id(rule_id) for rule_id in rule_ids]
+        distinct = list(dict.fromkeys(key for key in keys if key is not None))
+        found: Dict[int, Rule] = {}
+        for start in range(0, len(distinct), ID_BATCH_SIZE):
+            batch = distinct[start:start + ID_BATCH_SIZE]
+            async with self.pool.read() as db, db.execute(
+                "SELECT id, name, description, rule_string, ast_bin, ast, version, meta FROM rules "
+                f"WHERE id IN ({', '.join('?' * len(batch))})",
+                batch
+            ) as cursor:
+                for row in await cursor.fetchall():
+                    found[row[0]] = self._from_row(row)
+        return [found.get(key) for key in keys]
+    
+    async def list_rules(self, skip: int = 0, limit: int = 100,
+                         after_id: Optional[str] = None) -> List[Rule]:
+        after = _after_key(after_id) if after_id is not None else None
+        async with self.pool.read() as db, db.execute(
+            "SELECT id, name, description, rule_string, ast_bin, ast, version, meta FROM rules"
+            + (" WHERE id > ?" if after is not None else "")
+            + " ORDER BY id LIMIT ? OFFSET ?",
+            (after, limit, skip) if after is not None else (limit, skip)
+        ) as cursor:
+            rows = await cursor.fetchall()
+        return [self._from_row(row) for row in rows]
+    
+    async def iter_rules(self, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[Rule]:
+        async with self.pool.read() as db, db.execute(
+            "SELECT id, name, description, rule_string, ast_bin, ast, version, meta FROM rules ORDER BY id"
+        ) as cursor:
+            while True:
+                rows = await cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield self._from_row(row)
+    
+    async def update_rule(self, rule_id: str, rule: Rule,
+                          expected_version: Optional[int] = None) -> Optional[Rule]:
+        key = _integer_id(rule_id)
+        if key is None:
+            return None
+        async with self.pool.write() as db:
+            async with db.execute("SELECT version FROM rules WHERE id = ?", (key,)) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                return None
+            if expected_version is not None and row[0] != expected_version:
+                raise _version_conflict(rule_id, expected_version, row[0])
+            version = row[0] + 1
+            await db.execute(
+                "UPDATE rules SET name = ?, description = ?, rule_string = ?, ast = '', ast_bin = ?, "
+                "meta = ?, version = ? WHERE id = ?",
+                self._to_row(rule) + (version, key)
+            )
+            await self._log_changes(db, [(rule_id, version, "update")])
+            await db.commit()
+        rule.id = rule_id
+        rule.version = version
+        self._notify_change(rule_id)
+        return rule
+    
+    async def delete_rule(self, rule_id: str) -> bool:
+        key = _integer_id(rule_id)
+        if key is None:
+            return False
+        async with self.pool.write() as db:
+            async with db.execute("SELECT version FROM rules WHERE id = ?", (key,)) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                return False
+            await db.execute("DELETE FROM rules WHERE id = ?", (key,))
+            await self._log_changes(db, [(rule_id, row[0], "delete")])
+            await db.commit()
+        self._notify_change(rule_id)
+        return True
+    
+    async def changes_since(self, seq: int, limit: int = CHANGE_BATCH_SIZE) -> List[RuleChange]:
+        async with self.pool.read() as db, db.execute(
+            "SELECT seq, rule_id, version, operation FROM rule_changes WHERE seq > ? ORDER BY seq LIMIT ?",
+            (seq, limit)
+        ) as cursor:
+            return [RuleChange(seq=row[0], rule_id=row[1], version=row[2], operation=row[3])
+                    for row in await cursor.fetchall()]
+    
+    async def latest_change_seq(self) -> int:
+        async with self.pool.read() as db, db.execute("SELECT MAX(seq) FROM rule_changes") as cursor:
+            return (await cursor.fetchone())[0] or 0
+    
+    async def prune_changes(self, keep: int = CHANGE_LOG_RETENTION) -> int:
+        async with self.pool.write() as db:
+            cursor = await db.execute(
+                "DELETE FROM rule_changes WHERE seq <= (SELECT MAX(seq) FROM rule_changes) - ?", (keep,)
+            )
+            await db.commit()
+            return cursor.rowcount
+    
+    @staticmethod
+    def _rule_set_from_row(row: tuple) -> RuleSet:
+        return RuleSet(id=str(row[0]), name=row[1], description=row[2],
+                       rule_ids=json.loads(row[3]), strategy=row[4])
+    
+    async def create_rule_set(self, rule_set: RuleSet) -> RuleSet:
+        async with self.pool.write() as db:
+            cursor = await db.execute(
+                "INSERT INTO rule_sets (name, description, rule_ids, strategy) VALUES (?, ?, ?, ?)",
+                (rule_set.name, rule_set.description, json.dumps(rule_set.rule_ids), rule_set.strategy)
             )
-            for row in rows
-        ]
+            await db.commit()
+        rule_set.id = str(cursor.lastrowid)
+        return rule_set
+    
+    async def get_rule_set(self, rule_set_id: str) -> Optional[RuleSet]:
+        key = _integer_id(rule_set_id)
+        if key is None:
+            return None
+        async with self.pool.read() as db, db.execute(
+            "SELECT id, name, description, rule_ids, strategy FROM rule_sets WHERE id = ?", (key,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        return self._rule_set_from_row(row) if row else None
+    
+    async def list_rule_sets(self, skip: int = 0, limit: int = 100) -> List[RuleSet]:
+        async with self.pool.read() as db, db.execute(
+            "SELECT id, name, description, rule_ids, strategy FROM rule_sets ORDER BY id LIMIT ? OFFSET ?",
+            (limit, skip)
+        ) as cursor:
+            return [self._rule_set_from_row(row) for row in await cursor.fetchall()]
+    
+    async def delete_rule_set(self, rule_set_id: str) -> bool:
+        key = _integer_id(rule_set_id)
+        if key is None:
+            return False
+        async with self.pool.write() as db:
+            cursor = await db.execute("DELETE FROM rule_sets WHERE id = ?", (key,))
+            await db.commit()
+        return cursor.rowcount > 0
 
 # Factory function to create database instance
-def create_database(db_type: str, connection_string: str) -> DatabaseInterface:
+def create_database(db_type: str, connection_string: str,
+                    pool_config: Optional[PoolConfig] = None) -> DatabaseInterface:
     """
     Factory function to create appropriate database instance
     
     Args:
-        db_type: Type of database ('mongodb', 'postgres', or 'sqlite')
-        connection_string: Database connection string
+        db_type: Type of database ('mongodb', 'postgres', 'sqlite' or 'inmemory')
+        connection_string: Database connection string, or the store directory for
+            'inmemory' (empty for a store that is not persisted)
+        pool_config: Connection pool settings for the SQL backends
     
     Returns:
         DatabaseInterface: Instance of appropriate database class
@@ -242,8 +1157,11 @@ def create_database(db_type: str, connection_string: str) -> DatabaseInterface:
     if db_type == "mongodb":
         return MongoDBDatabase(connection_string)
     elif db_type == "postgres":
-        return PostgresDatabase(connection_string)
+        return PostgresDatabase(connection_string, pool_config)
     elif db_type == "sqlite":
-        return SQLiteDatabase(connection_string)
+        return SQLiteDatabase(connection_string, pool_config)
+    elif db_type == "inmemory":
+        from .inmemory_database import InMemoryDatabase
+        return InMemoryDatabase(connection_string)
     else:
         raise ValueError(f"Unsupported database type: {db_type}")
\ No newline at end of file
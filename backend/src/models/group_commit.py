@@ -0,0 +1,109 @@
+# src/models/group_commit.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+class GroupCommitter:
+    """
+    Batches concurrent single-rule writes into shared transactions.
+
+    submit() queues an item and waits. The queue is handed to `write_many`, which
+    stores it in one transaction, as soon as it holds `max_batch` items or
+    `max_delay` seconds after its first item arrived, whichever comes first. Each
+    caller then gets back its own item as `write_many` returned it, with its ID set.
+    A burst of N creates thus pays for one commit instead of N.
+
+    Durability: submit() only returns once the transaction holding the item has
+    committed, so an acknowledged rule is exactly as durable as with a commit per
+    rule. A crash loses only rules whose callers are still waiting, which were never
+    acknowledged. A batch is atomic: if its write fails, every caller in it gets the
+    error and none of its rules is stored. A caller that is cancelled while waiting
+    does not withdraw its rule, which may still be stored. Batches commit one after
+    another in the order they were flushed, so items are stored in submission order.
+
+    The price is latency: a write arriving alone waits up to `max_delay` for others
+    to share its commit.
+    """
+
+    def __init__(self, write_many: Callable[[List[Any]], Awaitable[List[Any]]],
+                 max_batch: int = 128, max_delay: float = 0.002):
+        """
+        Args:
+            write_many: Stores a batch in one transaction and returns it in order
+            max_batch: Items after which the queue is written without waiting
+            max_delay: Seconds the first queued item waits for others
+        """
+        if max_batch < 1:
+            raise ValueError("A group commit batch holds at least one item")
+        if max_delay < 0:
+            raise ValueError("The group commit delay cannot be negative")
+        self.write_many = write_many
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._writes: Set[asyncio.Task] = set()
+        # The most recently flushed batch; the next one starts writing once it is done
+        self._last_write: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.written = 0
+        self.largest_batch = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Queues an item and returns it once its batch has committed"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self.flush)
+        return await future
+
+    def flush(self):
+        """Starts writing whatever is queued without waiting for the delay"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._write(batch, self._last_write))
+        self._last_write = task
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    async def _write(self, batch: List[Tuple[Any, asyncio.Future]], previous: Optional[asyncio.Task]):
+        if previous is not None:
+            # _write never raises, so this only waits for the earlier batch to commit
+            await previous
+        try:
+            written = await self.write_many([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.written += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for (_, future), item in zip(batch, written):
+            if not future.done():
+                future.set_result(item)
+
+    async def close(self):
+        """Writes what is queued and waits for every batch in flight"""
+        self.flush()
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch": self.max_batch,
+            "max_delay_ms": 1000 * self.max_delay,
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "rules": self.written,
+            "avg_batch_size": self.written / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch
+        }
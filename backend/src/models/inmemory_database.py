@@ -0,0 +1,485 @@
+# src/models/inmemory_database.py
+"""
+In-process rule store persisted through an append-only log and compact snapshots.
+
+Files in the store directory:
+
+    rules.snapshot  the whole store, rewritten atomically by compaction
+    rules.log       every write since the snapshot, one framed record each
+    rules.log.compacting
+                    the log being folded into a new snapshot; replayed before
+                    rules.log if compaction did not finish
+    rules.log.lock  held with an exclusive flock by the process that owns the store
+
+Snapshot layout, little-endian:
+
+    header:  b"RSNP", format version (u16), rule count (u32), next rule ID,
+             next rule set ID, last change sequence number, rule sets offset (u64 each),
+             rule sets length (u32)
+    index:   one fixed-size entry per rule in ID order: ID (u64), version (u32),
+             metadata offset (u64) and length (u32), AST offset (u64) and length (u32)
+    data:    each rule's metadata as JSON and AST in the ast_codec format, then all
+             rule sets as one JSON array
+
+On boot the snapshot is memory-mapped and only the index is unpacked; a rule's
+metadata and AST stay in the page cache until the rule is read. The log is then
+replayed on top. Compaction renames the log aside, so writes continue into a
+fresh one while the snapshot is written and synced on a worker thread. Log records are (payload length u32, operation u8, metadata
+length u32, metadata JSON, AST bytes); a torn record at the end, from a crash
+mid-write, is cut off.
+"""
+import asyncio
+import bisect
+import fcntl
+import json
+import mmap
+import os
+import shutil
+import struct
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+from .database import (CHANGE_BATCH_SIZE, STREAM_BATCH_SIZE, DatabaseInterface,
+                       _after_key, _integer_id, _version_conflict)
+from .rule import Rule, RuleChange, RuleSet
+
+SNAPSHOT_FILE = "rules.snapshot"
+LOG_FILE = "rules.log"
+COMPACTING_LOG_FILE = "rules.log.compacting"
+LOCK_FILE = "rules.log.lock"
+
+SNAPSHOT_MAGIC = b"RSNP"
+SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct("<4sHIQQQQI")
+_INDEX_ENTRY = struct.Struct("<QIQIQI")
+_RECORD_HEADER = struct.Struct("<IBI")
+
+_PUT_RULE, _DELETE_RULE, _PUT_RULE_SET, _DELETE_RULE_SET = range(1, 5)
+
+# Compact into a new snapshot once the log holds this many records
+SNAPSHOT_EVERY = 10000
+
+# Change feed entries kept for changes_since
+CHANGE_LOG_SIZE = 10000
+
+Buffer = Union[bytes, memoryview]
+
+
+class _StoredRule:
+    """A rule as kept in memory: raw metadata and AST, decoded when read"""
+
+    __slots__ = ("id", "version", "meta", "ast_bin")
+
+    def __init__(self, rule_id: int, version: int, meta: Buffer, ast_bin: Buffer):
+        self.id = rule_id
+        self.version = version
+        self.meta = meta
+        self.ast_bin = ast_bin
+
+    def to_rule(self) -> Rule:
+        fields = json.loads(bytes(self.meta))
+        return Rule.from_storage(bytes(self.ast_bin), id=str(self.id), version=self.version, **fields)
+
+
+class InMemoryDatabase(DatabaseInterface):
+    """
+    Rule store held in process memory, for evaluation nodes that should never wait
+    on a database and as a stand-in for tests and benchmarks.
+
+    Rules are kept by integer ID with a sorted ID list for keyset pagination. With
+    a directory, every write is appended to the log and flushed to the OS before it
+    is applied, so it survives a process crash; pass fsync=True to also survive a
+    power loss, at the cost of a disk sync per write. The log is compacted into a
+    new snapshot in the background every `snapshot_every` records, and on close.
+    Without a directory nothing is persisted.
+
+    One process owns a store directory: connect() fails while another holds its
+    lock. Other processes can boot from a copy of its snapshot, but do not see its
+    later writes.
+    """
+
+    def __init__(self, path: Optional[str] = None, snapshot_every: int = SNAPSHOT_EVERY,
+                 fsync: bool = False):
+        super().__init__()
+        self.path = path if path not in (None, "", ":memory:") else None
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self._reset()
+
+    def _reset(self):
+        self._rules: Dict[int, _StoredRule] = {}
+        self._ids: List[int] = []
+        self._rule_sets: Dict[int, RuleSet] = {}
+        self._next_rule_id = 1
+        self._next_rule_set_id = 1
+        self._seq = 0
+        self._changes: List[RuleChange] = []
+        self._log = None
+        self._log_records = 0
+        self._mmap: Optional[mmap.mmap] = None
+        self._lock_file = None
+        self._compaction: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        if self.path is None:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        lock_file = open(os.path.join(self.path, LOCK_FILE), "a")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise RuntimeError(f"Rule store {self.path} is in use by another process")
+        self._lock_file = lock_file
+
+        self._load_snapshot()
+        compacting_path = os.path.join(self.path, COMPACTING_LOG_FILE)
+        interrupted = os.path.exists(compacting_path)
+        if interrupted:
+            self._replay_log(compacting_path)
+        self._replay_log(os.path.join(self.path, LOG_FILE))
+        if interrupted:
+            # Finish the interrupted compaction before taking writes
+            self._write_snapshot(self._capture())
+            os.remove(compacting_path)
+            open(os.path.join(self.path, LOG_FILE), "wb").close()
+            self._log_records = 0
+            self._remap()
+        self._log = open(os.path.join(self.path, LOG_FILE), "ab")
+
+    async def close(self):
+        if self._compaction is not None:
+            await self._compaction
+        if self._log is not None:
+            await self.compact()
+            self._log.close()
+        self._close_mmap(self._mmap, self._rules)
+        if self._lock_file is not None:
+            # Closing the file releases the lock
+            self._lock_file.close()
+        self._reset()
+
+    # Persistence
+
+    def _load_snapshot(self):
+        snapshot = self._read_snapshot()
+        if snapshot is None:
+            return
+        mapped, rules, rule_sets, next_rule_id, next_rule_set_id, seq = snapshot
+        self._rules = rules
+        self._ids = list(rules)
+        self._rule_sets = {int(rule_set["id"]): RuleSet(**rule_set) for rule_set in rule_sets}
+        self._next_rule_id = next_rule_id
+        self._next_rule_set_id = next_rule_set_id
+        self._seq = seq
+        self._mmap = mapped
+
+    def _read_snapshot(self) -> Optional[tuple]:
+        """Maps the snapshot and unpacks its index; None when there is no snapshot"""
+        snapshot_path = os.path.join(self.path, SNAPSHOT_FILE)
+        if not os.path.exists(snapshot_path) or os.path.getsize(snapshot_path) == 0:
+            return None
+        with open(snapshot_path, "rb") as snapshot:
+            mapped = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        magic, version, rule_count, next_rule_id, next_rule_set_id, seq, sets_offset, sets_length = \
+            _SNAPSHOT_HEADER.unpack_from(view)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            view.release()
+            mapped.close()
+            raise ValueError(f"Unsupported rule snapshot: {snapshot_path}")
+
+        start = _SNAPSHOT_HEADER.size
+        rules = {}
+        for rule_id, rule_version, meta_offset, meta_length, ast_offset, ast_length in \
+                _INDEX_ENTRY.iter_unpack(view[start:start + rule_count * _INDEX_ENTRY.size]):
+            rules[rule_id] = _StoredRule(rule_id, rule_version,
+                                         view[meta_offset:meta_offset + meta_length],
+                                         view[ast_offset:ast_offset + ast_length])
+        rule_sets = json.loads(bytes(view[sets_offset:sets_offset + sets_length]))
+        return mapped, rules, rule_sets, next_rule_id, next_rule_set_id, seq
+
+    def _replay_log(self, log_path: str):
+        if not os.path.exists(log_path):
+            return
+        with open(log_path, "rb") as log:
+            data = log.read()
+        position = 0
+        while position + _RECORD_HEADER.size <= len(data):
+            length, operation, meta_length = _RECORD_HEADER.unpack_from(data, position)
+            end = position + _RECORD_HEADER.size + length
+            if end > len(data):
+                break
+            body = position + _RECORD_HEADER.size
+            meta = json.loads(data[body:body + meta_length])
+            self._apply(operation, meta, data[body + meta_length:end])
+            self._log_records += 1
+            position = end
+        if position < len(data):
+            # Drop a record torn by a crash so new records are not appended after it
+            with open(log_path, "r+b") as log:
+                log.truncate(position)
+
+    def _append(self, operation: int, meta: Dict[str, Any], ast_bin: bytes = b""):
+        """Logs a write before it is applied; a no-op without a store directory"""
+        if self._log is None:
+            return
+        meta_bytes = json.dumps(meta).encode()
+        self._log.write(_RECORD_HEADER.pack(len(meta_bytes) + len(ast_bin), operation, len(meta_bytes))
+                        + meta_bytes + ast_bin)
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+        self._log_records += 1
+
+    def _apply(self, operation: int, meta: Dict[str, Any], ast_bin: bytes):
+        """Applies a logged write to the in-memory structures, recording it in the change feed"""
+        if operation == _PUT_RULE:
+            rule_id = meta["id"]
+            fields = json.dumps({"name": meta["name"], "description": meta["description"],
+                                 "rule_string": meta["rule_string"],
+                                 "metadata": meta.get("metadata")}).encode()
+            if rule_id not in self._rules:
+                self._ids.append(rule_id)
+            self._rules[rule_id] = _StoredRule(rule_id, meta["version"], fields, ast_bin)
+            self._next_rule_id = max(self._next_rule_id, rule_id + 1)
+            self._record_change(rule_id, meta["version"], "create" if meta["version"] == 1 else "update")
+        elif operation == _DELETE_RULE:
+            stored = self._rules.pop(meta["id"], None)
+            if stored is not None:
+                self._ids.pop(bisect.bisect_left(self._ids, meta["id"]))
+                self._record_change(meta["id"], stored.version, "delete")
+        elif operation == _PUT_RULE_SET:
+            rule_set = RuleSet(**meta)
+            self._rule_sets[int(rule_set.id)] = rule_set
+            self._next_rule_set_id = max(self._next_rule_set_id, int(rule_set.id) + 1)
+        elif operation == _DELETE_RULE_SET:
+            self._rule_sets.pop(meta["id"], None)
+
+    def _record_change(self, rule_id: int, version: Optional[int], operation: str):
+        self._seq += 1
+        self._changes.append(RuleChange(seq=self._seq, rule_id=str(rule_id), version=version,
+                                        operation=operation))
+        if len(self._changes) > 2 * CHANGE_LOG_SIZE:
+            del self._changes[:-CHANGE_LOG_SIZE]
+
+    def _write(self, operation: int, meta: Dict[str, Any], ast_bin: bytes = b""):
+        self._append(operation, meta, ast_bin)
+        self._apply(operation, meta, ast_bin)
+        if self._log is not None and self._log_records >= self.snapshot_every and self._compaction is None:
+            self._compaction = asyncio.ensure_future(self._compact_in_background())
+
+    async def _compact_in_background(self):
+        try:
+            await self.compact()
+        except Exception as e:
+            # The log keeps every write, so the next compaction simply retries
+            print(f"Compacting rule store {self.path} failed: {e}")
+        finally:
+            self._compaction = None
+
+    async def compact(self):
+        """
+        Writes the whole store to a new snapshot and empties the log
+
+        The store is captured and the log renamed aside without yielding, then the
+        snapshot is written and synced on a worker thread while writes go on into a
+        fresh log.
+        """
+        if self.path is None or self._log is None:
+            return
+        captured = self._capture()
+        log_path = os.path.join(self.path, LOG_FILE)
+        compacting_path = os.path.join(self.path, COMPACTING_LOG_FILE)
+        self._log.close()
+        if os.path.exists(compacting_path):
+            # A failed compaction left its log behind; fold this one into it
+            with open(compacting_path, "ab") as compacting, open(log_path, "rb") as log:
+                shutil.copyfileobj(log, compacting)
+            os.remove(log_path)
+        else:
+            os.replace(log_path, compacting_path)
+        self._log = open(log_path, "ab")
+        self._log_records = 0
+
+        await asyncio.to_thread(self._write_snapshot, captured)
+        # The snapshot now holds every write of the renamed log
+        os.remove(compacting_path)
+        self._remap(captured[0])
+
+    def _capture(self) -> tuple:
+        """The state a snapshot is written from; stored rules are replaced on write, never changed"""
+        rules = [self._rules[rule_id] for rule_id in self._ids]
+        rule_sets = json.dumps([rule_set.model_dump() for rule_set in self._rule_sets.values()]).encode()
+        return rules, rule_sets, self._next_rule_id, self._next_rule_set_id, self._seq
+
+    def _write_snapshot(self, captured: tuple):
+        rules, rule_sets, next_rule_id, next_rule_set_id, seq = captured
+        snapshot_path = os.path.join(self.path, SNAPSHOT_FILE)
+        temporary_path = snapshot_path + ".tmp"
+
+        index = bytearray()
+        offset = _SNAPSHOT_HEADER.size + len(rules) * _INDEX_ENTRY.size
+        for stored in rules:
+            meta_length, ast_length = len(stored.meta), len(stored.ast_bin)
+            index += _INDEX_ENTRY.pack(stored.id, stored.version, offset, meta_length,
+                                       offset + meta_length, ast_length)
+            offset += meta_length + ast_length
+
+        with open(temporary_path, "wb") as snapshot:
+            snapshot.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(rules),
+                                                 next_rule_id, next_rule_set_id, seq,
+                                                 offset, len(rule_sets)))
+            snapshot.write(index)
+            for stored in rules:
+                snapshot.write(stored.meta)
+                snapshot.write(stored.ast_bin)
+            snapshot.write(rule_sets)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temporary_path, snapshot_path)
+
+    def _remap(self, captured: Optional[List[_StoredRule]] = None):
+        """
+        Points rules at the new snapshot so the old mapping can be released; rules
+        written since `captured` was taken keep their own bytes
+        """
+        snapshot = self._read_snapshot()
+        if snapshot is None:
+            return
+        mapped, mapped_rules = snapshot[:2]
+        unchanged = self._rules if captured is None else {
+            stored.id: stored for stored in captured if self._rules.get(stored.id) is stored
+        }
+        for rule_id in unchanged:
+            self._rules[rule_id] = mapped_rules[rule_id]
+        previous, self._mmap = self._mmap, mapped
+        self._close_mmap(previous)
+
+    @staticmethod
+    def _close_mmap(mapped: Optional[mmap.mmap], rules: Optional[Dict[int, _StoredRule]] = None):
+        if mapped is None:
+            return
+        if rules is not None:
+            rules.clear()
+        try:
+            mapped.close()
+        except BufferError:
+            # A rule read from it is still referenced; the mapping is freed with it
+            pass
+
+    # Rules
+
+    async def create_rule(self, rule: Rule) -> Rule:
+        return (await self.create_rules([rule]))[0]
+
+    async def create_rules(self, rules: List[Rule]) -> List[Rule]:
+        for rule in rules:
+            rule_id = self._next_rule_id
+            ast_bin = rule.encode_ast()
+            self._write(_PUT_RULE, {"id": rule_id, "version": 1, "name": rule.name,
+                                    "description": rule.description, "rule_string": rule.rule_string,
+                                    "metadata": rule.metadata.model_dump()},
+                        ast_bin)
+            rule.id = str(rule_id)
+            rule.version = 1
+        for rule in rules:
+            self._notify_change(rule.id)
+        return rules
+
+    async def get_rule(self, rule_id: str) -> Optional[Rule]:
+        stored = self._rules.get(_integer_id(rule_id))
+        return stored.to_rule() if stored is not None else None
+
+    async def get_rules(self, rule_ids: List[str]) -> List[Optional[Rule]]:
+        decoded: Dict[int, Rule] = {}
+        rules = []
+        for rule_id in rule_ids:
+            key = _integer_id(rule_id)
+            stored = self._rules.get(key)
+            if stored is None:
+                rules.append(None)
+                continue
+            if key not in decoded:
+                decoded[key] = stored.to_rule()
+            rules.append(decoded[key])
+        return rules
+
+    async def list_rules(self, skip: int = 0, limit: int = 100,
+                         after_id: Optional[str] = None) -> List[Rule]:
+        start = bisect.bisect_right(self._ids, _after_key(after_id)) if after_id is not None else 0
+        start += skip
+        return [self._rules[rule_id].to_rule() for rule_id in self._ids[start:start + limit]]
+
+    async def iter_rules(self, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[Rule]:
+        for rule_id in list(self._ids):
+            stored = self._rules.get(rule_id)
+            if stored is not None:
+                yield stored.to_rule()
+
+    async def update_rule(self, rule_id: str, rule: Rule,
+                          expected_version: Optional[int] = None) -> Optional[Rule]:
+        key = _integer_id(rule_id)
+        stored = self._rules.get(key)
+        if stored is None:
+            return None
+        if expected_version is not None and stored.version != expected_version:
+            raise _version_conflict(rule_id, expected_version, stored.version)
+        version = stored.version + 1
+        ast_bin = rule.encode_ast()
+        self._write(_PUT_RULE, {"id": key, "version": version, "name": rule.name,
+                                "description": rule.description, "rule_string": rule.rule_string,
+                                "metadata": rule.metadata.model_dump()},
+                    ast_bin)
+        rule.id = str(key)
+        rule.version = version
+        self._notify_change(rule.id)
+        return rule
+
+    async def delete_rule(self, rule_id: str) -> bool:
+        key = _integer_id(rule_id)
+        if key not in self._rules:
+            return False
+        self._write(_DELETE_RULE, {"id": key})
+        self._notify_change(str(key))
+        return True
+
+    async def changes_since(self, seq: int, limit: int = CHANGE_BATCH_SIZE) -> List[RuleChange]:
+        start = bisect.bisect_right(self._changes, seq, key=lambda change: change.seq)
+        return self._changes[start:start + limit]
+
+    async def latest_change_seq(self) -> int:
+        return self._seq
+
+    async def prune_changes(self, keep: int = CHANGE_LOG_SIZE) -> int:
+        start = bisect.bisect_right(self._changes, self._seq - keep, key=lambda change: change.seq)
+        del self._changes[:start]
+        return start
+
+    # Rule sets
+
+    async def create_rule_set(self, rule_set: RuleSet) -> RuleSet:
+        rule_set.id = str(self._next_rule_set_id)
+        self._write(_PUT_RULE_SET, rule_set.model_dump())
+        return rule_set
+
+    async def get_rule_set(self, rule_set_id: str) -> Optional[RuleSet]:
+        rule_set = self._rule_sets.get(_integer_id(rule_set_id))
+        return rule_set.model_copy(deep=True) if rule_set is not None else None
+
+    async def list_rule_sets(self, skip: int = 0, limit: int = 100) -> List[RuleSet]:
+        rule_sets = sorted(self._rule_sets.items())[skip:skip + limit]
+        return [rule_set.model_copy(deep=True) for _, rule_set in rule_sets]
+
+    async def delete_rule_set(self, rule_set_id: str) -> bool:
+        key = _integer_id(rule_set_id)
+        if key not in self._rule_sets:
+            return False
+        self._write(_DELETE_RULE_SET, {"id": key})
+        return True
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return {
+            "rules": len(self._rules),
+            "rule_sets": len(self._rule_sets),
+            "log_records": self._log_records,
+            "snapshot_mapped": self._mmap is not None
+        }
@@ -0,0 +1,90 @@
+from typing import Any, Dict, Optional, Tuple
+from .ast_node import NodeType, Operator
+from .compact_node import CompactNode
+
+
+class NodeInterner:
+    """
+    Hash-consing table that makes structurally identical subtrees one shared object.
+
+    A node is canonicalized by (type, operator, field, value, child identities).
+    Children are interned before their parent, so equal child identities mean
+    equal subtrees and one dict lookup per node is enough. Trees built through an
+    interner are DAGs: a clause repeated across rules is stored, and with
+    RuleSetEvaluator evaluated, once.
+
+    The table keeps every canonical node alive, so scope an interner to one build
+    (a combination, a prepared rule set) rather than the process. Interned nodes
+    are shared, so treat them as read-only.
+    """
+
+    def __init__(self):
+        self._nodes: Dict[Tuple, CompactNode] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def node(self, type: NodeType, operator: Optional[Operator] = None,
+             left: Optional[CompactNode] = None, right: Optional[CompactNode] = None,
+             field: Optional[str] = None, value: Any = None) -> CompactNode:
+        """
+        Returns the canonical node for these attributes
+
+        `left` and `right` must already be canonical nodes of this interner.
+        """
+        # The value type is part of the key so 1, 1.0, True and '1' stay distinct
+        key = (type, operator, field, value.__class__, value, id(left), id(right))
+        try:
+            canonical = self._nodes.get(key)
+        except TypeError:
+            # Unhashable constants are never shared
+            return CompactNode(type, operator, left, right, field, value)
+        if canonical is not None:
+            self.hits += 1
+            return canonical
+        self.misses += 1
+        canonical = self._nodes[key] = CompactNode(type, operator, left, right, field, value)
+        return canonical
+
+    def intern(self, root: Any) -> CompactNode:
+        """
+        Returns the canonical DAG for a tree of ASTNodes or CompactNodes
+
+        Nodes shared in the input (by identity) are visited once, so re-interning a
+        DAG costs its distinct node count, not its expanded tree size.
+        """
+        built: Dict[int, CompactNode] = {}
+        stack = [root]
+        while stack:
+            node = stack[-1]
+            if id(node) in built:
+                stack.pop()
+                continue
+            left, right = node.left, node.right
+            pending = False
+            if right is not None and id(right) not in built:
+                stack.append(right)
+                pending = True
+            if left is not None and id(left) not in built:
+                stack.append(left)
+                pending = True
+            if pending:
+                continue
+            stack.pop()
+            built[id(node)] = self.node(
+                node.type, node.operator,
+                built[id(left)] if left is not None else None,
+                built[id(right)] if right is not None else None,
+                node.field, node.value
+            )
+        return built[id(root)]
+
+    def stats(self) -> Dict[str, int]:
+        return {"nodes": len(self._nodes), "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        self._nodes.clear()
+        self.hits = 0
+        self.misses = 0
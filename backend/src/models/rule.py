@@ -1,8 +1,14 @@
+import hashlib
 from datetime import datetime
-from typing import Dict, Optional
-from pydantic import BaseModel, Field
-from pymongo import MongoClient
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Union
+from pydantic import BaseModel, Field, PrivateAttr, computed_field, field_validator
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
 from bson import ObjectId
+from . import ast_codec
+from .ast_node import ASTNode, NodeType
+from .compact_node import CompactNode
 
 class PyObjectId(ObjectId):
     @classmethod
@@ -15,59 +21,192 @@ class PyObjectId(ObjectId):
             raise ValueError("Invalid ObjectId")
         return ObjectId(v)
 
+class RuleMetadata(BaseModel):
+    """Facts about a rule's AST, derived once when the rule is written and stored with it"""
+    fields: List[str]  # Referenced fields, sorted
+    depth: int  # Nesting depth, 1 for a single comparison
+    node_count: int
+    operators: Dict[str, int]  # Occurrences of each operator, e.g. {"AND": 2, ">": 3}
+    # SHA-1 of the binary AST: the same for identical trees however the rule string is spaced
+    fingerprint: str
+
+    @classmethod
+    def from_ast(cls, ast: Union[CompactNode, ASTNode, Dict[str, Any]],
+                 ast_blob: Optional[bytes] = None) -> 'RuleMetadata':
+        """
+        Describes an AST in one walk
+
+        Args:
+            ast: CompactNode, ASTNode or the dict form produced by to_dict
+            ast_blob: The AST already encoded with ast_codec, to skip encoding it again
+        """
+        if isinstance(ast, dict):
+            ast = CompactNode.from_dict(ast)
+        if ast_blob is None:
+            ast_blob = ast_codec.encode(ast)
+        fields = set()
+        operators: Dict[str, int] = {}
+        depth = node_count = 0
+        stack = [(ast, 1)]
+        while stack:
+            node, level = stack.pop()
+            node_count += 1
+            depth = max(depth, level)
+            if node.type == NodeType.COMPARISON and node.field:
+                fields.add(node.field)
+            if node.operator is not None:
+                operators[node.operator.value] = operators.get(node.operator.value, 0) + 1
+            for child in (node.left, node.right):
+                if child is not None:
+                    stack.append((child, level + 1))
+        return cls(fields=sorted(fields), depth=depth, node_count=node_count, operators=operators,
+                   fingerprint=hashlib.sha1(ast_blob).hexdigest())
+
 class Rule(BaseModel):
-    id: Optional[PyObjectId] = Field(alias='_id')
+    id: Optional[str] = Field(default=None, alias='_id')
     name: str
-    description: Optional[str]
+    description: Optional[str] = None
     rule_string: str
-    ast: Dict  # Stores the AST representation
+    # Starts at 1 and grows by one with every update
+    version: int = 1
+    # Set by the database on every write; rules built in memory derive it with describe()
+    metadata: Optional[RuleMetadata] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # Binary AST as stored, decoded straight into CompactNodes on demand
+    _ast_blob: Optional[bytes] = PrivateAttr(default=None)
     
     class Config:
         arbitrary_types_allowed = True
+        populate_by_name = True
         json_encoders = {
             ObjectId: str
         }
 
+    def __init__(self, ast: Dict, **data):
+        super().__init__(**data)
+        self.ast = ast
+
+    @field_validator('id', mode='before')
+    @classmethod
+    def stringify_id(cls, value):
+        # Mongo ObjectIds and SQL integer keys are both exposed as strings
+        return str(value) if value is not None else None
+
+    @computed_field
+    @cached_property
+    def ast(self) -> Dict:
+        """JSON view of the AST; only stored rules start without it, see from_storage"""
+        return ast_codec.decode_dict(self._ast_blob)
+
+    @classmethod
+    def from_storage(cls, ast_blob: bytes, metadata: Union[RuleMetadata, Dict[str, Any], None] = None,
+                     **fields) -> 'Rule':
+        """
+        Builds a rule from a stored row whose AST is in the binary format.
+
+        The blob is the rule's prepared form: it decodes straight into CompactNodes
+        without parsing the rule string, and the stored `metadata` comes along with it.
+        """
+        # Stored fields were validated when written, so skip validation and the default
+        # factories; the dict view of the AST is left out until it is read
+        if isinstance(metadata, dict):
+            metadata = RuleMetadata.model_construct(**metadata)
+        now = datetime.utcnow()
+        values = {"id": None, "description": None, "version": 1, "created_at": now, "updated_at": now}
+        values.update(fields)
+        rule = cls.model_construct(metadata=metadata, **values)
+        rule._ast_blob = bytes(ast_blob)
+        return rule
+
+    def encode_ast(self) -> bytes:
+        """
+        The AST in the binary storage format; also sets `metadata` to match it, so
+        backends call this on every write
+        """
+        ast = CompactNode.from_dict(self.ast)
+        ast_blob = ast_codec.encode(ast)
+        self.metadata = RuleMetadata.from_ast(ast, ast_blob)
+        self._ast_blob = ast_blob
+        return ast_blob
+
+    def describe(self, ast: Optional[CompactNode] = None) -> RuleMetadata:
+        """
+        The stored metadata, derived from the AST for rules stored before it existed
+
+        Args:
+            ast: The rule's AST if the caller already decoded it, so it is not decoded again
+        """
+        if self.metadata is None:
+            self.metadata = RuleMetadata.from_ast(ast or self.compact_ast(), self._ast_blob)
+        return self.metadata
+
+    def compact_ast(self) -> CompactNode:
+        """The rule's AST as CompactNodes, skipping the dict view when possible"""
+        if self._ast_blob is not None:
+            return ast_codec.decode(self._ast_blob)
+        return CompactNode.from_dict(self.ast)
+
+class RuleSet(BaseModel):
+    """A named combination of stored rules, materialized by the API on first use"""
+    id: Optional[str] = Field(default=None, alias='_id')
+    name: str
+    description: Optional[str] = None
+    rule_ids: List[str]
+    strategy: str = "AND"
+
+    class Config:
+        populate_by_name = True
+
+    @field_validator('id', mode='before')
+    @classmethod
+    def stringify_id(cls, value):
+        return str(value) if value is not None else None
+
+class RuleChange(BaseModel):
+    """One entry of the rule change feed"""
+    seq: int  # Position in the feed, increasing with every change
+    rule_id: str
+    version: Optional[int] = None  # The rule's version after the change
+    operation: str  # "create", "update" or "delete"
+
 # MongoDB connection and schema setup
 class Database:
     def __init__(self, connection_string: str):
-        self.client = MongoClient(connection_string)
+        self.client = AsyncIOMotorClient(connection_string)
         self.db = self.client.rule_engine
         self.rules = self.db.rules
-        
-        # Create indexes
-        self.rules.create_index("name", unique=True)
-        self.rules.create_index("created_at")
+
+    async def create_indexes(self):
+        await self.rules.create_index("name", unique=True)
+        await self.rules.create_index("created_at")
         
     async def create_rule(self, rule: Rule) -> Rule:
-        rule_dict = rule.dict(by_alias=True)
-        result = self.rules.insert_one(rule_dict)
+        rule_dict = rule.dict(by_alias=True, exclude={"id"})
+        result = await self.rules.insert_one(rule_dict)
         rule.id = result.inserted_id
         return rule
     
     async def get_rule(self, rule_id: str) -> Optional[Rule]:
-        rule_dict = self.rules.find_one({"_id": ObjectId(rule_id)})
+        rule_dict = await self.rules.find_one({"_id": ObjectId(rule_id)})
         if rule_dict:
             return Rule(**rule_dict)
         return None
     
     async def list_rules(self, skip: int = 0, limit: int = 100):
-        rules = self.rules.find().skip(skip).limit(limit)
-        return [Rule(**rule) for rule in rules]
+        cursor = self.rules.find().skip(skip).limit(limit)
+        return [Rule(**rule) async for rule in cursor]
     
     async def update_rule(self, rule_id: str, rule: Rule) -> Optional[Rule]:
-        rule_dict = rule.dict(exclude={"id"})
+        rule_dict = rule.dict(exclude={"id", "version", "created_at"})
         rule_dict["updated_at"] = datetime.utcnow()
-        result = self.rules.update_one(
+        rule_dict = await self.rules.find_one_and_update(
             {"_id": ObjectId(rule_id)},
-            {"$set": rule_dict}
+            {"$set": rule_dict, "$inc": {"version": 1}},
+            return_document=ReturnDocument.AFTER
         )
-        if result.modified_count:
-            return await self.get_rule(rule_id)
-        return None
+        return Rule(**rule_dict) if rule_dict else None
     
     async def delete_rule(self, rule_id: str) -> bool:
-        result = self.rules.delete_one({"_id": ObjectId(rule_id)})
+        result = await self.rules.delete_one({"_id": ObjectId(rule_id)})
         return result.deleted_count > 0
\ No newline at end of file
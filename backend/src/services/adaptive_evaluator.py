@@ -0,0 +1,181 @@
+from typing import Any, Callable, Dict, List, Optional
+from ..models.ast_node import ASTNode, NodeType, Operator
+from .rule_compiler import CompiledRule, RuleCompiler
+
+
+class _Leaf:
+    """A fixed, compiled subtree; counts every evaluation as one unit of cost"""
+
+    __slots__ = ("node", "_fn", "_counter")
+
+    def __init__(self, node: ASTNode, fn: Callable[[Dict[str, Any]], bool], counter: List[int]):
+        self.node = node
+        self._fn = fn
+        self._counter = counter
+
+    def __call__(self, data: Dict[str, Any]) -> bool:
+        self._counter[0] += 1
+        return self._fn(data)
+
+    def to_ast(self) -> ASTNode:
+        return self.node
+
+    def describe(self) -> Dict[str, Any]:
+        return {"type": "leaf", "ast": self.node.to_dict()}
+
+
+class _Group:
+    """
+    A flattened chain of AND (or OR) children that may be evaluated in any order.
+
+    Per child it keeps [evaluations, passes, cost], where cost is the number of
+    leaves evaluated inside that child.
+    """
+
+    __slots__ = ("operator", "children", "stats", "_counter", "_decisive")
+
+    def __init__(self, operator: Operator, children: List[Any], counter: List[int]):
+        self.operator = operator
+        self.children = children
+        self.stats = [[0, 0, 0] for _ in children]
+        self._counter = counter
+        # The result that ends evaluation early: False for AND, True for OR
+        self._decisive = operator == Operator.OR
+
+    def __call__(self, data: Dict[str, Any]) -> bool:
+        counter = self._counter
+        decisive = self._decisive
+        for child, stat in zip(self.children, self.stats):
+            before = counter[0]
+            result = child(data)
+            stat[0] += 1
+            stat[2] += counter[0] - before
+            if result:
+                stat[1] += 1
+            if bool(result) == decisive:
+                return result
+        return not decisive
+
+    def rank(self, index: int) -> float:
+        """Expected cost per decisive outcome; lower ranks run first"""
+        evaluations, passes, cost = self.stats[index]
+        average_cost = (cost + 1) / (evaluations + 1)
+        # Laplace smoothing keeps unseen or never-decisive children orderable
+        pass_rate = (passes + 1) / (evaluations + 2)
+        decisive_rate = pass_rate if self._decisive else 1 - pass_rate
+        return average_cost / decisive_rate
+
+    def reorder(self):
+        for child in self.children:
+            if isinstance(child, _Group):
+                child.reorder()
+        order = sorted(range(len(self.children)), key=self.rank)
+        self.children = [self.children[i] for i in order]
+        self.stats = [self.stats[i] for i in order]
+
+    def to_ast(self) -> ASTNode:
+        # Left-deep so short-circuit evaluation keeps the learned order
+        result = self.children[0].to_ast()
+        for child in self.children[1:]:
+            # Keep whichever node class (ASTNode or CompactNode) the rule was built from
+            result = type(result)(
+                type=NodeType.OPERATOR,
+                operator=self.operator,
+                left=result,
+                right=child.to_ast()
+            )
+        return result
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "type": "group",
+            "operator": self.operator,
+            "children": [
+                dict(child.describe(), evaluations=stat[0], passes=stat[1], cost=stat[2])
+                for child, stat in zip(self.children, self.stats)
+            ]
+        }
+
+
+class AdaptiveRule:
+    """
+    A short-circuiting rule that learns the order of its commutative AND/OR children.
+
+    Pass rates and costs are collected from live traffic and every
+    `reorder_interval` evaluations the children of each AND/OR chain are sorted so
+    cheap, decisive branches run first. Results are unchanged; which missing-field
+    error surfaces first may change, as with any short-circuit order. `freeze()`
+    stops learning and compiles the learned order into plain closures.
+    """
+
+    def __init__(self, ast: ASTNode, compiler: Optional[RuleCompiler] = None,
+                 reorder_interval: int = 1000):
+        self.compiler = compiler or RuleCompiler()
+        self.reorder_interval = reorder_interval
+        self.evaluations = 0
+        self._counter = [0]
+        self._root = self._build(ast)
+        self._frozen: Optional[CompiledRule] = None
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen is not None
+
+    def __call__(self, data: Dict[str, Any]) -> bool:
+        if self._frozen is not None:
+            return self._frozen(data)
+        self.evaluations += 1
+        if self.evaluations % self.reorder_interval == 0:
+            self.reorder()
+        return self._root(data)
+
+    def evaluate(self, data: Dict[str, Any]) -> bool:
+        return self(data)
+
+    def reorder(self):
+        if isinstance(self._root, _Group):
+            self._root.reorder()
+
+    def learned_ast(self) -> ASTNode:
+        """Returns the AST in the currently learned evaluation order"""
+        return self._root.to_ast()
+
+    def describe(self) -> Dict[str, Any]:
+        """Returns the learned order together with per-child statistics"""
+        return {
+            "evaluations": self.evaluations,
+            "frozen": self.frozen,
+            "leaf_evaluations": self._counter[0],
+            "order": self._root.describe()
+        }
+
+    def freeze(self) -> CompiledRule:
+        """Stops collecting statistics and compiles the learned order"""
+        if self._frozen is None:
+            self._frozen = self.compiler.compile(self.learned_ast())
+        return self._frozen
+
+    def unfreeze(self):
+        self._frozen = None
+
+    def _build(self, node: ASTNode):
+        if (node.type == NodeType.OPERATOR and node.operator in (Operator.AND, Operator.OR)
+                and node.left and node.right):
+            children = [self._build(child) for child in self._collect_chain(node)]
+            return _Group(node.operator, children, self._counter)
+        return _Leaf(node, self.compiler.compile_predicate(node), self._counter)
+
+    @staticmethod
+    def _collect_chain(node: ASTNode) -> List[ASTNode]:
+        """Collects the operands of a chain of the same operator, left to right"""
+        operands = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if (current.type == NodeType.OPERATOR and current.operator == node.operator
+                    and current.left and current.right):
+                stack.append(current.right)
+                stack.append(current.left)
+            else:
+                operands.append(current)
+        return operands
@@ -0,0 +1,196 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set
+import operator as _operator
+import numpy as np
+from ..models.ast_node import ASTNode, NodeType, Operator
+from ..utils.exceptions import RuleEvaluationError
+
+_COMPARATORS = {
+    Operator.GT: _operator.gt,
+    Operator.LT: _operator.lt,
+    Operator.EQ: _operator.eq,
+    Operator.GTE: _operator.ge,
+    Operator.LTE: _operator.le,
+}
+
+_NUMERIC_KINDS = "iufb"
+_STRING_KINDS = "US"
+
+
+class _Categorical:
+    """Sorted categories plus per-row codes for a string column"""
+
+    __slots__ = ("categories", "codes")
+
+    def __init__(self, column: np.ndarray):
+        self.categories, self.codes = np.unique(column, return_inverse=True)
+        self.codes = self.codes.reshape(-1)
+
+    def compare(self, op: Operator, value: str) -> np.ndarray:
+        # Categories are sorted, so every comparison becomes a range test on the codes
+        categories = self.categories
+        if op == Operator.EQ:
+            idx = int(np.searchsorted(categories, value, side="left"))
+            if idx < len(categories) and categories[idx] == value:
+                return self.codes == idx
+            return np.zeros(len(self.codes), dtype=bool)
+        if op == Operator.GT:
+            return self.codes >= np.searchsorted(categories, value, side="right")
+        if op == Operator.GTE:
+            return self.codes >= np.searchsorted(categories, value, side="left")
+        if op == Operator.LT:
+            return self.codes < np.searchsorted(categories, value, side="left")
+        return self.codes < np.searchsorted(categories, value, side="right")
+
+
+class BatchEvaluator:
+    """
+    Evaluates a single rule over many records at once using NumPy.
+
+    Input is columnar (field name -> array). Each COMPARISON becomes a vectorized
+    mask, AND/OR nodes are combined with bitwise operators, and string columns are
+    compared through categorical codes.
+    """
+
+    def evaluate(self, node: ASTNode, columns: Mapping[str, Any]) -> np.ndarray:
+        prepared = {field: self._as_column(values) for field, values in columns.items()}
+        size = self._column_length(prepared)
+        return self._evaluate(node, prepared, size, {})
+
+    def evaluate_records(self, node: ASTNode, records: List[Dict[str, Any]],
+                         fields: Optional[Iterable[str]] = None) -> np.ndarray:
+        """
+        Args:
+            fields: The fields the rule references, e.g. a stored rule's metadata.fields;
+                found by walking the rule when not given
+        """
+        if fields is None:
+            fields = self.referenced_fields(node)
+        return self.evaluate(node, self.to_columns(records, fields))
+
+    @classmethod
+    def to_columns(cls, records: List[Dict[str, Any]],
+                   fields: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """Converts a list of records into columns, once"""
+        if fields is None:
+            fields = sorted({field for record in records for field in record})
+        columns = {}
+        for field in fields:
+            values = []
+            for index, record in enumerate(records):
+                if field not in record:
+                    raise RuleEvaluationError(f"Field not found in data: {field} (record {index})")
+                values.append(record[field])
+            columns[field] = cls._as_column(values)
+        return columns
+
+    @staticmethod
+    def referenced_fields(node: Optional[ASTNode]) -> Set[str]:
+        fields = set()
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current is None:
+                continue
+            if current.type == NodeType.COMPARISON and current.field:
+                fields.add(current.field)
+            stack.append(current.left)
+            stack.append(current.right)
+        return fields
+
+    @staticmethod
+    def _as_column(values: Any) -> np.ndarray:
+        if isinstance(values, np.ndarray):
+            return values
+        values = list(values)
+        kinds = {type(value) for value in values}
+        if kinds <= {str}:
+            return np.array(values, dtype=str)
+        if kinds <= {int, float}:
+            return np.array(values)
+        # Mixed or unsupported types keep Python semantics per element
+        return np.array(values, dtype=object)
+
+    @staticmethod
+    def _column_length(columns: Dict[str, np.ndarray]) -> int:
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise RuleEvaluationError(f"Columns have different lengths: {sorted(lengths)}")
+        return lengths.pop() if lengths else 0
+
+    def _evaluate(self, node: ASTNode, columns: Dict[str, np.ndarray], size: int,
+                  categoricals: Dict[str, _Categorical]) -> np.ndarray:
+        if node.type == NodeType.OPERATOR:
+            if not node.operator:
+                raise RuleEvaluationError("Operator node must have an operator")
+
+            left = (self._evaluate(node.left, columns, size, categoricals)
+                    if node.left else np.zeros(size, dtype=bool))
+            right = (self._evaluate(node.right, columns, size, categoricals)
+                     if node.right else np.zeros(size, dtype=bool))
+
+            if node.operator == Operator.AND:
+                return left & right
+            elif node.operator == Operator.OR:
+                return left | right
+            else:
+                raise RuleEvaluationError(f"Unknown operator: {node.operator}")
+
+        elif node.type == NodeType.COMPARISON:
+            if not node.field or node.field not in columns:
+                raise RuleEvaluationError(f"Field not found in data: {node.field}")
+            if not node.operator:
+                raise RuleEvaluationError("Comparison node must have an operator")
+            if node.operator not in _COMPARATORS:
+                raise RuleEvaluationError(f"Unknown comparison operator: {node.operator}")
+            return self._compare(node, columns[node.field], categoricals)
+
+        elif node.type == NodeType.OPERAND:
+            return np.full(size, bool(node.value), dtype=bool)
+
+        else:
+            raise RuleEvaluationError(f"Unknown node type: {node.type}")
+
+    def _compare(self, node: ASTNode, column: np.ndarray,
+                 categoricals: Dict[str, _Categorical]) -> np.ndarray:
+        value = node.value
+        kind = column.dtype.kind
+
+        if kind in _NUMERIC_KINDS:
+            if isinstance(value, str):
+                return self._mismatched(node, len(column))
+            return np.asarray(_COMPARATORS[node.operator](column, value), dtype=bool)
+
+        if kind in _STRING_KINDS:
+            if not isinstance(value, str):
+                return self._mismatched(node, len(column))
+            categorical = categoricals.get(node.field)
+            if categorical is None:
+                categorical = categoricals[node.field] = _Categorical(column)
+            return categorical.compare(node.operator, value)
+
+        return self._compare_objects(node, column)
+
+    @staticmethod
+    def _mismatched(node: ASTNode, size: int) -> np.ndarray:
+        if node.operator == Operator.EQ:
+            return np.zeros(size, dtype=bool)
+        raise RuleEvaluationError(
+            f"Cannot compare field {node.field} with value {node.value!r} of a different type"
+        )
+
+    @staticmethod
+    def _compare_objects(node: ASTNode, column: np.ndarray) -> np.ndarray:
+        compare = _COMPARATORS[node.operator]
+        value = node.value
+
+        def check(field_value: Any) -> bool:
+            if not isinstance(field_value, (int, float, str)):
+                raise RuleEvaluationError(f"Unsupported data type for field {node.field}")
+            try:
+                return bool(compare(field_value, value))
+            except TypeError:
+                raise RuleEvaluationError(
+                    f"Cannot compare field {node.field} with value {value!r} of a different type"
+                )
+
+        return np.fromiter((check(field_value) for field_value in column), dtype=bool, count=len(column))
@@ -0,0 +1,91 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from ..utils.exceptions import RuleParsingError
+from .parse_cache import ParseCache
+from .rule_parser import RuleParser
+
+# Per-rule parse outcome: the AST as a dict, or the parsing error
+ParseOutcome = Union[Dict[str, Any], RuleParsingError]
+
+
+def _parse_chunk(rule_strings: Sequence[str]) -> List[Tuple[bool, Any]]:
+    """Worker entry point: parses one chunk of rule strings into AST dicts"""
+    parser = RuleParser()
+    outcomes = []
+    for rule_string in rule_strings:
+        try:
+            outcomes.append((True, parser.parse_compact(rule_string).to_dict()))
+        except RuleParsingError as e:
+            outcomes.append((False, (str(e), e.position)))
+    return outcomes
+
+
+class BulkRuleParser:
+    """
+    Parses many rule strings at once for bulk imports.
+
+    Strings already in the parse cache are served from it, and each distinct
+    remaining string is parsed only once. Large imports are split into chunks
+    and parsed on a process pool; smaller ones are parsed in-process through
+    the cache. Pool results are not added to the cache, so one large import
+    does not evict the rules the API is serving.
+    """
+
+    def __init__(self, parse_cache: Optional[ParseCache] = None,
+                 executor: Optional[Callable[[], Executor]] = None,
+                 chunk_size: int = 2000, min_parallel_size: int = 5000):
+        """
+        Args:
+            parse_cache: Cache shared with the other entry points that parse
+            executor: Returns the process pool to parse on, or None to stay in-process
+            chunk_size: Rule strings per pool task
+            min_parallel_size: Smallest number of distinct strings parsed on the pool
+        """
+        self.parse_cache = parse_cache if parse_cache is not None else ParseCache()
+        self.executor = executor
+        self.chunk_size = max(chunk_size, 1)
+        self.min_parallel_size = min_parallel_size
+
+    async def parse_many(self, rule_strings: Sequence[str]) -> List[ParseOutcome]:
+        """
+        Parses rule strings, in parallel when there are enough of them
+
+        Args:
+            rule_strings: Rule strings to parse
+
+        Returns:
+            List[ParseOutcome]: One AST dict or RuleParsingError per string, in input order
+        """
+        distinct = list(dict.fromkeys(rule_strings))
+        parsed: Dict[str, ParseOutcome] = {}
+
+        if self.executor is not None and len(distinct) >= self.min_parallel_size:
+            pending: List[str] = []
+            for rule_string in distinct:
+                ast = self.parse_cache.get(self.parse_cache.key(rule_string))
+                if ast is not None:
+                    parsed[rule_string] = ast.to_dict()
+                else:
+                    pending.append(rule_string)
+            if pending:
+                await self._parse_on_pool(pending, parsed)
+        else:
+            for rule_string in distinct:
+                try:
+                    parsed[rule_string] = self.parse_cache.parse_compact(rule_string).to_dict()
+                except RuleParsingError as e:
+                    parsed[rule_string] = e
+
+        return [parsed[rule_string] for rule_string in rule_strings]
+
+    async def _parse_on_pool(self, rule_strings: List[str], parsed: Dict[str, ParseOutcome]):
+        loop = asyncio.get_running_loop()
+        executor = self.executor()
+        chunks = [rule_strings[i:i + self.chunk_size] for i in range(0, len(rule_strings), self.chunk_size)]
+        results = await asyncio.gather(*(
+            loop.run_in_executor(executor, _parse_chunk, chunk) for chunk in chunks
+        ))
+        for chunk, outcomes in zip(chunks, results):
+            for rule_string, (ok, value) in zip(chunk, outcomes):
+                parsed[rule_string] = value if ok else RuleParsingError(*value)
@@ -0,0 +1,184 @@
+from typing import Any, Callable, Dict, List, Optional, Set
+from ..models.ast_node import ASTNode, Operator
+from ..utils.exceptions import RuleCombiningError
+from .rule_combiner import RuleCombiner
+from .rule_compiler import RuleCompiler
+from .rule_set_evaluator import RuleSetEvaluator
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+
+class MaterializedRuleSet:
+    """
+    A combination of rules kept prepared, which can swap one member in place.
+
+    For AND and OR the combination is stored level by level, exactly as
+    RuleCombiner._combine_with_operator pairs neighbours, together with a compiled
+    closure for every node. When a member rule changes only the nodes on its path
+    to the root are rebuilt and recompiled: ceil(log2(n)) nodes instead of n - 1.
+    OPTIMIZE deduplicates clauses across members, so it is recombined in full.
+
+    With a combiner holding a NodeInterner, members are interned into it and the
+    combination is a DAG. Once members share a subtree, and given a
+    `rule_set_evaluator`, the combined rule is compiled through its memoizing path
+    so each shared subtree runs once per record; this recompiles the whole DAG on
+    every update, at a cost linear in its distinct nodes.
+    """
+
+    def __init__(self, rule_ids: List[str], asts: List[ASTNode], strategy: str = "AND",
+                 predicates: Optional[List[Predicate]] = None,
+                 combiner: Optional[RuleCombiner] = None,
+                 compiler: Optional[RuleCompiler] = None,
+                 rule_set_evaluator: Optional[RuleSetEvaluator] = None):
+        """
+        Args:
+            rule_ids: Member rule IDs, in combination order
+            asts: The member rules' ASTs
+            strategy: AND, OR or OPTIMIZE
+            predicates: Ready evaluation functions for the members, compiled from
+                the ASTs when not given
+            combiner: Scope its interner to this set, as it keeps every node alive
+            rule_set_evaluator: Compiles the combination when members share subtrees
+
+        Raises:
+            RuleCombiningError: If there are no rules or the strategy is unknown
+        """
+        if not rule_ids:
+            raise RuleCombiningError("No rules to combine")
+        if strategy not in ("AND", "OR", "OPTIMIZE"):
+            raise RuleCombiningError(f"Unknown combination strategy: {strategy}")
+        self.rule_ids = list(rule_ids)
+        self.strategy = strategy
+        self.combiner = combiner or RuleCombiner()
+        self.compiler = compiler or RuleCompiler()
+        self.rule_set_evaluator = rule_set_evaluator
+        # Member rules changed since they were last applied with update()
+        self.stale: Set[str] = set()
+        # Nodes built by the last construction or update, for monitoring
+        self.last_rebuilt = 0
+
+        self._positions: Dict[str, List[int]] = {}
+        for position, rule_id in enumerate(self.rule_ids):
+            self._positions.setdefault(rule_id, []).append(position)
+
+        if predicates is None:
+            predicates = [self.compiler.compile_predicate(ast) for ast in asts]
+        self._leaves = [self._intern(ast) for ast in asts]
+        self._leaf_predicates = list(predicates)
+        self._build()
+        self._memoize()
+
+    @property
+    def ast(self) -> ASTNode:
+        """The combined rule"""
+        return self._nodes[-1][0][0]
+
+    def evaluate(self, data: Dict[str, Any]) -> bool:
+        return self._root(data)
+
+    def __call__(self, data: Dict[str, Any]) -> bool:
+        return self._root(data)
+
+    def mark_stale(self, rule_id: str) -> bool:
+        """Records that a member rule changed; returns False if it is not a member"""
+        if rule_id not in self._positions:
+            return False
+        self.stale.add(rule_id)
+        return True
+
+    def update(self, rule_id: str, ast: ASTNode, predicate: Optional[Predicate] = None) -> int:
+        """
+        Replaces a member rule and rebuilds the nodes above it
+
+        Returns:
+            int: Number of combined nodes rebuilt
+        """
+        positions = self._positions.get(rule_id)
+        if positions is None:
+            raise KeyError(rule_id)
+        self.stale.discard(rule_id)
+        if predicate is None:
+            predicate = self.compiler.compile_predicate(ast)
+        ast = self._intern(ast)
+        for position in positions:
+            self._leaves[position] = ast
+            self._leaf_predicates[position] = predicate
+
+        if self.strategy == "OPTIMIZE":
+            self._build()
+            self._memoize()
+            return self.last_rebuilt
+
+        for position in positions:
+            self._nodes[0][position] = (ast, predicate)
+        dirty = set(positions)
+        rebuilt = 0
+        for level in range(len(self._nodes) - 1):
+            below = self._nodes[level]
+            above = self._nodes[level + 1]
+            parents = set()
+            for index in dirty:
+                parent = index // 2
+                if parent in parents:
+                    continue
+                parents.add(parent)
+                if 2 * parent + 1 < len(below):
+                    above[parent] = self._pair(below[2 * parent], below[2 * parent + 1])
+                    rebuilt += 1
+                else:
+                    # The odd node out is carried up unchanged
+                    above[parent] = below[2 * parent]
+            dirty = parents
+        self._root = self._nodes[-1][0][1]
+        self.last_rebuilt = rebuilt
+        self._memoize()
+        return rebuilt
+
+    def _intern(self, ast: ASTNode) -> ASTNode:
+        interner = self.combiner.interner
+        return interner.intern(ast) if interner is not None else ast
+
+    def _memoize(self):
+        """Replaces the composed closures with one memoizing program if members share nodes"""
+        interner = self.combiner.interner
+        if self.rule_set_evaluator is not None and interner is not None and interner.hits:
+            self._root = self.rule_set_evaluator.compile(self.ast)
+
+    def _build(self):
+        if self.strategy == "OPTIMIZE":
+            ast = self.combiner.combine_rules(self._leaves, "OPTIMIZE")
+            if len(self._leaves) == 1:
+                predicate = self._leaf_predicates[0]
+            else:
+                predicate = self.compiler.compile_predicate(ast)
+            self._nodes = [[(ast, predicate)]]
+            self._root = predicate
+            self.last_rebuilt = len(self._leaves) - 1
+            return
+
+        self._operator = Operator.AND if self.strategy == "AND" else Operator.OR
+        level = list(zip(self._leaves, self._leaf_predicates))
+        self._nodes = [level]
+        rebuilt = 0
+        while len(level) > 1:
+            paired = [self._pair(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+            rebuilt += len(paired)
+            if len(level) % 2:
+                paired.append(level[-1])
+            level = paired
+            self._nodes.append(level)
+        self._root = level[0][1]
+        self.last_rebuilt = rebuilt
+
+    def _pair(self, left: tuple, right: tuple) -> tuple:
+        left_ast, left_predicate = left
+        right_ast, right_predicate = right
+        node = self.combiner._operator_node(type(left_ast), self._operator, left_ast, right_ast)
+        if self._operator == Operator.AND:
+            def and_(data: Dict[str, Any]) -> bool:
+                return left_predicate(data) and right_predicate(data)
+            return (node, and_)
+
+        def or_(data: Dict[str, Any]) -> bool:
+            return left_predicate(data) or right_predicate(data)
+        return (node, or_)
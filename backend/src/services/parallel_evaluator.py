@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import json
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from ..models.ast_node import ASTNode
+from ..models.compact_node import CompactNode
+from .rule_compiler import RuleCompiler
+
+# Per-record outcome: True/False, or {"error": message}
+Outcome = Any
+
+# Compiled rules cached inside each worker process, keyed by rule fingerprint
+_worker_rules: Dict[str, Callable[[Dict[str, Any]], bool]] = {}
+_MISSING_RULE = "__missing_rule__"
+
+
+def _evaluate_records(evaluate: Callable[[Dict[str, Any]], bool], records: Sequence[Any]) -> List[Outcome]:
+    """Evaluates records one by one, turning each failure into an error outcome"""
+    outcomes = []
+    for record in records:
+        try:
+            if not isinstance(record, dict):
+                raise TypeError("Record must be a JSON object")
+            outcomes.append(evaluate(record))
+        except Exception as e:
+            outcomes.append({"error": str(e)})
+    return outcomes
+
+
+def _evaluate_chunk(rule_key: str, records: Sequence[Any],
+                    payload: Optional[Dict[str, Any]] = None):
+    """
+    Worker entry point: evaluates one chunk of records.
+
+    The rule is compiled once per worker and cached under its key. Once the parent
+    knows every worker holds the rule it stops sending the payload; a worker that
+    still lacks it (for example after a restart) answers with a marker instead.
+    """
+    evaluate = _worker_rules.get(rule_key)
+    if evaluate is None:
+        if payload is None:
+            return os.getpid(), _MISSING_RULE
+        if len(_worker_rules) >= 1024:
+            _worker_rules.clear()
+        evaluate = _worker_rules[rule_key] = RuleCompiler().compile(CompactNode.from_dict(payload))
+    return os.getpid(), _evaluate_records(evaluate, records)
+
+
+class ParallelEvaluator:
+    """
+    Evaluates large batches of records across a ProcessPoolExecutor.
+
+    Records are split into chunks, each rule is compiled once per worker process
+    and cached there, chunks are evaluated in parallel and the results are
+    reassembled in input order. Batches smaller than `min_parallel_size` are
+    evaluated in-process and never pay process overhead.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: int = 5000,
+                 min_parallel_size: int = 20000, compiler: Optional[RuleCompiler] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = max(chunk_size, 1)
+        self.min_parallel_size = min_parallel_size
+        self.compiler = compiler or RuleCompiler()
+        self._executor: Optional[Executor] = None
+        # Worker PIDs known to hold each rule, keyed by rule fingerprint
+        self._installed: Dict[str, Set[int]] = {}
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self._installed.clear()
+
+    @classmethod
+    def rule_key(cls, ast: ASTNode) -> Tuple[str, Dict[str, Any]]:
+        """Returns a stable fingerprint for a rule together with its JSON payload"""
+        payload = cls.rule_payload(ast)
+        digest = hashlib.sha1(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+        return digest, payload
+
+    @staticmethod
+    def rule_payload(ast: ASTNode) -> Dict[str, Any]:
+        """The rule as plain JSON data, as shipped to workers"""
+        return json.loads(json.dumps(ast.to_dict()))
+
+    def chunks(self, records: Sequence[Any]) -> List[Sequence[Any]]:
+        return [records[i:i + self.chunk_size] for i in range(0, len(records), self.chunk_size)]
+
+    def evaluate(self, ast: ASTNode, records: Sequence[Any],
+                 evaluate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                 key: Optional[str] = None) -> List[Outcome]:
+        """
+        Evaluates records synchronously, in parallel when the batch is large enough
+
+        Args:
+            ast: Rule to evaluate
+            records: Records to evaluate, in order
+            evaluate: Already-prepared evaluation function for the in-process fast path
+            key: The rule's stored fingerprint; the payload is then only built while
+                some worker still needs it
+
+        Returns:
+            List[Outcome]: One outcome per record, in input order
+        """
+        if len(records) < self.min_parallel_size:
+            return self._evaluate_local(ast, records, evaluate)
+
+        key, payload = self.rule_key(ast) if key is None else (key, None)
+        chunks = self.chunks(records)
+        shipped = self._payload(key, ast, payload)
+        futures = [self.executor.submit(_evaluate_chunk, key, chunk, shipped) for chunk in chunks]
+        results = []
+        for future, chunk in zip(futures, chunks):
+            outcomes = self._collect(key, future.result())
+            if outcomes is None:
+                payload = payload or self.rule_payload(ast)
+                outcomes = self._collect(key, self.executor.submit(_evaluate_chunk, key, chunk, payload).result())
+            results.extend(outcomes)
+        return results
+
+    async def evaluate_async(self, ast: ASTNode, records: Sequence[Any],
+                             evaluate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                             key: Optional[str] = None) -> List[Outcome]:
+        """Same as evaluate, without blocking the event loop while workers run"""
+        if len(records) < self.min_parallel_size:
+            return self._evaluate_local(ast, records, evaluate)
+
+        loop = asyncio.get_running_loop()
+        key, payload = self.rule_key(ast) if key is None else (key, None)
+        shipped = self._payload(key, ast, payload)
+
+        async def run(chunk: Sequence[Any]) -> List[Outcome]:
+            result = await loop.run_in_executor(self.executor, _evaluate_chunk, key, chunk, shipped)
+            outcomes = self._collect(key, result)
+            if outcomes is None:
+                result = await loop.run_in_executor(self.executor, _evaluate_chunk, key, chunk,
+                                                    payload or self.rule_payload(ast))
+                outcomes = self._collect(key, result)
+            return outcomes
+
+        results = []
+        for outcomes in await asyncio.gather(*(run(chunk) for chunk in self.chunks(records))):
+            results.extend(outcomes)
+        return results
+
+    def _payload(self, key: str, ast: ASTNode,
+                 payload: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Only ship the rule while some worker may not have it yet"""
+        if len(self._installed.get(key, ())) >= self.max_workers:
+            return None
+        return payload if payload is not None else self.rule_payload(ast)
+
+    def _collect(self, key: str, result: Tuple[int, Any]) -> Optional[List[Outcome]]:
+        pid, outcomes = result
+        if outcomes == _MISSING_RULE:
+            self._installed.get(key, set()).discard(pid)
+            return None
+        if len(self._installed) > 1024 and key not in self._installed:
+            self._installed.clear()
+        self._installed.setdefault(key, set()).add(pid)
+        return outcomes
+
+    def _evaluate_local(self, ast: ASTNode, records: Sequence[Any],
+                        evaluate: Optional[Callable[[Dict[str, Any]], bool]]) -> List[Outcome]:
+        return _evaluate_records(evaluate or self.compiler.compile(ast), records)
@@ -0,0 +1,50 @@
+from typing import Optional
+from ..models.ast_node import ASTNode
+from ..models.compact_node import CompactNode
+from ..utils.helpers import RuleHelper
+from ..utils.lru_cache import LRUCache
+from .rule_parser import RuleParser
+
+
+class ParseCache(LRUCache):
+    """
+    LRU cache of parsed rule strings keyed by their normalized text.
+
+    Rule strings that differ only in whitespace share one entry. Entries are
+    stored as CompactNode trees. `parse` builds a fresh ASTNode from the entry,
+    so callers that mutate their AST cannot corrupt the cache. `parse_compact`
+    hands out the shared entry itself for internal, read-only use. Strings that
+    fail to parse are not cached.
+    """
+
+    def __init__(self, parser: Optional[RuleParser] = None, maxsize: int = 1024,
+                 ttl: Optional[float] = None):
+        super().__init__(maxsize, ttl)
+        self.parser = parser or RuleParser()
+
+    @staticmethod
+    def key(rule_string: str) -> str:
+        """Cache key of a rule string: its normalized text"""
+        return RuleHelper.format_rule_string(rule_string)
+
+    def parse(self, rule_string: str) -> ASTNode:
+        """
+        Parses a rule string, reusing the AST of an equivalent earlier string
+
+        Args:
+            rule_string: Rule string to parse
+
+        Returns:
+            ASTNode: Root of a private copy of the parsed AST
+        """
+        return self.parse_compact(rule_string).to_ast()
+
+    def parse_compact(self, rule_string: str) -> CompactNode:
+        """Same as parse, but returns the shared cached tree; do not mutate it"""
+        key = self.key(rule_string)
+        ast = self.get(key)
+        if ast is None:
+            # Parse the original text so error positions match what the client sent
+            ast = self.parser.parse_compact(rule_string)
+            self.set(key, ast)
+        return ast
@@ -0,0 +1,69 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from ..models.compact_node import CompactNode
+from ..utils.lru_cache import LRUCache
+
+
+class PreparedRule:
+    """A stored rule with its AST decoded and its evaluation function ready"""
+
+    __slots__ = ("rule", "ast", "evaluate")
+
+    def __init__(self, rule: Any, ast: CompactNode, evaluate: Callable[[Dict[str, Any]], bool]):
+        self.rule = rule
+        self.ast = ast
+        self.evaluate = evaluate
+
+
+class RuleCache(LRUCache):
+    """
+    LRU cache of prepared rules keyed by rule ID.
+
+    Entries are dropped through `invalidate(rule_id)`, which the database layer
+    calls whenever a rule changes, so repeat lookups never touch the database.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        super().__init__(maxsize, ttl)
+        self._generation = 0
+
+    async def get_or_load(self, rule_id: str,
+                          load: Callable[[str], Awaitable[Optional[Any]]],
+                          prepare: Callable[[Any], PreparedRule]) -> Optional[PreparedRule]:
+        prepared = self.get(rule_id)
+        if prepared is not None:
+            return prepared
+
+        generation = self._generation
+        rule = await load(rule_id)
+        if rule is None:
+            return None
+        prepared = prepare(rule)
+        # Skip caching if an invalidation raced with the load
+        if generation == self._generation:
+            self.set(rule_id, prepared)
+        return prepared
+
+    async def get_many_or_load(self, rule_ids: List[str],
+                               load_many: Callable[[List[str]], Awaitable[List[Optional[Any]]]],
+                               prepare: Callable[[Any], PreparedRule]) -> List[Optional[PreparedRule]]:
+        """Like get_or_load for several IDs, loading every miss with a single load_many call"""
+        prepared = {rule_id: self.get(rule_id) for rule_id in dict.fromkeys(rule_ids)}
+        missing = [rule_id for rule_id, entry in prepared.items() if entry is None]
+        if missing:
+            generation = self._generation
+            rules = await load_many(missing)
+            for rule_id, rule in zip(missing, rules):
+                if rule is None:
+                    continue
+                entry = prepared[rule_id] = prepare(rule)
+                if generation == self._generation:
+                    self.set(rule_id, entry)
+        return [prepared[rule_id] for rule_id in rule_ids]
+
+    def invalidate(self, key) -> bool:
+        self._generation += 1
+        return super().invalidate(key)
+
+    def clear(self):
+        self._generation += 1
+        super().clear()
@@ -1,12 +1,21 @@
-from typing import List, Dict, Counter, Set
+from typing import List, Dict, Counter, Optional, Set
 from collections import Counter
 from ..models.ast_node import ASTNode, NodeType, Operator
+from ..models.node_interner import NodeInterner
 from ..utils.exceptions import RuleCombiningError
 
 class RuleCombiner:
+    def __init__(self, interner: Optional[NodeInterner] = None):
+        # With an interner, inputs and results are canonical CompactNodes: clauses
+        # shared between rules become one node and the result is a DAG
+        self.interner = interner
+
     def combine_rules(self, rules: List[ASTNode], strategy: str = "AND") -> ASTNode:
         if not rules:
             raise RuleCombiningError("No rules to combine")
+
+        if self.interner is not None:
+            rules = [self.interner.intern(rule) for rule in rules]
             
         if len(rules) == 1:
             return rules[0]
@@ -20,110 +29,102 @@ class RuleCombiner:
             raise RuleCombiningError(f"Unknown combination strategy: {strategy}")
 
     def _combine_with_operator(self, rules: List[ASTNode], operator: Operator) -> ASTNode:
-        result = rules[0]
-        for rule in rules[1:]:
-            result = ASTNode(
-                type=NodeType.OPERATOR,
-                operator=operator,
-                left=result,
-                right=rule
-            )
-        return result
-
-    def _analyze_node(self, node: ASTNode, operator_count: Counter, 
-                     comparison_groups: Dict[str, List[ASTNode]], visited: Set[int] = None):
-        if visited is None:
-            visited = set()
-            
-        # Avoid circular references
-        node_id = id(node)
-        if node_id in visited:
-            return
-        visited.add(node_id)
-
-        if node.type == NodeType.OPERATOR:
-            operator_count[node.operator] += 1
-            if node.left:
-                self._analyze_node(node.left, operator_count, comparison_groups, visited)
-            if node.right:
-                self._analyze_node(node.right, operator_count, comparison_groups, visited)
-        elif node.type == NodeType.COMPARISON and node.field:
-            if node.field not in comparison_groups:
-                comparison_groups[node.field] = []
-            comparison_groups[node.field].append(node)
+        """
+        Joins rules under a balanced tree of one operator
+
+        AND and OR are associative, so pairing neighbours level by level gives the
+        same result as a left-deep chain with depth ceil(log2(n)) instead of n - 1.
+        """
+        # Build nodes of the caller's class: ASTNode at the API, CompactNode internally
+        node_class = type(rules[0])
+        level = list(rules)
+        while len(level) > 1:
+            paired = [
+                self._operator_node(node_class, operator, level[i], level[i + 1])
+                for i in range(0, len(level) - 1, 2)
+            ]
+            if len(level) % 2:
+                paired.append(level[-1])
+            level = paired
+        return level[0]
+
+    def _operator_node(self, node_class: type, operator: Operator, left: ASTNode, right: ASTNode) -> ASTNode:
+        if self.interner is not None:
+            return self.interner.node(NodeType.OPERATOR, operator, left, right)
+        return node_class(type=NodeType.OPERATOR, operator=operator, left=left, right=right)
 
     def _optimize_combination(self, rules: List[ASTNode]) -> ASTNode:
+        """
+        Combines rules with the operator used most often inside them (AND on a tie or
+        when there is none), in time linear in the total node count.
+
+        The top-level chains of that operator are flattened into one list of clauses
+        and duplicate clauses are dropped (x AND x is x), then the rest are joined in
+        a balanced tree. Clauses keep their left-to-right order, so short-circuiting,
+        and with it which missing-field error a record raises, is unchanged.
+        """
         operator_count = Counter()
-        comparison_groups: Dict[str, List[ASTNode]] = {}
-        
-        # Analyze all rules
+        seen: Set[int] = set()
+        stack = list(rules)
+        while stack:
+            node = stack.pop()
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            if node.type == NodeType.OPERATOR:
+                operator_count[node.operator] += 1
+                if node.left is not None:
+                    stack.append(node.left)
+                if node.right is not None:
+                    stack.append(node.right)
+
+        operator = Operator.AND
+        if operator_count[Operator.OR] > operator_count[Operator.AND]:
+            operator = Operator.OR
+
+        # Structural duplicates share one canonical node in a scratch interner
+        keys = self.interner if self.interner is not None else NodeInterner()
+        clauses: Dict[int, ASTNode] = {}
         for rule in rules:
-            self._analyze_node(rule, operator_count, comparison_groups)
-        
-        # Optimize common field comparisons
-        optimized_nodes = []
-        
-        # Group comparisons by field
-        for field, comparisons in comparison_groups.items():
-            if len(comparisons) > 1:
-                # Combine comparisons with OR if they're for the same field
-                optimized_nodes.append(self._combine_with_operator(comparisons, Operator.OR))
-            else:
-                optimized_nodes.extend(comparisons)
-        
-        # If we have any nodes that weren't part of field groups, add them
-        remaining_nodes = [rule for rule in rules if not any(
-            id(rule) == id(node) for node in sum(comparison_groups.values(), [])
-        )]
-        optimized_nodes.extend(remaining_nodes)
-        
-        # Use most common operator for final combination
-        most_common_op = operator_count.most_common(1)[0][0] if operator_count else Operator.AND
-        
-        return self._combine_with_operator(optimized_nodes, most_common_op)
+            for clause in self._collect_same_operator_nodes(rule, operator):
+                clauses.setdefault(id(keys.intern(clause)), clause)
+        return self._combine_with_operator(list(clauses.values()), operator)
 
     def simplify_ast(self, node: ASTNode) -> ASTNode:
-        """Simplifies the AST by removing redundant nodes and combining similar operations"""
+        """
+        Simplifies the AST by flattening chains of the same operator into balanced trees
+
+        Returns a new tree; the input is not modified.
+        """
         if not node:
             return node
-            
-        if node.type == NodeType.OPERATOR:
-            node.left = self.simplify_ast(node.left)
-            node.right = self.simplify_ast(node.right)
-            
-            # Simplify nested operators of the same type
-            if (node.left and node.left.type == NodeType.OPERATOR and 
-                node.left.operator == node.operator):
-                node = self._flatten_operator(node)
-                
-        return node
-
-    def _flatten_operator(self, node: ASTNode) -> ASTNode:
-        """Flattens nested operators of the same type"""
-        if not node or node.type != NodeType.OPERATOR:
-            return node
-            
-        nodes = self._collect_same_operator_nodes(node)
-        return self._combine_with_operator(nodes, node.operator)
 
-    def _collect_same_operator_nodes(self, node: ASTNode) -> List[ASTNode]:
-        """Collects all nodes connected by the same operator"""
-        if not node or node.type != NodeType.OPERATOR:
-            return [node]
-            
+        if node.type != NodeType.OPERATOR or node.operator not in (Operator.AND, Operator.OR):
+            return self.interner.intern(node) if self.interner is not None else node
+
+        if node.left is None or node.right is None:
+            # Keep nodes with a missing child as they are, the evaluator treats them specially
+            return self._rebuild_operator(node, self.simplify_ast(node.left), self.simplify_ast(node.right))
+
+        operands = [self.simplify_ast(child) for child in self._collect_same_operator_nodes(node, node.operator)]
+        return self._combine_with_operator(operands, node.operator)
+
+    def _rebuild_operator(self, node: ASTNode, left: ASTNode, right: ASTNode) -> ASTNode:
+        if self.interner is not None:
+            return self.interner.node(node.type, node.operator, left, right, node.field, node.value)
+        return type(node)(type=node.type, operator=node.operator, left=left, right=right,
+                          field=node.field, value=node.value)
+
+    def _collect_same_operator_nodes(self, node: ASTNode, operator: Operator) -> List[ASTNode]:
+        """Collects, left to right, the operands of the chain of `operator` rooted at node"""
         nodes = []
-        if node.left:
-            if (node.left.type == NodeType.OPERATOR and 
-                node.left.operator == node.operator):
-                nodes.extend(self._collect_same_operator_nodes(node.left))
-            else:
-                nodes.append(node.left)
-                
-        if node.right:
-            if (node.right.type == NodeType.OPERATOR and 
-                node.right.operator == node.operator):
-                nodes.extend(self._collect_same_operator_nodes(node.right))
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if (current.type == NodeType.OPERATOR and current.operator == operator
+                    and current.left is not None and current.right is not None):
+                stack.append(current.right)
+                stack.append(current.left)
             else:
-                nodes.append(node.right)
-                
-        return nodes
\ No newline at end of file
+                nodes.append(current)
+        return nodes
@@ -0,0 +1,151 @@
+from typing import Any, Callable, Dict, Optional
+import operator as _operator
+from ..models.ast_node import ASTNode, NodeType, Operator
+from ..utils.exceptions import RuleEvaluationError
+from .rule_evaluator import RuleEvaluator
+
+Predicate = Callable[[Dict[str, Any]], bool]
+
+_COMPARATORS = {
+    Operator.GT: _operator.gt,
+    Operator.LT: _operator.lt,
+    Operator.EQ: _operator.eq,
+    Operator.GTE: _operator.ge,
+    Operator.LTE: _operator.le,
+}
+
+_SUPPORTED_TYPES = (int, float, str)
+
+
+class CompiledRule:
+    """A rule AST compiled once into a specialized Python callable"""
+
+    __slots__ = ("ast", "_fn", "_reference")
+
+    def __init__(self, ast: ASTNode, fn: Predicate, reference: Optional[RuleEvaluator] = None):
+        self.ast = ast
+        self._fn = fn
+        self._reference = reference or RuleEvaluator()
+
+    def __call__(self, data: Dict[str, Any]) -> bool:
+        return self._fn(data)
+
+    def evaluate(self, data: Dict[str, Any]) -> bool:
+        return self._fn(data)
+
+    def evaluate_reference(self, data: Dict[str, Any]) -> bool:
+        """Evaluates the rule with the tree-walking interpreter"""
+        return self._reference.evaluate(self.ast, data)
+
+    def cross_check(self, data: Dict[str, Any]) -> bool:
+        """
+        Evaluates the rule in both compiled and reference mode and verifies they agree
+
+        Raises:
+            RuleEvaluationError: If the two modes disagree on the result or on the error raised
+        """
+        compiled_error = reference_error = None
+        compiled = reference = None
+        try:
+            compiled = self._fn(data)
+        except Exception as e:
+            compiled_error = e
+        try:
+            reference = self.evaluate_reference(data)
+        except Exception as e:
+            reference_error = e
+
+        outcome = (compiled, type(compiled_error), str(compiled_error))
+        expected = (reference, type(reference_error), str(reference_error))
+        if outcome != expected:
+            raise RuleEvaluationError(
+                f"Compiled rule disagrees with reference evaluator: {outcome} != {expected}"
+            )
+        if compiled_error is not None:
+            raise compiled_error
+        return compiled
+
+
+class RuleCompiler:
+    """
+    Compiles ASTs into flat closures with operators, constants and field names bound in.
+
+    Compiled rules give the same results and raise the same RuleEvaluationError
+    messages as RuleEvaluator.evaluate, which stays available as the reference mode.
+    """
+
+    def __init__(self, evaluator: Optional[RuleEvaluator] = None):
+        self.evaluator = evaluator or RuleEvaluator()
+
+    def compile(self, node: ASTNode) -> CompiledRule:
+        return CompiledRule(node, self._compile_node(node), self.evaluator)
+
+    def compile_predicate(self, node: ASTNode) -> Predicate:
+        """Compiles a node into a bare closure, without the CompiledRule wrapper"""
+        return self._compile_node(node)
+
+    def _compile_node(self, node: ASTNode) -> Predicate:
+        if node.type == NodeType.OPERATOR:
+            return self._compile_operator(node)
+        elif node.type == NodeType.COMPARISON:
+            return self._compile_comparison(node)
+        elif node.type == NodeType.OPERAND:
+            constant = bool(node.value)
+            return lambda data: constant
+        return self._fallback(node)
+
+    def _fallback(self, node: ASTNode) -> Predicate:
+        """Defers malformed nodes to the interpreter so errors surface at evaluation time"""
+        evaluate = self.evaluator.evaluate
+
+        def interpret(data: Dict[str, Any]) -> bool:
+            return evaluate(node, data)
+        return interpret
+
+    def _compile_operator(self, node: ASTNode) -> Predicate:
+        if node.operator not in (Operator.AND, Operator.OR):
+            return self._fallback(node)
+
+        left = self._compile_node(node.left) if node.left else None
+        right = self._compile_node(node.right) if node.right else None
+
+        if left is None or right is None:
+            child = left or right
+            if child is None:
+                return lambda data: False
+            if node.operator == Operator.AND:
+                if left is None:
+                    return lambda data: False
+
+                def and_missing(data: Dict[str, Any]) -> bool:
+                    return child(data) and False
+                return and_missing
+            return child
+
+        if node.operator == Operator.AND:
+            def and_(data: Dict[str, Any]) -> bool:
+                return left(data) and right(data)
+            return and_
+
+        def or_(data: Dict[str, Any]) -> bool:
+            return left(data) or right(data)
+        return or_
+
+    def _compile_comparison(self, node: ASTNode) -> Predicate:
+        field = node.field
+        if not field or node.operator not in _COMPARATORS:
+            return self._fallback(node)
+
+        compare = _COMPARATORS[node.operator]
+        value = node.value
+        missing_message = f"Field not found in data: {field}"
+        type_message = f"Unsupported data type for field {field}"
+
+        def comparison(data: Dict[str, Any]) -> bool:
+            if field not in data:
+                raise RuleEvaluationError(missing_message)
+            field_value = data[field]
+            if not isinstance(field_value, _SUPPORTED_TYPES):
+                raise RuleEvaluationError(type_message)
+            return compare(field_value, value)
+        return comparison
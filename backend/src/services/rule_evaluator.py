@@ -8,13 +8,13 @@ class RuleEvaluator:
             if not node.operator:
                 raise RuleEvaluationError("Operator node must have an operator")
                 
-            left_result = self.evaluate(node.left, data) if node.left else False
-            right_result = self.evaluate(node.right, data) if node.right else False
-            
+            # Short-circuit: the right child only runs when the left one does not decide
             if node.operator == Operator.AND:
-                return left_result and right_result
+                return ((self.evaluate(node.left, data) if node.left else False) and
+                        (self.evaluate(node.right, data) if node.right else False))
             elif node.operator == Operator.OR:
-                return left_result or right_result
+                return ((self.evaluate(node.left, data) if node.left else False) or
+                        (self.evaluate(node.right, data) if node.right else False))
             else:
                 raise RuleEvaluationError(f"Unknown operator: {node.operator}")
                 
@@ -44,6 +44,10 @@ class RuleEvaluator:
                 return field_value <= node.value
             else:
                 raise RuleEvaluationError(f"Unknown comparison operator: {node.operator}")
+
+        elif node.type == NodeType.OPERAND:
+            # Constant branch, as folded by the rule optimizer
+            return bool(node.value)
                 
         else:
             raise RuleEvaluationError(f"Unknown node type: {node.type}")
\ No newline at end of file
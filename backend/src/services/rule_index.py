@@ -0,0 +1,209 @@
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from ..models.ast_node import ASTNode, NodeType, Operator
+from .rule_compiler import RuleCompiler
+
+_ORDERED = (Operator.GT, Operator.GTE, Operator.LT, Operator.LTE)
+
+
+class _NotIndexable(Exception):
+    """Raised while building the DNF of a rule the index cannot represent"""
+
+
+class _SortedThresholds:
+    """Thresholds of one (field, operator, value domain) kept sorted for bisection"""
+
+    __slots__ = ("values", "predicates")
+
+    def __init__(self, entries: List[Tuple[Any, int]]):
+        entries.sort(key=lambda entry: entry[0])
+        self.values = [value for value, _ in entries]
+        self.predicates = [predicate for _, predicate in entries]
+
+    def satisfied(self, operator: Operator, value: Any) -> List[int]:
+        # field > t holds for every t < value, field < t for every t > value, ...
+        if operator == Operator.GT:
+            return self.predicates[:bisect_left(self.values, value)]
+        if operator == Operator.GTE:
+            return self.predicates[:bisect_right(self.values, value)]
+        if operator == Operator.LT:
+            return self.predicates[bisect_right(self.values, value):]
+        return self.predicates[bisect_left(self.values, value):]
+
+
+class _FieldIndex:
+    __slots__ = ("equality", "ordered")
+
+    def __init__(self):
+        # value -> predicate ids for "field = value"
+        self.equality: Dict[Any, List[int]] = {}
+        # (operator, domain) -> sorted thresholds, domain is "num" or "str"
+        self.ordered: Dict[Tuple[Operator, str], _SortedThresholds] = {}
+
+
+class RuleMatchIndex:
+    """
+    Answers "which rules accept this record" without evaluating every rule.
+
+    Each rule is rewritten into disjunctive normal form over its comparisons.
+    Every conjunction is filed under one access comparison (an equality when it
+    has one, otherwise a threshold), and access comparisons are indexed per
+    field: equality constants in a hash map, thresholds in sorted lists. Matching
+    a record costs one hash lookup and one bisection per indexed field, plus a
+    direct check of the remaining comparisons of the candidate conjunctions, so
+    it grows logarithmically with the number of rules rather than linearly.
+
+    Rules whose DNF would exceed `max_terms` conjunctions, or that contain nodes
+    the index cannot represent, are evaluated directly instead. Either way a
+    record that lacks a field or has an unsupported value simply fails the
+    comparisons on that field, so a rule matches the same records whichever
+    path it takes.
+    """
+
+    def __init__(self, rules: Dict[str, ASTNode], max_terms: int = 64,
+                 compiler: Optional[RuleCompiler] = None):
+        self.max_terms = max_terms
+        self.compiler = compiler or RuleCompiler()
+        self._access_ids: Dict[Tuple, int] = {}
+        # access predicate id -> [(rule id, remaining checks)]
+        self._candidates: List[List[Tuple[str, Tuple[Callable, ...]]]] = []
+        self._checks: Dict[Tuple, Callable[[Dict[str, Any]], bool]] = {}
+        self._fallback: Dict[str, Callable[[Dict[str, Any]], bool]] = {}
+        self._fields: Dict[str, _FieldIndex] = {}
+        self._indexed_rules = set()
+
+        pending: Dict[Tuple[str, Tuple[Operator, str]], List[Tuple[Any, int]]] = {}
+        for rule_id, ast in rules.items():
+            try:
+                terms = self._dnf(ast)
+            except _NotIndexable:
+                self._fallback[rule_id] = self._fallback_predicate(ast)
+                continue
+            self._indexed_rules.add(rule_id)
+            for term in terms:
+                self._add_conjunction(rule_id, term, pending)
+
+        for (field, key), entries in pending.items():
+            self._fields[field].ordered[key] = _SortedThresholds(entries)
+
+    @property
+    def indexed_rule_count(self) -> int:
+        return len(self._indexed_rules)
+
+    @property
+    def fallback_rule_count(self) -> int:
+        return len(self._fallback)
+
+    def match(self, data: Dict[str, Any]) -> List[str]:
+        """Returns the IDs of the rules that evaluate to True for the record"""
+        matched = set()
+        candidates = self._candidates
+
+        for field, index in self._fields.items():
+            if field not in data:
+                continue
+            value = data[field]
+            # NaN fails every comparison, but would bisect as if it passed all of them
+            if not isinstance(value, (int, float, str)) or value != value:
+                continue
+            satisfied = list(index.equality.get(value, ()))
+            domain = "str" if isinstance(value, str) else "num"
+            for (operator, key_domain), thresholds in index.ordered.items():
+                if key_domain == domain:
+                    satisfied.extend(thresholds.satisfied(operator, value))
+
+            for access in satisfied:
+                for rule_id, checks in candidates[access]:
+                    if rule_id in matched:
+                        continue
+                    for check in checks:
+                        if not check(data):
+                            break
+                    else:
+                        matched.add(rule_id)
+
+        for rule_id, evaluate in self._fallback.items():
+            if evaluate(data):
+                matched.add(rule_id)
+        return sorted(matched)
+
+    def _dnf(self, node: Optional[ASTNode]) -> List[List[ASTNode]]:
+        """Disjunctive normal form as a list of conjunctions of comparison nodes"""
+        if node is None:
+            return []
+        if node.type == NodeType.COMPARISON:
+            if not node.field or node.operator not in _ORDERED + (Operator.EQ,):
+                raise _NotIndexable()
+            if not isinstance(node.value, (int, float, str)) or node.value != node.value:
+                raise _NotIndexable()
+            return [[node]]
+        if node.type != NodeType.OPERATOR or node.operator not in (Operator.AND, Operator.OR):
+            raise _NotIndexable()
+
+        left = self._dnf(node.left)
+        right = self._dnf(node.right)
+        if node.operator == Operator.OR:
+            terms = left + right
+        else:
+            terms = [a + b for a in left for b in right]
+        if len(terms) > self.max_terms:
+            raise _NotIndexable()
+        return terms
+
+    @staticmethod
+    def _key(node: ASTNode) -> Tuple:
+        return (node.field, node.operator, type(node.value).__name__, node.value)
+
+    def _add_conjunction(self, rule_id: str, term: List[ASTNode], pending: Dict):
+        nodes = {self._key(node): node for node in term}
+        # Equalities are the most selective access path
+        access = next((key for key in nodes if key[1] == Operator.EQ), next(iter(nodes)))
+        checks = tuple(self._check(key, node) for key, node in nodes.items() if key != access)
+        self._candidates[self._access_id(access, pending)].append((rule_id, checks))
+
+    def _check(self, key: Tuple, node: ASTNode) -> Callable[[Dict[str, Any]], bool]:
+        check = self._checks.get(key)
+        if check is None:
+            check = self._checks[key] = self._guarded(self.compiler.compile_predicate(node))
+        return check
+
+    @staticmethod
+    def _guarded(predicate: Callable[[Dict[str, Any]], bool]) -> Callable[[Dict[str, Any]], bool]:
+        """The predicate with evaluation errors, like a missing field, counted as False"""
+        def check(data: Dict[str, Any]) -> bool:
+            try:
+                return predicate(data)
+            except Exception:
+                return False
+        return check
+
+    def _fallback_predicate(self, node: ASTNode) -> Callable[[Dict[str, Any]], bool]:
+        """Evaluates a rule kept out of the index with the index's semantics per comparison"""
+        if node.type == NodeType.OPERATOR and node.operator in (Operator.AND, Operator.OR) \
+                and node.left is not None and node.right is not None:
+            left = self._fallback_predicate(node.left)
+            right = self._fallback_predicate(node.right)
+            if node.operator == Operator.AND:
+                return lambda data: left(data) and right(data)
+            return lambda data: left(data) or right(data)
+        # Comparisons, and nodes the index cannot represent, fail on their own
+        return self._guarded(self.compiler.compile_predicate(node))
+
+    def _access_id(self, key: Tuple, pending: Dict) -> int:
+        access = self._access_ids.get(key)
+        if access is not None:
+            return access
+
+        access = self._access_ids[key] = len(self._candidates)
+        self._candidates.append([])
+        field, operator, _, value = key
+        index = self._fields.setdefault(field, _FieldIndex())
+        if value != value:
+            # A NaN constant never compares true, so its conjunctions are never candidates
+            return access
+        if operator == Operator.EQ:
+            index.equality.setdefault(value, []).append(access)
+        else:
+            domain = "str" if isinstance(value, str) else "num"
+            pending.setdefault((field, (operator, domain)), []).append((value, access))
+        return access
@@ -0,0 +1,287 @@
+from typing import Any, Dict, List, Optional, Tuple
+from ..models.ast_node import ASTNode, NodeType, Operator
+from ..models.node_interner import NodeInterner
+from .rule_combiner import RuleCombiner
+
+# (low, low closed, high, high closed); None is an unbounded end
+Interval = Tuple[Any, bool, Any, bool]
+
+_ORDERED = (Operator.GT, Operator.GTE, Operator.LT, Operator.LTE)
+
+
+def _interval(operator: Operator, value: Any) -> Interval:
+    if operator == Operator.GT:
+        return (value, False, None, False)
+    if operator == Operator.GTE:
+        return (value, True, None, False)
+    if operator == Operator.LT:
+        return (None, False, value, False)
+    if operator == Operator.LTE:
+        return (None, False, value, True)
+    return (value, True, value, True)
+
+
+def _intersect(a: Interval, b: Interval) -> Optional[Interval]:
+    """Intersection of two intervals, None when it is empty"""
+    low, low_closed = a[0], a[1]
+    if b[0] is not None and (low is None or b[0] > low or (b[0] == low and not b[1])):
+        low, low_closed = b[0], b[1]
+    high, high_closed = a[2], a[3]
+    if b[2] is not None and (high is None or b[2] < high or (b[2] == high and not b[3])):
+        high, high_closed = b[2], b[3]
+    if low is not None and high is not None:
+        if low > high or (low == high and not (low_closed and high_closed)):
+            return None
+    return (low, low_closed, high, high_closed)
+
+
+def _union(intervals: List[Interval]) -> List[Interval]:
+    """Disjoint, sorted intervals covering the union of the given ones"""
+    ordered = sorted(intervals, key=lambda i: (0,) if i[0] is None else (1, i[0], not i[1]))
+    merged = [ordered[0]]
+    for low, low_closed, high, high_closed in ordered[1:]:
+        last_low, last_low_closed, last_high, last_high_closed = merged[-1]
+        touches = (last_high is None or low is None or low < last_high
+                   or (low == last_high and (low_closed or last_high_closed)))
+        if not touches:
+            merged.append((low, low_closed, high, high_closed))
+            continue
+        if last_high is not None and (high is None or high > last_high
+                                      or (high == last_high and high_closed)):
+            last_high, last_high_closed = high, high_closed
+        merged[-1] = (last_low, last_low_closed, last_high, last_high_closed)
+    return merged
+
+
+def _domain(node: ASTNode) -> Optional[str]:
+    """The constant's domain for comparisons the optimizer may merge, None for any other node"""
+    if node.type != NodeType.COMPARISON or not node.field:
+        return None
+    if node.operator not in _ORDERED and node.operator != Operator.EQ:
+        return None
+    value = node.value
+    if isinstance(value, str):
+        return "str"
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and value == value:
+        return "num"
+    return None
+
+
+def _describe(node: ASTNode) -> str:
+    return f"{node.field} {node.operator.value} {node.value!r}"
+
+
+def count_nodes(node: Optional[ASTNode]) -> int:
+    """Number of nodes in the tree, counting a node shared in a DAG once per reference"""
+    count = 0
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current is None:
+            continue
+        count += 1
+        stack.append(current.left)
+        stack.append(current.right)
+    return count
+
+
+class OptimizationReport:
+    """What RuleOptimizer.optimize changed in one rule"""
+
+    def __init__(self, nodes_before: int):
+        self.nodes_before = nodes_before
+        self.nodes_after = nodes_before
+        # Groups of comparisons that can never / always hold, e.g. "age < 20 AND age > 50"
+        self.contradictions: List[str] = []
+        self.tautologies: List[str] = []
+        # True or False when the whole rule folded to a constant
+        self.constant: Optional[bool] = None
+
+    @property
+    def nodes_removed(self) -> int:
+        return self.nodes_before - self.nodes_after
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "nodes_before": self.nodes_before,
+            "nodes_after": self.nodes_after,
+            "nodes_removed": self.nodes_removed,
+            "contradictions": self.contradictions,
+            "tautologies": self.tautologies,
+            "constant": self.constant
+        }
+
+
+class RuleOptimizer:
+    """
+    Semantic optimization pass on top of RuleCombiner.simplify_ast.
+
+    Under every AND/OR chain, comparisons on the same field with constants of the
+    same kind (numbers or strings) are merged into a minimal interval (AND) or
+    union of intervals (OR); duplicate clauses are dropped; and constant branches
+    are folded into OPERAND nodes (`age < 20 AND age > 50` becomes false).
+
+    Equivalence: on every record the original rule evaluates without raising, the
+    optimized rule returns the same result without raising. A merged group takes
+    the place of its first comparison, and that comparison reads the same field, so
+    a missing field or unusable value fails there in both rules. In an OR chain
+    that starts a field's group with `=` (which never raises on a value of another
+    type), `=` and ordering comparisons are merged separately, so an ordering
+    comparison is never moved ahead of where it would have raised. On records where
+    the original raises, the optimized rule may return a result instead, e.g. a
+    folded `x > 5 OR x <= 5` no longer reads `x`.
+
+    Numeric ranges that cover every number are reported as tautologies but kept
+    as two comparisons, because both are false for NaN.
+    """
+
+    def __init__(self, combiner: Optional[RuleCombiner] = None):
+        self.combiner = combiner or RuleCombiner()
+
+    def optimize(self, node: ASTNode) -> Tuple[ASTNode, OptimizationReport]:
+        """
+        Optimizes a rule
+
+        Returns:
+            Tuple[ASTNode, OptimizationReport]: The optimized rule, as nodes of the
+            input's class, and what was changed
+        """
+        report = OptimizationReport(count_nodes(node))
+        # Duplicate clauses are found by identity of their canonical nodes
+        keys = self.combiner.interner if self.combiner.interner is not None else NodeInterner()
+        optimized = self._optimize(self.combiner.simplify_ast(node), keys, report)
+        report.nodes_after = count_nodes(optimized)
+        if optimized.type == NodeType.OPERAND:
+            report.constant = bool(optimized.value)
+        return optimized, report
+
+    def _optimize(self, node: ASTNode, keys: NodeInterner, report: OptimizationReport) -> ASTNode:
+        if (node.type != NodeType.OPERATOR or node.operator not in (Operator.AND, Operator.OR)
+                or node.left is None or node.right is None):
+            return node
+
+        operator = node.operator
+        # AND is decided by a false clause, OR by a true one
+        decisive = operator == Operator.OR
+        clauses = [self._optimize(clause, keys, report)
+                   for clause in self.combiner._collect_same_operator_nodes(node, operator)]
+
+        # Clauses in order, each with the key of its comparison group (or None)
+        entries: List[Tuple[Optional[Tuple], ASTNode]] = []
+        groups: Dict[Tuple, List[ASTNode]] = {}
+        seen = set()
+        for clause in clauses:
+            if clause.type == NodeType.OPERAND:
+                if bool(clause.value) == decisive:
+                    return self._constant(node, decisive)
+                continue
+            key = id(keys.intern(clause))
+            if key in seen:
+                continue
+            seen.add(key)
+
+            domain = _domain(clause)
+            group = self._group_key(groups, clause, domain, operator) if domain is not None else None
+            if group is not None:
+                groups.setdefault(group, []).append(clause)
+            entries.append((group, clause))
+
+        # A merged group takes the place of its first member; unmerged ones stay put
+        merged_groups: Dict[Tuple, Optional[ASTNode]] = {}
+        operands = []
+        for group, clause in entries:
+            if group is None:
+                operands.append(clause)
+                continue
+            if group in merged_groups:
+                if merged_groups[group] is None:
+                    operands.append(clause)
+                continue
+            merged = merged_groups[group] = self._merge(node, groups[group], operator, report)
+            if merged is None:
+                operands.append(clause)
+            elif merged.type == NodeType.OPERAND:
+                if bool(merged.value) == decisive:
+                    return self._constant(node, decisive)
+            else:
+                operands.append(merged)
+
+        if not operands:
+            return self._constant(node, not decisive)
+        return self.combiner._combine_with_operator(operands, operator)
+
+    @staticmethod
+    def _group_key(groups: Dict[Tuple, List[ASTNode]], clause: ASTNode, domain: str,
+                   operator: Operator) -> Tuple:
+        if operator == Operator.AND:
+            return (clause.field, domain, "all")
+        # OR: see the class docstring for why "=" may not lead ordering comparisons
+        if (clause.field, domain, "all") in groups:
+            return (clause.field, domain, "all")
+        if clause.operator == Operator.EQ:
+            return (clause.field, domain, "=")
+        if (clause.field, domain, "=") in groups:
+            return (clause.field, domain, "ordered")
+        return (clause.field, domain, "all")
+
+    def _merge(self, node: ASTNode, members: List[ASTNode], operator: Operator,
+               report: OptimizationReport) -> Optional[ASTNode]:
+        """
+        Merges comparisons on one field
+
+        Returns:
+            Optional[ASTNode]: The merged clause or constant, or None when merging
+            would not make the group smaller
+        """
+        if len(members) < 2:
+            return None
+        field = members[0].field
+        intervals = [_interval(member.operator, member.value) for member in members]
+        joined = f" {operator.value} ".join(_describe(member) for member in members)
+
+        if operator == Operator.AND:
+            interval = intervals[0]
+            for other in intervals[1:]:
+                interval = _intersect(interval, other)
+                if interval is None:
+                    report.contradictions.append(f"{joined} is never true")
+                    return self._constant(node, False)
+            merged = [interval]
+        else:
+            merged = _union(intervals)
+            if merged[0][0] is None and merged[0][2] is None:
+                report.tautologies.append(f"{joined} is always true")
+                if not isinstance(members[0].value, str):
+                    # Kept as comparisons so a NaN value still gives false
+                    value = members[0].value
+                    merged = [(None, False, value, True), (value, False, None, False)]
+                else:
+                    return self._constant(node, True)
+
+        comparisons = [self._interval_nodes(node, field, interval) for interval in merged]
+        if sum(len(nodes) for nodes in comparisons) >= len(members):
+            return None
+        parts = [nodes[0] if len(nodes) == 1 else self.combiner._combine_with_operator(nodes, Operator.AND)
+                 for nodes in comparisons]
+        return self.combiner._combine_with_operator(parts, operator)
+
+    def _interval_nodes(self, node: ASTNode, field: str, interval: Interval) -> List[ASTNode]:
+        low, low_closed, high, high_closed = interval
+        if low is not None and high is not None and low == high:
+            return [self._comparison(node, field, Operator.EQ, low)]
+        nodes = []
+        if low is not None:
+            nodes.append(self._comparison(node, field, Operator.GTE if low_closed else Operator.GT, low))
+        if high is not None:
+            nodes.append(self._comparison(node, field, Operator.LTE if high_closed else Operator.LT, high))
+        return nodes
+
+    def _comparison(self, node: ASTNode, field: str, operator: Operator, value: Any) -> ASTNode:
+        if self.combiner.interner is not None:
+            return self.combiner.interner.node(NodeType.COMPARISON, operator, field=field, value=value)
+        return type(node)(type=NodeType.COMPARISON, operator=operator, field=field, value=value)
+
+    def _constant(self, node: ASTNode, value: bool) -> ASTNode:
+        if self.combiner.interner is not None:
+            return self.combiner.interner.node(NodeType.OPERAND, value=value)
+        return type(node)(type=NodeType.OPERAND, value=value)
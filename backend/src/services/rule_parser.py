@@ -1,115 +1,182 @@
-from typing import List, Tuple
+from typing import List, NamedTuple
 import re
 from ..models.ast_node import ASTNode, NodeType, Operator
+from ..models.compact_node import CompactNode
 from ..utils.exceptions import RuleParsingError
 
+# Every non-space character matches some branch, so finditer only skips whitespace
+_TOKEN_PATTERN = re.compile(r"""
+        (?P<LPAREN>\()
+      | (?P<RPAREN>\))
+      | (?P<COMPARE>>=|<=|!=|>|<|=)
+      | (?P<STRING>'[^']*'|"[^"]*")
+      | (?P<NUMBER>[-+]?(?:\d+\.\d*|\.\d+|\d+)(?![\w.]))
+      | (?P<WORD>[\w.]+)
+      | (?P<UNTERMINATED>['"])
+      | (?P<INVALID>\S)
+""", re.VERBOSE)
+
+_COMPARISON_OPERATORS = {op.value: op for op in (
+    Operator.GT, Operator.LT, Operator.EQ, Operator.GTE, Operator.LTE
+)}
+_LOGICAL_OPERATORS = {op.value: op for op in (Operator.AND, Operator.OR)}
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+    position: int
+
+
 class RuleParser:
+    """
+    Single-pass lexer and operator-precedence parser for rule strings.
+
+    Grammar (AND binds tighter than OR, both are left-associative):
+
+        expression := term (OR term)*
+        term       := factor (AND factor)*
+        factor     := '(' expression ')' | field comparator value
+        value      := 'string' | number | word
+
+    Parsing is iterative (shunting-yard), linear in the length of the rule and
+    never recurses on nesting depth. Errors carry the character position.
+    """
+
     def __init__(self):
+        # Precedence of the logical operators; comparisons always bind tightest
         self.operators = {
-            'AND': 1,
             'OR': 1,
-            '>': 2,
-            '<': 2,
-            '=': 2,
-            '>=': 2,
-            '<=': 2
+            'AND': 2
         }
-        
+
+    def lex(self, rule_string: str) -> List[Token]:
+        tokens = []
+        for found in _TOKEN_PATTERN.finditer(rule_string):
+            kind = found.lastgroup
+            start = found.start()
+            text = found.group()
+            if kind == "WORD":
+                if text in self.operators:
+                    kind = text
+            elif kind == "UNTERMINATED":
+                raise RuleParsingError(f"Unterminated string literal at position {start}", start)
+            elif kind == "INVALID":
+                raise RuleParsingError(f"Unexpected character {text!r} at position {start}", start)
+            tokens.append(Token(kind, text, start))
+        return tokens
+
     def tokenize(self, rule_string: str) -> List[str]:
-        # Replace parentheses with spaces around them
-        rule_string = re.sub(r'([()])', r' \1 ', rule_string)
-        
-        # Split the string into tokens
-        tokens = rule_string.split()
-        
-        # Process tokens to handle string literals
-        processed_tokens = []
-        current_string = []
-        in_string = False
-        
-        for token in tokens:
-            if token.startswith("'") and token.endswith("'"):
-                processed_tokens.append(token)
-            elif token.startswith("'"):
-                in_string = True
-                current_string.append(token)
-            elif token.endswith("'"):
-                in_string = False
-                current_string.append(token)
-                processed_tokens.append(' '.join(current_string))
-                current_string = []
-            elif in_string:
-                current_string.append(token)
-            else:
-                processed_tokens.append(token)
-        
-        return processed_tokens
+        return [token.text for token in self.lex(rule_string)]
 
     def parse(self, rule_string: str) -> ASTNode:
-        tokens = self.tokenize(rule_string)
-        return self._parse_expression(tokens)
+        return self.parse_compact(rule_string).to_ast()
 
-    def _parse_expression(self, tokens: List[str]) -> ASTNode:
+    def parse_compact(self, rule_string: str) -> CompactNode:
+        """Parses a rule string into the internal CompactNode form"""
+        tokens = self.lex(rule_string)
         if not tokens:
-            raise RuleParsingError("Empty expression")
-
-        # Handle parentheses
-        if tokens[0] == '(':
-            # Find matching closing parenthesis
-            count = 1
-            i = 1
-            while i < len(tokens) and count > 0:
-                if tokens[i] == '(':
-                    count += 1
-                elif tokens[i] == ')':
-                    count -= 1
-                i += 1
-            
-            if count != 0:
-                raise RuleParsingError("Mismatched parentheses")
-                
-            return self._parse_expression(tokens[1:i-1])
-
-        # Find the operator with lowest precedence
-        min_precedence = float('inf')
-        operator_index = -1
-        
-        for i, token in enumerate(tokens):
-            if token in self.operators:
-                if self.operators[token] < min_precedence:
-                    min_precedence = self.operators[token]
-                    operator_index = i
-
-        if operator_index == -1:
-            # This must be a comparison
-            if len(tokens) != 3:
-                raise RuleParsingError(f"Invalid comparison: {' '.join(tokens)}")
-                
-            field, op, value = tokens
-            
-            # Clean up string literals
-            if value.startswith("'") and value.endswith("'"):
-                value = value[1:-1]
-            # Convert numeric values
-            elif value.isdigit():
-                value = int(value)
-            elif value.replace('.', '').isdigit():
-                value = float(value)
-
-            return ASTNode(
-                type=NodeType.COMPARISON,
-                operator=Operator(op),
-                field=field,
-                value=value
+            raise RuleParsingError("Empty expression", 0)
+
+        operands: List[CompactNode] = []
+        pending: List[Token] = []
+        expect_operand = True
+        index = 0
+        count = len(tokens)
+
+        while index < count:
+            token = tokens[index]
+            if expect_operand:
+                if token.kind == "LPAREN":
+                    pending.append(token)
+                    index += 1
+                    continue
+                operands.append(self._parse_comparison(tokens, index, rule_string))
+                index += 3
+                expect_operand = False
+                continue
+
+            if token.kind in self.operators:
+                precedence = self.operators[token.kind]
+                while (pending and pending[-1].kind in self.operators
+                       and self.operators[pending[-1].kind] >= precedence):
+                    self._reduce(operands, pending.pop())
+                pending.append(token)
+                expect_operand = True
+            elif token.kind == "RPAREN":
+                while pending and pending[-1].kind != "LPAREN":
+                    self._reduce(operands, pending.pop())
+                if not pending:
+                    raise RuleParsingError(f"Unmatched ')' at position {token.position}", token.position)
+                pending.pop()
+            else:
+                raise RuleParsingError(
+                    f"Expected AND, OR or ')' but found {token.text!r} at position {token.position}",
+                    token.position
+                )
+            index += 1
+
+        if expect_operand:
+            position = len(rule_string.rstrip())
+            raise RuleParsingError(f"Unexpected end of rule at position {position}", position)
+
+        while pending:
+            token = pending.pop()
+            if token.kind == "LPAREN":
+                raise RuleParsingError(f"Mismatched parentheses: '(' at position {token.position} is never closed",
+                                       token.position)
+            self._reduce(operands, token)
+        return operands[0]
+
+    def _parse_comparison(self, tokens: List[Token], index: int, rule_string: str) -> CompactNode:
+        field = tokens[index]
+        if field.kind != "WORD":
+            raise RuleParsingError(
+                f"Expected a field name or '(' but found {field.text!r} at position {field.position}",
+                field.position
+            )
+        if index + 2 >= len(tokens):
+            position = len(rule_string.rstrip())
+            raise RuleParsingError(
+                f"Invalid comparison starting at position {field.position}: unexpected end of rule",
+                position
             )
 
-        # Split on operator and recursively parse
-        left_tokens = tokens[:operator_index]
-        right_tokens = tokens[operator_index + 1:]
-        
-        return ASTNode(
-            type=NodeType.OPERATOR,
-            operator=Operator(tokens[operator_index]),
-            left=self._parse_expression(left_tokens),
-            right=self._parse_expression(right_tokens)
-        )
\ No newline at end of file
+        comparator, value = tokens[index + 1], tokens[index + 2]
+        if comparator.kind != "COMPARE":
+            raise RuleParsingError(
+                f"Expected a comparison operator but found {comparator.text!r} at position {comparator.position}",
+                comparator.position
+            )
+        if comparator.text not in _COMPARISON_OPERATORS:
+            raise RuleParsingError(
+                f"Unsupported comparison operator {comparator.text!r} at position {comparator.position}",
+                comparator.position
+            )
+        if value.kind not in ("STRING", "NUMBER", "WORD"):
+            raise RuleParsingError(
+                f"Expected a value but found {value.text!r} at position {value.position}",
+                value.position
+            )
+
+        return CompactNode(
+            NodeType.COMPARISON,
+            _COMPARISON_OPERATORS[comparator.text],
+            field=field.text,
+            value=self._convert_value(value)
+        )
+
+    @staticmethod
+    def _convert_value(token: Token):
+        if token.kind == "STRING":
+            return token.text[1:-1]
+        if token.kind == "NUMBER":
+            if "." in token.text:
+                return float(token.text)
+            return int(token.text)
+        return token.text
+
+    @staticmethod
+    def _reduce(operands: List[CompactNode], token: Token):
+        right = operands.pop()
+        operands[-1] = CompactNode(NodeType.OPERATOR, _LOGICAL_OPERATORS[token.kind], operands[-1], right)
@@ -0,0 +1,208 @@
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from ..models.ast_node import ASTNode, NodeType, Operator
+from ..models.node_interner import NodeInterner
+from .rule_compiler import CompiledRule, RuleCompiler
+
+# A rule program reads comparison outcomes (and memoized subtree outcomes) from the shared table
+Program = Callable[[Dict[str, Any], List[Any]], bool]
+
+_PENDING = object()
+
+
+class PreparedRuleSet:
+    """
+    A set of rules sharing one predicate table.
+
+    Every distinct comparison across the rules is stored once; while evaluating a
+    record each comparison runs at most once and its outcome (or error) is reused
+    by every rule that references it. Operator nodes shared by identity, as in the
+    DAGs NodeInterner builds, are memoized the same way.
+    """
+
+    def __init__(self, rule_ids: List[str], programs: List[Program],
+                 predicates: List[Callable[[Dict[str, Any]], bool]], shared_count: int = 0):
+        self.rule_ids = rule_ids
+        self.programs = programs
+        self.predicates = predicates
+        self.shared_count = shared_count
+
+    @property
+    def predicate_count(self) -> int:
+        return len(self.predicates)
+
+    def evaluate(self, data: Dict[str, Any]) -> Tuple[Dict[str, bool], Dict[str, str]]:
+        """
+        Evaluates every rule in the set against one record
+
+        Returns:
+            Tuple[Dict[str, bool], Dict[str, str]]: Per-rule results, and per-rule
+            error messages for rules that failed to evaluate
+        """
+        values = [_PENDING] * (len(self.predicates) + self.shared_count)
+        results = {}
+        errors = {}
+        for rule_id, program in zip(self.rule_ids, self.programs):
+            try:
+                results[rule_id] = program(data, values)
+            except Exception as e:
+                errors[rule_id] = str(e)
+        return results, errors
+
+
+class RuleSetEvaluator:
+    """
+    Builds PreparedRuleSets whose rules share identical comparisons and subtrees.
+
+    With `intern` on, the rules are first hash-consed through a NodeInterner, so any
+    subtree repeated across (or within) rules is evaluated once per record.
+    """
+
+    def __init__(self, compiler: Optional[RuleCompiler] = None, intern: bool = True):
+        self.compiler = compiler or RuleCompiler()
+        self.intern = intern
+
+    def prepare(self, rules: Dict[str, ASTNode]) -> PreparedRuleSet:
+        roots = list(rules.values())
+        if self.intern:
+            interner = NodeInterner()
+            roots = [interner.intern(root) for root in roots]
+
+        build = _Build(self._shared_nodes(roots))
+        programs = [self._compile(root, build) for root in roots]
+        return PreparedRuleSet(list(rules.keys()), programs, build.predicates, build.memo_count)
+
+    def compile(self, node: ASTNode) -> CompiledRule:
+        """
+        Compiles one rule, memoizing shared subtrees within each evaluation
+
+        Gives the same results and errors as RuleCompiler.compile, which is cheaper
+        for plain trees; this pays off on DAGs with many shared subtrees.
+        """
+        prepared = self.prepare({"": node})
+        program = prepared.programs[0]
+        size = prepared.predicate_count + prepared.shared_count
+
+        def evaluate(data: Dict[str, Any]) -> bool:
+            return program(data, [_PENDING] * size)
+        return CompiledRule(node, evaluate, self.compiler.evaluator)
+
+    @staticmethod
+    def predicate_key(node: ASTNode) -> Tuple:
+        # The value type is part of the key so 1, 1.0 and '1' stay distinct predicates
+        return (node.field, node.operator, type(node.value).__name__, node.value)
+
+    @staticmethod
+    def _shared_nodes(roots: List[ASTNode]) -> Set[int]:
+        """IDs of the AND/OR nodes referenced more than once, which get memo slots"""
+        references: Dict[int, int] = {}
+        shared = set()
+        stack = list(roots)
+        while stack:
+            node = stack.pop()
+            node_id = id(node)
+            count = references.get(node_id, 0) + 1
+            references[node_id] = count
+            if count > 1:
+                # Children of a node already seen were counted on its first visit
+                if node.type == NodeType.OPERATOR and node.operator in (Operator.AND, Operator.OR):
+                    shared.add(node_id)
+                continue
+            if node.left is not None:
+                stack.append(node.left)
+            if node.right is not None:
+                stack.append(node.right)
+        return shared
+
+    def _compile(self, node: ASTNode, build: "_Build") -> Program:
+        node_id = id(node)
+        program = build.programs.get(node_id)
+        if program is not None:
+            return program
+
+        if node.type == NodeType.OPERATOR and node.operator in (Operator.AND, Operator.OR):
+            program = self._compile_operator(node, build)
+            if node_id in build.shared:
+                # Memo slots are counted from the end of the table, after the predicates
+                build.memo_count += 1
+                program = self._memo_reader(-build.memo_count, program)
+        elif node.type == NodeType.COMPARISON and node.field and node.operator:
+            key = self.predicate_key(node)
+            slot = build.slots.get(key)
+            if slot is None:
+                slot = build.slots[key] = len(build.predicates)
+                build.predicates.append(self.compiler.compile_predicate(node))
+            program = self._slot_reader(slot, build.predicates[slot])
+        else:
+            # Malformed nodes keep the compiler's error behaviour and are not shared
+            fallback = self.compiler.compile_predicate(node)
+            program = lambda data, values: fallback(data)
+
+        build.programs[node_id] = program
+        return program
+
+    def _compile_operator(self, node: ASTNode, build: "_Build") -> Program:
+        left = self._compile(node.left, build) if node.left else None
+        right = self._compile(node.right, build) if node.right else None
+        if left is None or right is None:
+            child = left or right
+            if child is None:
+                return lambda data, values: False
+            if node.operator == Operator.AND:
+                if left is None:
+                    return lambda data, values: False
+
+                def and_missing(data: Dict[str, Any], values: List[Any]) -> bool:
+                    return child(data, values) and False
+                return and_missing
+            return child
+
+        if node.operator == Operator.AND:
+            def and_(data: Dict[str, Any], values: List[Any]) -> bool:
+                return left(data, values) and right(data, values)
+            return and_
+
+        def or_(data: Dict[str, Any], values: List[Any]) -> bool:
+            return left(data, values) or right(data, values)
+        return or_
+
+    @staticmethod
+    def _slot_reader(slot: int, predicate: Callable[[Dict[str, Any]], bool]) -> Program:
+        def read(data: Dict[str, Any], values: List[Any]) -> bool:
+            value = values[slot]
+            if value is _PENDING:
+                try:
+                    value = predicate(data)
+                except Exception as e:
+                    value = e
+                values[slot] = value
+            if isinstance(value, Exception):
+                raise value
+            return value
+        return read
+
+    @staticmethod
+    def _memo_reader(slot: int, program: Program) -> Program:
+        def read(data: Dict[str, Any], values: List[Any]) -> bool:
+            value = values[slot]
+            if value is _PENDING:
+                try:
+                    value = program(data, values)
+                except Exception as e:
+                    value = e
+                values[slot] = value
+            if isinstance(value, Exception):
+                raise value
+            return value
+        return read
+
+
+class _Build:
+    """State of one RuleSetEvaluator.prepare call"""
+
+    def __init__(self, shared: Set[int]):
+        self.shared = shared
+        self.predicates: List[Callable[[Dict[str, Any]], bool]] = []
+        self.slots: Dict[Tuple, int] = {}
+        # Compiled programs by node id, so a shared node is compiled once
+        self.programs: Dict[int, Program] = {}
+        self.memo_count = 0
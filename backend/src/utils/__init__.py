@@ -9,6 +9,7 @@ from .exceptions import (
 from .validators import RuleValidator
 from .constants import RuleConstants
 from .helpers import RuleHelper
+from .lru_cache import LRUCache
 
 __all__ = [
     'RuleEngineException',
@@ -18,5 +19,6 @@ __all__ = [
     'ValidationError',
     'RuleValidator',
     'RuleConstants',
-    'RuleHelper'
+    'RuleHelper',
+    'LRUCache'
 ]
\ No newline at end of file
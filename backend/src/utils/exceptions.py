@@ -5,7 +5,9 @@ class RuleEngineException(Exception):
 
 class RuleParsingError(RuleEngineException):
     """Raised when there's an error parsing a rule string"""
-    pass
+    def __init__(self, message: str, position: int = None):
+        super().__init__(message)
+        self.position = position
 
 class RuleEvaluationError(RuleEngineException):
     """Raised when there's an error evaluating a rule"""
@@ -19,3 +21,9 @@ class ValidationError(RuleEngineException):
     """Raised when there's a validation error"""
     pass
 
+
+class RuleVersionConflictError(RuleEngineException):
+    """Raised when a rule is written with an expected version that is no longer current"""
+    def __init__(self, message: str, current_version: int = None):
+        super().__init__(message)
+        self.current_version = current_version
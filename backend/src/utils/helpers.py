@@ -1,8 +1,12 @@
 # helpers.py
+import re
 from typing import Any, Dict, Optional
 from .constants import RuleConstants
 from .exceptions import ValidationError
 
+_QUOTED_VALUE = re.compile(r"""('[^']*'|"[^"]*")""")
+_OPERATOR_SPACING = re.compile(r"\s*(>=|<=|!=|[()<>=])\s*")
+
 class RuleHelper:
     """Helper utilities for rule processing"""
     
@@ -45,12 +49,15 @@ class RuleHelper:
         Returns:
             str: Formatted rule string
         """
-        # Remove extra whitespace
-        formatted = ' '.join(rule_string.split())
-        # Ensure spaces around operators
-        for op in ['(', ')', '>', '<', '=', '!=', '>=', '<=']:
-            formatted = formatted.replace(op, f' {op} ')
-        return ' '.join(formatted.split())
+        # Quoted values are kept verbatim; everything between them is normalized
+        pieces = []
+        for index, part in enumerate(_QUOTED_VALUE.split(rule_string)):
+            if index % 2:
+                pieces.append(part)
+            else:
+                # Ensure single spaces around operators and collapse other whitespace
+                pieces.extend(' '.join(_OPERATOR_SPACING.split(part)).split())
+        return ' '.join(pieces)
     
     @staticmethod
     def get_nested_depth(ast_dict: Dict) -> int:
@@ -0,0 +1,85 @@
+# ndjson.py
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, List
+
+
+def parse_records(body: bytes) -> List[Any]:
+    """
+    Parses a request body holding either a JSON array or NDJSON
+
+    Args:
+        body: Raw request body
+
+    Returns:
+        List[Any]: Decoded records, in order
+
+    Raises:
+        ValueError: If the body is neither a JSON array nor valid NDJSON
+    """
+    text = body.decode("utf-8").strip()
+    if not text:
+        return []
+    if text.startswith("["):
+        records = json.loads(text)
+        if not isinstance(records, list):
+            raise ValueError("Expected a JSON array of records")
+        return records
+
+    records = []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e.msg}")
+    return records
+
+
+def encode_lines(items: Iterable[Any], chunk_size: int = 1000) -> Iterator[str]:
+    """
+    Encodes items as compact NDJSON, yielding chunks of up to chunk_size lines
+
+    Args:
+        items: Items to encode, one JSON value per line
+        chunk_size: Number of lines per yielded chunk
+
+    Returns:
+        Iterator[str]: NDJSON text chunks
+    """
+    dumps = json.JSONEncoder(separators=(",", ":")).encode
+    buffer = []
+    for item in items:
+        buffer.append(dumps(item))
+        if len(buffer) >= chunk_size:
+            buffer.append("")
+            yield "\n".join(buffer)
+            buffer = []
+    if buffer:
+        buffer.append("")
+        yield "\n".join(buffer)
+
+
+async def encode_lines_async(items: AsyncIterable[Any], chunk_size: int = 1000) -> AsyncIterator[str]:
+    """
+    Same as encode_lines for items produced asynchronously, e.g. by a database cursor
+
+    Args:
+        items: Items to encode, one JSON value per line
+        chunk_size: Number of lines per yielded chunk
+
+    Returns:
+        AsyncIterator[str]: NDJSON text chunks
+    """
+    dumps = json.JSONEncoder(separators=(",", ":")).encode
+    buffer = []
+    async for item in items:
+        buffer.append(dumps(item))
+        if len(buffer) >= chunk_size:
+            buffer.append("")
+            yield "\n".join(buffer)
+            buffer = []
+    if buffer:
+        buffer.append("")
+        yield "\n".join(buffer)
@@ -1,9 +1,48 @@
-# test/conftest.py
+# test/data.py
+import itertools
 import pytest
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from src.models.ast_node import ASTNode, NodeType, Operator
 from src.models.database import Base, create_database
-from src.test_config import DATABASE_URL
+from src.models.rule import Rule
+from src.services.rule_parser import RuleParser
+
+DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+
+def comparison(field, op, value):
+    return ASTNode(type=NodeType.COMPARISON, operator=op, field=field, value=value)
+
+
+def operator(op, left, right):
+    return ASTNode(type=NodeType.OPERATOR, operator=op, left=left, right=right)
+
+
+# Shared by the evaluator, compiler, codec and combiner tests
+RULE = operator(
+    Operator.AND,
+    operator(
+        Operator.OR,
+        operator(Operator.AND, comparison("age", Operator.GT, 30), comparison("department", Operator.EQ, "Sales")),
+        operator(Operator.AND, comparison("age", Operator.LT, 25), comparison("department", Operator.EQ, "Marketing")),
+    ),
+    operator(Operator.OR, comparison("salary", Operator.GTE, 50000), comparison("experience", Operator.LTE, 5)),
+)
+
+RECORDS = [
+    {"age": age, "department": department, "salary": salary, "experience": experience}
+    for age, department, salary, experience in itertools.product(
+        [20, 25, 30, 35], ["Sales", "Marketing"], [40000, 50000, 60000.5], [3, 5, 8]
+    )
+]
+
+
+def make_rule(index):
+    rule_string = f"age > {index}"
+    return Rule(name=f"rule {index}", rule_string=rule_string,
+                ast=RuleParser().parse_compact(rule_string).to_dict())
+
 
 @pytest.fixture(scope="module")
 async def test_db():
@@ -16,3 +55,20 @@ async def test_db():
         yield session
 
     await engine.dispose()
+
+
+@pytest.fixture
+def app_client(monkeypatch):
+    """A TestClient for the API backed by a fresh, unpersisted in-memory store"""
+    from fastapi.testclient import TestClient
+    from src import app as app_module
+    from src.models.inmemory_database import InMemoryDatabase
+
+    db = InMemoryDatabase()
+    db.add_change_listener(app_module.on_rule_changed)
+    monkeypatch.setattr(app_module, "db", db)
+    monkeypatch.setattr(app_module, "RULE_CHANGE_POLL_INTERVAL", 0)
+    app_module.invalidate_all_rules()
+    with TestClient(app_module.app) as client:
+        yield client
+    app_module.invalidate_all_rules()
@@ -0,0 +1,53 @@
+# test/test_adaptive_evaluator.py
+from src.models.ast_node import Operator
+from src.services.adaptive_evaluator import AdaptiveRule
+from src.services.rule_evaluator import RuleEvaluator
+from data import RECORDS, RULE, app_client, comparison, operator
+
+
+def test_adaptive_results_match_reference():
+    adaptive = AdaptiveRule(RULE, reorder_interval=7)
+    for _ in range(3):
+        for record in RECORDS:
+            assert adaptive(record) == RuleEvaluator().evaluate(RULE, record)
+
+
+def test_reorder_moves_decisive_branch_first():
+    rule = operator(
+        Operator.AND,
+        operator(Operator.AND, comparison("age", Operator.GT, 0), comparison("salary", Operator.GT, 0)),
+        comparison("department", Operator.EQ, "Sales"),
+    )
+    adaptive = AdaptiveRule(rule, reorder_interval=10_000)
+    for _ in range(100):
+        assert adaptive({"age": 30, "salary": 10, "department": "HR"}) is False
+    adaptive.reorder()
+    first = adaptive.learned_ast()
+    while first.left is not None:
+        first = first.left
+    assert first.field == "department"
+
+    frozen = adaptive.freeze()
+    assert adaptive.frozen
+    assert frozen({"age": 30, "salary": 10, "department": "Sales"}) is True
+    assert adaptive.describe()["frozen"] is True
+
+
+def test_learned_state_outlives_cache_eviction(app_client, monkeypatch):
+    from src import app as app_module
+    monkeypatch.setattr(app_module, "EVALUATION_MODE", "adaptive")
+    rule = {"name": "r", "description": "d", "rule_string": "age > 30 AND department = 'Sales'"}
+    rule_id = app_client.post("/rules/", json=rule).json()["id"]
+    assert app_client.post(f"/rules/{rule_id}/adaptive/freeze").json()["frozen"]
+
+    # Eviction from the rule cache must neither unfreeze nor reset the rule
+    app_module.rule_cache.clear()
+    assert app_client.post(f"/rules/{rule_id}/evaluate", json={"data": {"age": 40, "department": "Sales"}}).json()["result"]
+    assert app_module.rule_cache.get(rule_id).evaluate is app_module.adaptive_rules[rule_id][1]
+    assert app_module.adaptive_rules[rule_id][1].frozen
+
+    # Changing the rule starts learning afresh
+    app_client.put(f"/rules/{rule_id}", json=dict(rule, rule_string="age > 40"))
+    assert rule_id not in app_module.adaptive_rules
+    assert app_client.get(f"/rules/{rule_id}/adaptive").status_code == 200
+    assert not app_module.adaptive_rules[rule_id][1].frozen
@@ -0,0 +1,40 @@
+# test/test_ast_codec.py
+import json
+import pytest
+from src.models import ast_codec
+from src.models.ast_node import NodeType, Operator
+from src.models.compact_node import CompactNode
+from data import RULE
+
+
+def test_round_trips_to_nodes_and_json_view():
+    data = ast_codec.encode(RULE)
+    assert ast_codec.is_encoded(data)
+    assert ast_codec.decode(data) == CompactNode.from_ast(RULE)
+    assert ast_codec.decode_dict(data) == RULE.to_dict()
+    assert ast_codec.encode(RULE.to_dict()) == data
+    assert len(data) < len(json.dumps(RULE.to_dict())) / 5
+
+
+@pytest.mark.parametrize("value", [0, 1, -1, 127, 128, -129, 2 ** 70, -2 ** 70, 1.5, -0.25,
+                                   True, False, None, "", "Sales", "é ü"])
+def test_constants_keep_value_and_type(value):
+    node = CompactNode(NodeType.COMPARISON, Operator.EQ, field="f", value=value)
+    decoded = ast_codec.decode(ast_codec.encode(node))
+    assert decoded.value == value and type(decoded.value) is type(value)
+
+
+def test_reads_legacy_formats():
+    expected = json.loads(json.dumps(RULE.to_dict()))
+    assert ast_codec.decode_legacy(json.dumps(RULE.to_dict())) == expected
+    # str() of a dict holding enums, as older SQLite rows were written
+    assert ast_codec.decode_legacy(str(RULE.to_dict())) == expected
+    assert ast_codec.decode_legacy(expected) is expected
+    with pytest.raises(ast_codec.ASTCodecError):
+        ast_codec.decode_legacy("__import__('os')")
+
+
+@pytest.mark.parametrize("data", [b"", b"RA", b"{}", b"RA\x02\x00\x08", b"RA\x01\x00", b"RA\x01\x00\xa0", b"RA\x01\x00\x08\x08"])
+def test_rejects_corrupt_data(data):
+    with pytest.raises(ast_codec.ASTCodecError):
+        ast_codec.decode(data)
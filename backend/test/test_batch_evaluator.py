@@ -0,0 +1,40 @@
+# test/test_batch_evaluator.py
+import numpy as np
+import pytest
+from src.models.ast_node import Operator
+from src.services.batch_evaluator import BatchEvaluator
+from src.services.rule_evaluator import RuleEvaluator
+from src.utils.exceptions import RuleEvaluationError
+from data import RECORDS, RULE, comparison, make_rule
+
+
+def test_batch_matches_reference():
+    mask = BatchEvaluator().evaluate_records(RULE, RECORDS)
+    expected = [RuleEvaluator().evaluate(RULE, record) for record in RECORDS]
+    assert mask.dtype == bool
+    assert mask.tolist() == expected
+
+
+@pytest.mark.parametrize("op", [Operator.EQ, Operator.GT, Operator.GTE, Operator.LT, Operator.LTE])
+@pytest.mark.parametrize("value", ["Marketing", "Sales", "A", "N", "Zz"])
+def test_categorical_string_comparisons(op, value):
+    columns = {"department": np.array(["Sales", "Marketing", "HR", "Sales", "Marketing"])}
+    node = comparison("department", op, value)
+    expected = [RuleEvaluator().evaluate(node, {"department": v}) for v in columns["department"].tolist()]
+    assert BatchEvaluator().evaluate(node, columns).tolist() == expected
+
+
+def test_missing_column_raises():
+    with pytest.raises(RuleEvaluationError, match="Field not found in data: salary"):
+        BatchEvaluator().evaluate(RULE, {"age": [30], "department": ["Sales"], "experience": [1]})
+
+
+def test_stored_fields_skip_the_walk():
+    rule = make_rule(1)
+    rule.encode_ast()
+    walked = []
+    evaluator = BatchEvaluator()
+    evaluator.referenced_fields = lambda node: walked.append(node)
+    mask = evaluator.evaluate_records(rule.compact_ast(), RECORDS, rule.metadata.fields)
+    assert walked == []
+    assert mask.tolist() == [RuleEvaluator().evaluate(rule.compact_ast(), record) for record in RECORDS]
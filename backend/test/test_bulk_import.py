@@ -0,0 +1,34 @@
+# test/test_bulk_import.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from src.services.bulk_import import BulkRuleParser
+from src.services.parse_cache import ParseCache
+from src.utils.exceptions import RuleParsingError
+
+RULE_STRINGS = ["age > 30", "age >", "department = 'Sales' OR age < 25", "age > 30", "(age > 1"]
+
+
+def check_outcomes(outcomes):
+    assert len(outcomes) == len(RULE_STRINGS)
+    assert outcomes[0] == outcomes[3]
+    assert outcomes[0]["field"] == "age" and outcomes[0]["value"] == 30
+    assert outcomes[2]["operator"] == "OR"
+    assert isinstance(outcomes[1], RuleParsingError) and outcomes[1].position == 5
+    assert isinstance(outcomes[4], RuleParsingError) and outcomes[4].position == 0
+
+
+def test_parse_many_in_process_uses_cache():
+    cache = ParseCache()
+    outcomes = asyncio.run(BulkRuleParser(cache).parse_many(RULE_STRINGS))
+    check_outcomes(outcomes)
+    assert len(cache) == 2
+
+
+def test_parse_many_on_pool_matches_in_process():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        bulk = BulkRuleParser(executor=lambda: executor, chunk_size=2, min_parallel_size=1)
+        bulk.parse_cache.parse("age > 30")
+        outcomes = asyncio.run(bulk.parse_many(RULE_STRINGS))
+    check_outcomes(outcomes)
+    # Pool results are not added to the cache
+    assert len(bulk.parse_cache) == 1
@@ -0,0 +1,85 @@
+# test/test_cli.py
+import asyncio
+import csv
+import json
+import pytest
+from src import cli
+from src.config import database_url
+from src.models.database import SQLiteDatabase
+from data import make_rule
+
+
+@pytest.fixture
+def records(tmp_path):
+    path = tmp_path / "records.jsonl"
+    path.write_text('{"age": 40}\n\n{"age": 20}\n{"name": "x"}\n')
+    return path
+
+
+def test_rule_or_rule_id_is_required(capsys):
+    for argv in (["in.jsonl"], ["--rule", "age > 1", "--rule-id", "1", "in.jsonl"]):
+        with pytest.raises(SystemExit) as exit:
+            cli.build_parser().parse_args(argv)
+        assert exit.value.code == 2
+
+
+def test_db_type_defaults_to_the_environment(monkeypatch):
+    monkeypatch.setenv("DB_TYPE", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", "/data/rules.db")
+    args = cli.build_parser().parse_args(["--rule-id", "1", "in.jsonl"])
+    assert args.db_type == "sqlite" and database_url(args.db_type) == "/data/rules.db"
+    assert database_url("unknown") == ""
+
+
+def test_annotates_jsonl(records, tmp_path, capsys):
+    output = tmp_path / "out.jsonl"
+    assert cli.main(["--rule", "age > 30", str(records), "-o", str(output)]) == 0
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [row["result"] for row in rows] == [True, False, None]
+    assert "Field not found" in rows[2]["error"]
+    assert "3 rows" in capsys.readouterr().err
+
+
+def test_malformed_jsonl_lines_become_error_rows(tmp_path, capsys):
+    source = tmp_path / "records.jsonl"
+    source.write_text('{"age": 40}\n{"age": \n{"age": 20}\n')
+    output = tmp_path / "out.jsonl"
+    assert cli.main(["--rule", "age > 30", str(source), "-o", str(output)]) == 0
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [row["result"] for row in rows] == [True, None, False]
+    assert rows[1]["error"].startswith("Invalid JSON on line 2")
+    err = capsys.readouterr().err
+    assert "3 rows" in err and "1 errors" in err
+
+
+def test_filters_csv(tmp_path, capsys):
+    source = tmp_path / "records.csv"
+    source.write_text("age,department\n40,Sales\n20,Sales\n35,IT\n")
+    assert cli.main(["--rule", "age > 30 AND department = 'Sales'", "--mode", "filter", str(source)]) == 0
+    out = capsys.readouterr().out
+    assert list(csv.reader(out.splitlines())) == [["age", "department"], ["40", "Sales"]]
+
+
+def test_exit_codes_for_bad_rules_and_inputs(records, tmp_path, capsys):
+    assert cli.main(["--rule", "age >", str(records)]) == 2
+    assert cli.main(["--rule", "age > 1", str(tmp_path / "missing.jsonl")]) == 1
+    assert cli.main(["--rule-id", "1", "--db-type", "nosuchdb", str(records)]) == 2
+    assert capsys.readouterr().err.count("error:") == 3
+
+
+def test_loads_stored_rules(records, tmp_path, capsys):
+    path = str(tmp_path / "rules.db")
+
+    async def store():
+        db = SQLiteDatabase(path)
+        await db.connect()
+        try:
+            return (await db.create_rule(make_rule(30))).id
+        finally:
+            await db.close()
+
+    rule_id = asyncio.run(store())
+    assert cli.main(["--rule-id", rule_id, "--db-type", "sqlite", "--db-url", path, "--mode", "filter", str(records)]) == 0
+    assert capsys.readouterr().out == '{"age": 40}\n'
+    assert cli.main(["--rule-id", "999", "--db-type", "sqlite", "--db-url", path, str(records)]) == 2
+    assert "not found" in capsys.readouterr().err
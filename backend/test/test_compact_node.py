@@ -0,0 +1,37 @@
+# test/test_compact_node.py
+import json
+from src.models.ast_node import Operator
+from src.models.compact_node import CompactNode
+from src.services.rule_combiner import RuleCombiner
+from src.services.rule_compiler import RuleCompiler
+from src.services.rule_evaluator import RuleEvaluator
+from data import RULE, RECORDS, comparison
+
+
+def test_round_trips_losslessly():
+    compact = CompactNode.from_ast(RULE)
+    assert compact.to_ast() == RULE
+    assert compact.to_dict() == RULE.to_dict()
+    assert CompactNode.from_dict(RULE.to_dict()) == compact
+    assert CompactNode.from_dict(json.loads(json.dumps(RULE.to_dict()))) == compact
+
+
+def test_evaluates_like_ast_node():
+    compact = CompactNode.from_ast(RULE)
+    compiled = RuleCompiler().compile(compact)
+    evaluator = RuleEvaluator()
+    for record in RECORDS:
+        assert compiled(record) == evaluator.evaluate(compact, record) == evaluator.evaluate(RULE, record)
+
+
+def test_combiner_keeps_node_class():
+    rules = [CompactNode.from_ast(comparison("age", Operator.GT, age)) for age in range(3)]
+    combined = RuleCombiner().combine_rules(rules, "OR")
+    assert isinstance(combined, CompactNode)
+    assert combined.to_ast() == RuleCombiner().combine_rules([rule.to_ast() for rule in rules], "OR")
+
+
+def test_deep_trees_convert_without_recursion():
+    rules = [CompactNode.from_ast(comparison("age", Operator.GT, age)) for age in range(5000)]
+    combined = RuleCombiner().combine_rules(rules, "AND")
+    assert CompactNode.from_dict(combined.to_dict()) == combined
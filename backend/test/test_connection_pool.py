@@ -0,0 +1,90 @@
+# test/test_connection_pool.py
+import asyncio
+import pytest
+from src.models.connection_pool import PoolConfig, SQLitePool
+from src.models.database import PostgresDatabase, SQLiteDatabase
+from data import make_rule
+
+
+def test_readers_run_concurrently(tmp_path):
+    async def scenario():
+        pool = SQLitePool(str(tmp_path / "rules.db"), readers=3)
+        await pool.open()
+        try:
+            held = []
+
+            async def read():
+                async with pool.read() as connection:
+                    held.append(connection)
+                    await asyncio.sleep(0.01)
+
+            await asyncio.gather(*(read() for _ in range(6)))
+            async with pool.writer.execute("PRAGMA journal_mode") as cursor:
+                journal_mode = (await cursor.fetchone())[0]
+            return held, pool.stats(), journal_mode
+        finally:
+            await pool.close()
+
+    held, stats, journal_mode = asyncio.run(scenario())
+    assert journal_mode == "wal"
+    assert len({id(connection) for connection in held}) == 3
+    assert stats["read"]["checkouts"] == 6 and stats["idle_readers"] == 3
+    # Three reads had to wait for a connection to come back
+    assert stats["read"]["max_wait_ms"] > 5
+
+
+def test_readers_see_committed_writes(tmp_path):
+    async def scenario():
+        db = SQLiteDatabase(str(tmp_path / "rules.db"), PoolConfig(sqlite_readers=2))
+        await db.connect()
+        try:
+            created = await db.create_rule(make_rule(1))
+            fetched = await asyncio.gather(*(db.get_rule(created.id) for _ in range(4)))
+            return fetched, db.pool_stats()
+        finally:
+            await db.close()
+
+    fetched, stats = asyncio.run(scenario())
+    assert [rule.name for rule in fetched] == ["rule 1"] * 4
+    assert stats["write"]["checkouts"] >= 2 and stats["read"]["checkouts"] == 4
+
+
+def test_memory_database_reads_through_the_writer():
+    async def scenario():
+        db = SQLiteDatabase(":memory:")
+        await db.connect()
+        try:
+            created = await db.create_rule(make_rule(1))
+            return await db.get_rule(created.id), db.pool_stats()
+        finally:
+            await db.close()
+
+    fetched, stats = asyncio.run(scenario())
+    assert fetched.name == "rule 1"
+    assert stats["readers"] == 0 and stats["journal_mode"] == "memory"
+
+
+def test_postgres_pool_statistics(tmp_path):
+    async def scenario():
+        db = PostgresDatabase(f"sqlite+aiosqlite:///{tmp_path}/rules.db")
+        await db.connect()
+        try:
+            created = await db.create_rules([make_rule(index) for index in range(3)])
+            await db.get_rules([rule.id for rule in created])
+            return db.pool_stats()
+        finally:
+            await db.close()
+
+    stats = asyncio.run(scenario())
+    assert stats["checkouts"] >= 2 and stats["queries"] >= 2
+    assert stats["waiting"] == 0
+
+
+def test_engine_options():
+    config = PoolConfig(pool_size=5, max_overflow=2, statement_cache_size=0)
+    options = config.engine_options("postgresql+asyncpg://user@localhost/rules")
+    assert options["pool_size"] == 5 and options["max_overflow"] == 2
+    assert options["connect_args"] == {"statement_cache_size": 0}
+    assert config.engine_options("sqlite+aiosqlite:///rules.db") == {}
+    with pytest.raises(ValueError):
+        PoolConfig(sqlite_readers=0)
@@ -0,0 +1,253 @@
+# test/test_database.py
+import asyncio
+import aiosqlite
+import pytest
+from src.models.database import PostgresDatabase, SQLiteDatabase
+from src.models.inmemory_database import InMemoryDatabase
+from src.models.rule import Rule, RuleSet
+from src.utils.exceptions import RuleVersionConflictError
+from src.services.rule_cache import PreparedRule, RuleCache
+from src.services.rule_parser import RuleParser
+from src.utils.helpers import RuleHelper
+from data import RULE, make_rule
+
+
+@pytest.fixture(params=["sqlite", "postgres", "inmemory"])
+def open_database(request, tmp_path):
+    """Returns a database factory for each backend runnable here (Postgres code on aiosqlite)"""
+    path = tmp_path / "rules.db"
+
+    def factory():
+        if request.param == "sqlite":
+            return SQLiteDatabase(str(path))
+        if request.param == "inmemory":
+            return InMemoryDatabase(str(tmp_path / "store"))
+        return PostgresDatabase(f"sqlite+aiosqlite:///{path}")
+    factory.backend = request.param
+    return factory
+
+
+def run(open_database, scenario):
+    async def main():
+        db = open_database()
+        await db.connect()
+        try:
+            return await scenario(db)
+        finally:
+            await db.close()
+    return asyncio.run(main())
+
+
+def test_get_rules_in_request_order(open_database):
+    async def scenario(db):
+        created = await db.create_rules([make_rule(index) for index in range(5)])
+        ids = [rule.id for rule in created]
+        requested = [ids[3], "999", ids[0], "not-an-id", ids[3]]
+        return created, await db.get_rules(requested)
+
+    created, fetched = run(open_database, scenario)
+    assert [rule and rule.name for rule in fetched] == ["rule 3", None, "rule 0", None, "rule 3"]
+    assert fetched[0].compact_ast() == created[3].compact_ast()
+
+
+def test_get_rules_batches_large_requests(open_database):
+    async def scenario(db):
+        created = await db.create_rules([make_rule(index) for index in range(2000)])
+        return await db.get_rules([rule.id for rule in reversed(created)])
+
+    fetched = run(open_database, scenario)
+    assert [rule.name for rule in fetched] == [f"rule {index}" for index in reversed(range(2000))]
+
+
+def test_keyset_pagination(open_database):
+    async def scenario(db):
+        created = await db.create_rules([make_rule(index) for index in range(10)])
+        pages = []
+        after_id = None
+        while True:
+            page = await db.list_rules(limit=4, after_id=after_id)
+            if not page:
+                break
+            pages.append([rule.name for rule in page])
+            after_id = page[-1].id
+        with pytest.raises(ValueError):
+            await db.list_rules(after_id="not-an-id")
+        return created, pages
+
+    created, pages = run(open_database, scenario)
+    names = [rule.name for rule in created]
+    assert pages == [names[0:4], names[4:8], names[8:10]]
+
+
+def test_iter_rules_streams_every_rule_in_order(open_database):
+    async def scenario(db):
+        created = await db.create_rules([make_rule(index) for index in range(25)])
+        streamed = [rule async for rule in db.iter_rules(batch_size=4)]
+        return created, streamed
+
+    created, streamed = run(open_database, scenario)
+    assert [rule.id for rule in streamed] == [rule.id for rule in created]
+    assert streamed[7].compact_ast() == created[7].compact_ast()
+
+
+def test_update_and_delete_bump_versions(open_database):
+    async def scenario(db):
+        notified = []
+        db.add_change_listener(notified.append)
+        created = await db.create_rule(make_rule(1))
+        updated = await db.update_rule(created.id, make_rule(2), expected_version=1)
+        with pytest.raises(RuleVersionConflictError) as conflict:
+            await db.update_rule(created.id, make_rule(3), expected_version=1)
+        stored = await db.get_rule(created.id)
+        missing = await db.update_rule("999", make_rule(4))
+        deleted = await db.delete_rule(created.id)
+        return (created, updated, conflict.value, stored, missing, deleted,
+                await db.delete_rule(created.id), await db.get_rules([created.id]), notified)
+
+    created, updated, conflict, stored, missing, deleted, deleted_again, fetched, notified = run(open_database, scenario)
+    assert created.version == 1 and updated.version == 2
+    assert conflict.current_version == 2
+    assert (stored.name, stored.version, stored.compact_ast()) == ("rule 2", 2, make_rule(2).compact_ast())
+    assert missing is None
+    assert deleted and not deleted_again and fetched == [None]
+    assert notified == [created.id] * 3
+
+
+def test_rules_are_stored_with_their_metadata(open_database):
+    def parsed(rule_string):
+        return Rule(name=rule_string, rule_string=rule_string,
+                    ast=RuleParser().parse_compact(rule_string).to_dict())
+
+    async def scenario(db):
+        created = await db.create_rule(parsed("(age > 30 AND department = 'Sales') OR age < 25"))
+        spaced = await db.create_rule(parsed("( age>30 AND department='Sales' ) OR age<25"))
+        await db.update_rule(spaced.id, parsed("salary > 5000"))
+        return created, await db.get_rules([created.id, spaced.id])
+
+    created, (stored, updated) = run(open_database, scenario)
+    assert stored.metadata == created.metadata
+    assert stored.metadata.fields == ["age", "department"]
+    assert (stored.metadata.depth, stored.metadata.node_count) == (3, 5)
+    assert stored.metadata.operators == {"OR": 1, "AND": 1, ">": 1, "=": 1, "<": 1}
+    assert updated.metadata.fields == ["salary"]
+    assert updated.metadata.fingerprint != stored.metadata.fingerprint
+    assert updated.metadata == updated.describe()
+    # The fingerprint follows the tree, not the spelling of the rule string
+    assert parsed("( age>30 AND department='Sales' ) OR age<25").describe().fingerprint == stored.metadata.fingerprint
+
+
+def test_stored_depth_matches_the_ast_depth():
+    rule = Rule(name="combined", rule_string="combined", ast=RULE.to_dict())
+    rule.encode_ast()
+    assert rule.metadata.depth == RuleHelper.get_nested_depth(RULE.to_dict()) == 4
+
+
+def test_sqlite_fills_in_metadata_of_older_rows(tmp_path):
+    path = str(tmp_path / "rules.db")
+
+    async def main():
+        async with aiosqlite.connect(path) as legacy:
+            await legacy.execute("CREATE TABLE rules (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, "
+                                 "description TEXT, rule_string TEXT NOT NULL, ast TEXT NOT NULL)")
+            await legacy.execute("INSERT INTO rules (name, rule_string, ast) VALUES (?, ?, ?)",
+                                 ("old", "age > 1", str(make_rule(1).ast)))
+            # Unreadable rows are skipped rather than failing the connection
+            await legacy.executemany("INSERT INTO rules (name, rule_string, ast) VALUES (?, ?, ?)",
+                                     [("broken", "age > 1", "{'type'"), ("empty", "age > 1", "{}")])
+            await legacy.commit()
+        db = SQLiteDatabase(path)
+        await db.connect()
+        try:
+            async with aiosqlite.connect(path) as raw:
+                async with raw.execute("SELECT id FROM rules WHERE meta IS NULL ORDER BY id") as cursor:
+                    skipped = [row[0] for row in await cursor.fetchall()]
+            return await db.get_rule("1"), skipped
+        finally:
+            await db.close()
+
+    rule, skipped = asyncio.run(main())
+    assert skipped == [2, 3]
+    assert rule.metadata == make_rule(1).describe()
+    assert rule.compact_ast() == make_rule(1).compact_ast()
+
+
+def test_change_feed_reaches_other_connections(open_database):
+    if open_database.backend == "inmemory":
+        pytest.skip("An in-memory store is owned by one process")
+
+    async def scenario(db):
+        other = open_database()
+        await other.connect()
+        try:
+            before = await db.create_rule(make_rule(0))
+            feed = db.watch_changes(poll_interval=0.01)
+            first = asyncio.ensure_future(feed.__anext__())
+            await asyncio.sleep(0.05)
+            created = await other.create_rules([make_rule(1), make_rule(2)])
+            await other.update_rule(created[0].id, make_rule(3))
+            await other.delete_rule(before.id)
+            changes = [await first] + [await feed.__anext__() for _ in range(3)]
+            await feed.aclose()
+            logged = await db.changes_since(0)
+            return before, created, changes, logged
+        finally:
+            await other.close()
+
+    before, created, changes, logged = run(open_database, scenario)
+    assert [(change.rule_id, change.version, change.operation) for change in changes] == [
+        (created[0].id, 1, "create"), (created[1].id, 1, "create"),
+        (created[0].id, 2, "update"), (before.id, 1, "delete"),
+    ]
+    assert [change.seq for change in logged] == sorted(change.seq for change in logged)
+    assert len(logged) == 5
+
+
+def test_prune_keeps_the_newest_changes(open_database):
+    async def scenario(db):
+        created = await db.create_rules([make_rule(index) for index in range(5)])
+        pruned = await db.prune_changes(keep=2)
+        return created, pruned, await db.changes_since(0), await db.prune_changes(keep=2)
+
+    created, pruned, kept, pruned_again = run(open_database, scenario)
+    assert (pruned, pruned_again) == (3, 0)
+    assert [change.rule_id for change in kept] == [rule.id for rule in created[-2:]]
+
+
+def test_rule_sets(open_database):
+    async def scenario(db):
+        created = await db.create_rule_set(RuleSet(name="adults", rule_ids=["3", "1"], strategy="OR"))
+        other = await db.create_rule_set(RuleSet(name="seniors", rule_ids=["2"]))
+        fetched = await db.get_rule_set(created.id)
+        listed = await db.list_rule_sets()
+        deleted = await db.delete_rule_set(other.id)
+        return (fetched, [rule_set.name for rule_set in listed], deleted,
+                await db.delete_rule_set(other.id), await db.get_rule_set(other.id),
+                await db.get_rule_set("not-an-id"))
+
+    fetched, names, deleted, deleted_again, gone, invalid = run(open_database, scenario)
+    assert (fetched.name, fetched.rule_ids, fetched.strategy) == ("adults", ["3", "1"], "OR")
+    assert names == ["adults", "seniors"]
+    assert deleted and not deleted_again
+    assert gone is None and invalid is None
+
+
+def test_rule_cache_loads_all_misses_at_once():
+    rule_cache = RuleCache()
+    calls = []
+
+    async def load_many(rule_ids):
+        calls.append(list(rule_ids))
+        return [f"rule {rule_id}" if rule_id != "missing" else None for rule_id in rule_ids]
+
+    def prepare(rule):
+        return PreparedRule(rule, None, lambda data: True)
+
+    async def scenario():
+        first = await rule_cache.get_many_or_load(["1", "2", "missing", "1"], load_many, prepare)
+        second = await rule_cache.get_many_or_load(["2", "3"], load_many, prepare)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert [entry and entry.rule for entry in first] == ["rule 1", "rule 2", None, "rule 1"]
+    assert [entry.rule for entry in second] == ["rule 2", "rule 3"]
+    assert calls == [["1", "2", "missing"], ["3"]]
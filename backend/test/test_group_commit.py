@@ -0,0 +1,117 @@
+# test/test_group_commit.py
+import asyncio
+import pytest
+from src.models.database import PostgresDatabase, SQLiteDatabase
+from src.models.group_commit import GroupCommitter
+from src.models.inmemory_database import InMemoryDatabase
+from data import make_rule
+
+
+class Recorder:
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    async def write_many(self, items):
+        self.batches.append(list(items))
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("disk full")
+        return [f"stored {item}" for item in items]
+
+
+def test_flushes_when_the_batch_is_full():
+    async def main():
+        recorder = Recorder()
+        committer = GroupCommitter(recorder.write_many, max_batch=3, max_delay=60)
+        tasks = [asyncio.ensure_future(committer.submit(index)) for index in range(7)]
+        await asyncio.sleep(0.01)
+        full_batches = list(recorder.batches)
+        # The partial batch left over only goes out on close
+        await asyncio.wait_for(committer.close(), 1)
+        return full_batches, recorder.batches, await asyncio.gather(*tasks)
+
+    full_batches, batches, results = asyncio.run(main())
+    assert full_batches == [[0, 1, 2], [3, 4, 5]]
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+    assert results == [f"stored {index}" for index in range(7)]
+
+
+def test_flushes_after_the_delay():
+    async def main():
+        recorder = Recorder()
+        committer = GroupCommitter(recorder.write_many, max_batch=100, max_delay=0.01)
+        results = await asyncio.gather(*(committer.submit(index) for index in range(5)))
+        return recorder.batches, results, committer.stats()
+
+    batches, results, stats = asyncio.run(main())
+    assert batches == [[0, 1, 2, 3, 4]]
+    assert results == [f"stored {index}" for index in range(5)]
+    assert (stats["batches"], stats["rules"], stats["avg_batch_size"]) == (1, 5, 5.0)
+
+
+def test_batches_commit_in_flush_order():
+    async def main():
+        committed = []
+
+        async def write_many(items):
+            # The first, full batch is the slowest to write
+            await asyncio.sleep(0.02 if items[0] == 0 else 0)
+            committed.extend(items)
+            return items
+
+        committer = GroupCommitter(write_many, max_batch=3, max_delay=0)
+        await asyncio.gather(*(committer.submit(index) for index in range(4)))
+        return committed
+
+    assert asyncio.run(main()) == [0, 1, 2, 3]
+
+
+def test_a_failed_batch_fails_every_caller():
+    async def main():
+        committer = GroupCommitter(Recorder(fail=True).write_many, max_batch=2, max_delay=0)
+        return await asyncio.gather(*(committer.submit(index) for index in range(2)), return_exceptions=True)
+
+    outcomes = asyncio.run(main())
+    assert [str(outcome) for outcome in outcomes] == ["disk full", "disk full"]
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "postgres"])
+def test_concurrent_creates_share_transactions(backend, tmp_path):
+    path = tmp_path / "rules.db"
+
+    async def main():
+        db = SQLiteDatabase(str(path)) if backend == "sqlite" else PostgresDatabase(f"sqlite+aiosqlite:///{path}")
+        db.enable_group_commit(max_batch=8, max_delay=0.01)
+        await db.connect()
+        try:
+            notified = []
+            db.add_change_listener(notified.append)
+            created = await asyncio.gather(*(db.create_rule(make_rule(index)) for index in range(20)))
+            stored = await db.get_rules([rule.id for rule in created])
+            return created, stored, notified, db.pool_stats()["group_commit"], await db.changes_since(0)
+        finally:
+            await db.close()
+
+    created, stored, notified, stats, changes = asyncio.run(main())
+    assert [rule.name for rule in stored] == [f"rule {index}" for index in range(20)]
+    assert len({rule.id for rule in created}) == 20 and all(rule.version == 1 for rule in created)
+    assert sorted(notified) == sorted(rule.id for rule in created)
+    assert [change.rule_id for change in changes] == [rule.id for rule in created]
+    assert (stats["batches"], stats["largest_batch"]) == (3, 8)
+
+
+def test_unsupported_backends_refuse_group_commit():
+    with pytest.raises(NotImplementedError):
+        InMemoryDatabase().enable_group_commit()
+
+
+def test_app_leaves_group_commit_off_where_unsupported(monkeypatch, tmp_path, capsys):
+    import src.app as app_module
+    monkeypatch.setattr(app_module, "GROUP_COMMIT", True)
+    monkeypatch.setattr(app_module, "DB_TYPE", "inmemory")
+    unsupported, supported = InMemoryDatabase(), SQLiteDatabase(str(tmp_path / "rules.db"))
+    app_module.configure_group_commit(unsupported)
+    app_module.configure_group_commit(supported)
+    assert unsupported.group_committer is None and supported.group_committer is not None
+    assert "GROUP_COMMIT is ignored: the inmemory backend" in capsys.readouterr().out
@@ -0,0 +1,160 @@
+# test/test_inmemory_database.py
+import asyncio
+import os
+import threading
+import pytest
+from src.models.inmemory_database import COMPACTING_LOG_FILE, LOG_FILE, SNAPSHOT_FILE, InMemoryDatabase
+from src.models.rule import RuleSet
+from data import make_rule
+
+
+def reopen(path, scenario, **options):
+    async def main():
+        db = InMemoryDatabase(str(path), **options)
+        await db.connect()
+        try:
+            return await scenario(db)
+        finally:
+            await db.close()
+    return asyncio.run(main())
+
+
+def test_state_survives_restart(tmp_path):
+    async def write(db):
+        created = await db.create_rules([make_rule(index) for index in range(20)])
+        await db.update_rule(created[0].id, make_rule(100))
+        await db.delete_rule(created[1].id)
+        await db.create_rule_set(RuleSet(name="adults", rule_ids=[created[2].id]))
+        return created
+
+    async def read(db):
+        rules = [rule async for rule in db.iter_rules()]
+        return rules, await db.get_rule_set("1"), await db.create_rule(make_rule(50))
+
+    created = reopen(tmp_path, write, snapshot_every=7)
+    rules, rule_set, new_rule = reopen(tmp_path, read)
+    assert [rule.id for rule in rules] == [rule.id for rule in created if rule.id != created[1].id]
+    assert (rules[0].name, rules[0].version) == ("rule 100", 2)
+    assert rules[5].compact_ast() == make_rule(6).compact_ast()
+    assert rule_set.rule_ids == [created[2].id]
+    # IDs are never reused, even for deleted rules
+    assert new_rule.id == "21"
+
+
+def test_boot_maps_the_snapshot_without_decoding(tmp_path):
+    reopen(tmp_path, lambda db: db.create_rules([make_rule(index) for index in range(100)]))
+    assert os.path.getsize(tmp_path / LOG_FILE) == 0
+
+    async def read(db):
+        stored = db._rules[50]
+        return isinstance(stored.ast_bin, memoryview), db.pool_stats(), (await db.get_rule("50")).name
+
+    lazy, stats, name = reopen(tmp_path, read)
+    assert lazy and stats["snapshot_mapped"] and stats["rules"] == 100
+    assert name == "rule 49"
+
+
+def test_log_is_replayed_and_torn_record_dropped(tmp_path):
+    async def crash(db):
+        await db.create_rules([make_rule(index) for index in range(3)])
+        await db.update_rule("2", make_rule(20))
+        # Simulate a crash: half a record at the end and no compaction on close
+        db._log.write(b"\x40\x00\x00")
+        db._log.flush()
+        db._log.close()
+        db._log = None
+
+    reopen(tmp_path, crash)
+    assert not os.path.exists(tmp_path / SNAPSHOT_FILE)
+
+    async def read(db):
+        return [(rule.name, rule.version) for rule in await db.list_rules()], await db.latest_change_seq()
+
+    rules, seq = reopen(tmp_path, read)
+    assert rules == [("rule 0", 1), ("rule 20", 2), ("rule 2", 1)]
+    assert seq == 4
+
+
+def test_without_a_directory_nothing_is_written(tmp_path):
+    async def scenario(db):
+        created = await db.create_rule(make_rule(1))
+        return await db.get_rule(created.id), db.pool_stats()
+
+    async def main():
+        db = InMemoryDatabase()
+        await db.connect()
+        try:
+            return await scenario(db)
+        finally:
+            await db.close()
+
+    rule, stats = asyncio.run(main())
+    assert rule.name == "rule 1" and not stats["snapshot_mapped"]
+
+
+def test_a_store_has_one_owner(tmp_path):
+    async def main():
+        owner = InMemoryDatabase(str(tmp_path))
+        await owner.connect()
+        try:
+            with pytest.raises(RuntimeError, match="in use by another process"):
+                await InMemoryDatabase(str(tmp_path)).connect()
+        finally:
+            await owner.close()
+        successor = InMemoryDatabase(str(tmp_path))
+        await successor.connect()
+        await successor.close()
+
+    asyncio.run(main())
+
+
+def test_compaction_runs_beside_writes(tmp_path):
+    gate = threading.Event()
+
+    async def write(db):
+        write_snapshot = db._write_snapshot
+
+        def slow_write_snapshot(captured):
+            gate.wait(5)
+            write_snapshot(captured)
+        db._write_snapshot = slow_write_snapshot
+        await db.create_rules([make_rule(index) for index in range(5)])
+        compaction = db._compaction
+        await asyncio.sleep(0.01)
+        # The snapshot is still being written, yet writes are accepted
+        await db.create_rules([make_rule(index) for index in range(5, 8)])
+        await db.delete_rule("1")
+        compacting = os.path.exists(tmp_path / COMPACTING_LOG_FILE)
+        gate.set()
+        await compaction
+        return compacting, db.pool_stats()["log_records"], (await db.get_rule("7")).name
+
+    compacting, log_records, name = reopen(tmp_path, write, snapshot_every=5)
+    assert compacting and log_records == 4 and name == "rule 6"
+
+    async def read(db):
+        return [rule.name for rule in await db.list_rules()]
+
+    assert reopen(tmp_path, read) == [f"rule {index}" for index in range(1, 8)]
+
+
+def test_interrupted_compaction_is_finished_on_boot(tmp_path):
+    async def crash(db):
+        def fail(captured):
+            raise OSError("disk full")
+        db._write_snapshot = fail
+        await db.create_rules([make_rule(index) for index in range(3)])
+        await db._compaction
+        await db.create_rule(make_rule(3))
+        db._log.close()
+        db._log = None
+
+    reopen(tmp_path, crash, snapshot_every=3)
+    assert os.path.exists(tmp_path / COMPACTING_LOG_FILE)
+
+    async def read(db):
+        return [rule.name for rule in await db.list_rules()], db.pool_stats()
+
+    names, stats = reopen(tmp_path, read)
+    assert names == [f"rule {index}" for index in range(4)]
+    assert stats["snapshot_mapped"] and not os.path.exists(tmp_path / COMPACTING_LOG_FILE)
@@ -0,0 +1,24 @@
+# test/test_lru_cache.py
+import time
+from src.utils.lru_cache import LRUCache
+
+
+def test_lru_eviction_and_counters():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert cache.invalidate("a") is True
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["invalidations"]) == (1, 1, 1, 1)
+
+
+def test_ttl_expiry():
+    cache = LRUCache(maxsize=4, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
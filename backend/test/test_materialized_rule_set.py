@@ -0,0 +1,148 @@
+# test/test_materialized_rule_set.py
+import pytest
+from src.models.ast_node import Operator
+from src.models.compact_node import CompactNode
+from src.models.node_interner import NodeInterner
+from src.services.materialized_rule_set import MaterializedRuleSet
+from src.services.rule_combiner import RuleCombiner
+from src.services.rule_evaluator import RuleEvaluator
+from src.services.rule_set_evaluator import RuleSetEvaluator
+from src.utils.exceptions import RuleCombiningError
+import src.app as app_module
+from data import RULE, RECORDS, app_client, comparison, operator
+
+
+def outcome(evaluate, record):
+    try:
+        return evaluate(record)
+    except Exception as e:
+        return str(e)
+
+
+def members(count):
+    return [CompactNode.from_ast(comparison("age", Operator.GT, 20 + index)) for index in range(count)]
+
+
+def assert_matches_full_combination(materialized, asts, strategy, combiner=None):
+    expected = (combiner or RuleCombiner()).combine_rules(asts, strategy)
+    assert materialized.ast.to_dict() == expected.to_dict()
+    evaluator = RuleEvaluator()
+    for record in RECORDS + [{"age": 21}, {"department": "Sales"}]:
+        assert outcome(materialized.evaluate, record) == outcome(lambda data: evaluator.evaluate(expected, data), record)
+
+
+@pytest.mark.parametrize("strategy", ["AND", "OR", "OPTIMIZE"])
+@pytest.mark.parametrize("count", [1, 2, 7, 16])
+def test_update_matches_full_rebuild(strategy, count):
+    asts = members(count)
+    rule_ids = [str(index) for index in range(count)]
+    materialized = MaterializedRuleSet(rule_ids, asts, strategy)
+    assert_matches_full_combination(materialized, asts, strategy)
+
+    for position in range(count):
+        asts[position] = CompactNode.from_ast(RULE if position % 2 else comparison("salary", Operator.LT, 60000))
+        materialized.update(str(position), asts[position])
+        assert_matches_full_combination(materialized, asts, strategy)
+
+
+def test_update_rebuilds_only_the_path_to_the_root():
+    rule_ids = [str(index) for index in range(1000)]
+    materialized = MaterializedRuleSet(rule_ids, members(1000), "AND")
+    assert materialized.last_rebuilt == 999
+    assert materialized.update("500", CompactNode.from_ast(comparison("age", Operator.LT, 90))) == 10
+    # The last member is carried up past odd-sized levels
+    assert materialized.update("999", CompactNode.from_ast(comparison("age", Operator.LT, 90))) <= 10
+
+
+def test_repeated_member_is_updated_everywhere():
+    asts = members(3)
+    materialized = MaterializedRuleSet(["a", "b", "a"], asts, "OR")
+    replacement = CompactNode.from_ast(comparison("age", Operator.GT, 100))
+    materialized.update("a", replacement)
+    assert_matches_full_combination(materialized, [replacement, asts[1], replacement], "OR")
+
+
+def test_stale_members():
+    materialized = MaterializedRuleSet(["a", "b"], members(2), "AND")
+    assert materialized.mark_stale("a") and not materialized.mark_stale("c")
+    assert materialized.stale == {"a"}
+    materialized.update("a", CompactNode.from_ast(RULE))
+    assert not materialized.stale
+    with pytest.raises(KeyError):
+        materialized.update("c", CompactNode.from_ast(RULE))
+
+
+def test_uses_given_predicates():
+    calls = []
+
+    def predicate(data):
+        calls.append(data)
+        return True
+
+    materialized = MaterializedRuleSet(["a", "b"], members(2), "AND", predicates=[predicate, predicate])
+    assert materialized.evaluate({}) is True
+    assert len(calls) == 2
+
+
+class RecordingSetEvaluator(RuleSetEvaluator):
+    def __init__(self):
+        super().__init__()
+        self.compiled = 0
+
+    def compile(self, node):
+        self.compiled += 1
+        return super().compile(node)
+
+
+@pytest.mark.parametrize("strategy", ["AND", "OR", "OPTIMIZE"])
+def test_shared_subtrees_are_memoized(strategy):
+    shared = operator(Operator.AND, comparison("age", Operator.GT, 30), comparison("department", Operator.EQ, "Sales"))
+    asts = [CompactNode.from_ast(operator(Operator.OR, shared, comparison("salary", Operator.GT, value)))
+            for value in (50000, 70000)]
+    set_evaluator = RecordingSetEvaluator()
+    materialized = MaterializedRuleSet(["a", "b"], asts, strategy, combiner=RuleCombiner(NodeInterner()),
+                                       rule_set_evaluator=set_evaluator)
+    assert set_evaluator.compiled == 1
+    # Both members hold the same canonical subtree
+    assert materialized.ast.left.left is materialized.ast.right.left or strategy == "OPTIMIZE"
+    # OPTIMIZE counts the operators of the shared DAG
+    assert_matches_full_combination(materialized, asts, strategy, RuleCombiner(NodeInterner()))
+
+    asts[1] = CompactNode.from_ast(RULE)
+    materialized.update("b", asts[1])
+    assert set_evaluator.compiled == 2
+    assert_matches_full_combination(materialized, asts, strategy, RuleCombiner(NodeInterner()))
+
+
+def test_unshared_members_keep_the_composed_closures():
+    set_evaluator = RecordingSetEvaluator()
+    MaterializedRuleSet(["a", "b"], members(2), "AND", combiner=RuleCombiner(NodeInterner()),
+                        rule_set_evaluator=set_evaluator)
+    assert set_evaluator.compiled == 0
+
+
+def test_invalid_sets():
+    with pytest.raises(RuleCombiningError):
+        MaterializedRuleSet([], [], "AND")
+    with pytest.raises(RuleCombiningError):
+        MaterializedRuleSet(["a"], members(1), "XOR")
+
+
+def test_members_of_a_rule_set_cannot_be_deleted(app_client):
+    rules = [{"name": f"rule {index}", "description": "d", "rule_string": f"age > {index}"} for index in range(2)]
+    rule_ids = [app_client.post("/rules/", json=rule).json()["id"] for rule in rules]
+    rule_set_id = app_client.post("/rule-sets/", json={"name": "both", "rule_ids": rule_ids}).json()["id"]
+
+    refused = app_client.delete(f"/rules/{rule_ids[0]}")
+    assert refused.status_code == 409
+    assert rule_set_id in refused.json()["detail"]
+
+    # A set broken behind the API's back says so instead of reporting a missing rule
+    app_module.invalidate_all_rules()
+    app_client.portal.call(app_module.db.delete_rule, rule_ids[0])
+    broken = app_client.get(f"/rule-sets/{rule_set_id}")
+    assert broken.status_code == 409
+    assert broken.json()["detail"] == f"Rule set {rule_set_id} is broken: Rule with id {rule_ids[0]} not found"
+
+    assert app_client.delete(f"/rule-sets/{rule_set_id}").status_code == 200
+    assert app_client.delete(f"/rules/{rule_ids[1]}").status_code == 200
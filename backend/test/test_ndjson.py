@@ -0,0 +1,61 @@
+# test/test_ndjson.py
+import asyncio
+import json
+import pytest
+from src.utils.ndjson import encode_lines, encode_lines_async, parse_records
+from data import app_client
+
+
+def test_parse_records_reads_arrays_and_ndjson():
+    assert parse_records(b'[{"a": 1}, {"a": 2}]') == [{"a": 1}, {"a": 2}]
+    assert parse_records(b'{"a": 1}\n\n  \n{"a": 2}\n') == [{"a": 1}, {"a": 2}]
+    assert parse_records(b"  \n ") == []
+
+
+@pytest.mark.parametrize("body, message", [
+    (b'{"a": 1}\n{"a": \n', "line 2"),
+    (b"[1, 2", "Expecting"),
+])
+def test_parse_records_rejects_invalid_json(body, message):
+    with pytest.raises(ValueError, match=message):
+        parse_records(body)
+
+
+def test_encode_lines_chunks_by_line_count():
+    chunks = list(encode_lines(({"i": index} for index in range(5)), chunk_size=2))
+    assert chunks == ['{"i":0}\n{"i":1}\n', '{"i":2}\n{"i":3}\n', '{"i":4}\n']
+    assert list(encode_lines([], chunk_size=2)) == []
+
+
+def test_encode_lines_async_matches_encode_lines():
+    async def items():
+        for index in range(5):
+            yield [index, index % 2 == 0]
+
+    async def collect():
+        return [chunk async for chunk in encode_lines_async(items(), chunk_size=3)]
+
+    assert asyncio.run(collect()) == list(encode_lines(([index, index % 2 == 0] for index in range(5)), chunk_size=3))
+
+
+def test_batch_endpoint_streams_results(app_client):
+    created = app_client.post("/rules/", json={"name": "adults", "description": "d", "rule_string": "age >= 18"})
+    rule_id = created.json()["id"]
+    body = '{"age": 20}\n{"age": 10}\n"not a record"\n{"name": "x"}\n'
+
+    response = app_client.post(f"/rules/{rule_id}/evaluate/batch?chunk_size=2", content=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[:2] == [[0, True], [1, False]]
+    assert [index for index, outcome in lines[2:]] == [2, 3]
+    assert all("error" in outcome for _, outcome in lines[2:])
+
+    echoed = app_client.post(f"/rules/{rule_id}/evaluate/batch?include_data=true", json=[{"age": 30}])
+    assert [json.loads(line) for line in echoed.text.splitlines()] == [[0, True, {"age": 30}]]
+
+
+def test_batch_endpoint_rejects_bad_bodies_and_unknown_rules(app_client):
+    created = app_client.post("/rules/", json={"name": "adults", "description": "d", "rule_string": "age >= 18"})
+    assert app_client.post(f"/rules/{created.json()['id']}/evaluate/batch", content=b"{oops").status_code == 400
+    assert app_client.post("/rules/999/evaluate/batch", json=[{"age": 1}]).status_code == 404
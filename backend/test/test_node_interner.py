@@ -0,0 +1,88 @@
+# test/test_node_interner.py
+import pytest
+from src.models.ast_node import NodeType, Operator
+from src.models.compact_node import CompactNode
+from src.models.node_interner import NodeInterner
+from src.services.rule_combiner import RuleCombiner
+from src.services.rule_evaluator import RuleEvaluator
+from src.services.rule_set_evaluator import RuleSetEvaluator
+from src.utils.exceptions import RuleEvaluationError
+from data import RULE, RECORDS, comparison, operator
+
+
+def sales():
+    # A fresh copy each call, so sharing only comes from interning
+    return operator(Operator.AND, comparison("age", Operator.GT, 30), comparison("department", Operator.EQ, "Sales"))
+
+
+def test_identical_subtrees_become_one_object():
+    interner = NodeInterner()
+    first = interner.intern(operator(Operator.OR, sales(), comparison("salary", Operator.GTE, 50000)))
+    second = interner.intern(operator(Operator.AND, sales(), comparison("experience", Operator.LTE, 5)))
+    assert first.left is second.left
+    assert first.left.left is interner.intern(comparison("age", Operator.GT, 30))
+    assert first.to_ast() == operator(Operator.OR, sales(), comparison("salary", Operator.GTE, 50000))
+    assert len(interner) == 7
+
+
+def test_value_types_stay_distinct():
+    interner = NodeInterner()
+    nodes = [interner.node(NodeType.COMPARISON, Operator.EQ, field="flag", value=value)
+             for value in (1, 1.0, True, "1")]
+    assert len({id(node) for node in nodes}) == 4
+    assert interner.node(NodeType.COMPARISON, Operator.EQ, field="flag", value=1) is nodes[0]
+
+
+def test_unhashable_values_are_not_shared():
+    interner = NodeInterner()
+    first = interner.node(NodeType.COMPARISON, Operator.EQ, field="tags", value=["a"])
+    second = interner.node(NodeType.COMPARISON, Operator.EQ, field="tags", value=["a"])
+    assert first is not second and first == second
+
+
+def test_combiner_builds_a_dag():
+    rules = [operator(Operator.OR, sales(), comparison("salary", Operator.GTE, salary)) for salary in range(50)]
+    plain = RuleCombiner().combine_rules(rules, "AND")
+    interner = NodeInterner()
+    combined = RuleCombiner(interner).combine_rules(rules, "AND")
+    assert isinstance(combined, CompactNode)
+    assert combined.to_ast() == plain
+    # One shared sales subtree (3 nodes), 50 leaves, 50 ORs and 49 ANDs
+    assert len(interner) == 3 + 50 + 50 + 49
+
+
+def test_simplify_does_not_mutate_interned_nodes():
+    interner = NodeInterner()
+    nested = interner.intern(operator(Operator.AND, sales(), comparison("salary", Operator.GTE, 1)))
+    shared_left = nested.left
+    simplified = RuleCombiner(interner).simplify_ast(nested)
+    assert nested.left is shared_left
+    assert simplified.to_ast() == RuleCombiner().simplify_ast(nested.to_ast())
+
+
+def test_rule_set_memoizes_shared_subtrees():
+    rules = {
+        str(index): operator(Operator.OR, sales(), comparison("salary", Operator.GTE, 50000 + index))
+        for index in range(5)
+    }
+    rules["all"] = RULE
+    evaluator = RuleEvaluator()
+    prepared = RuleSetEvaluator().prepare(rules)
+    assert prepared.shared_count == 1
+    for record in RECORDS:
+        results, errors = prepared.evaluate(record)
+        assert not errors
+        assert results == {rule_id: evaluator.evaluate(ast, record) for rule_id, ast in rules.items()}
+    assert RuleSetEvaluator(intern=False).prepare(rules).shared_count == 0
+
+
+def test_compiled_dag_matches_reference():
+    rules = [operator(Operator.AND, sales(), comparison("salary", Operator.GTE, salary))
+             for salary in (40000, 50000, 60000)]
+    combined = RuleCombiner(NodeInterner()).combine_rules(rules, "OR")
+    compiled = RuleSetEvaluator().compile(combined)
+    for record in RECORDS:
+        assert compiled(record) == compiled.evaluate_reference(record)
+
+    with pytest.raises(RuleEvaluationError, match="Field not found in data: department"):
+        compiled({"age": 40, "salary": 1})
@@ -0,0 +1,71 @@
+# test/test_parallel_evaluator.py
+import asyncio
+import pytest
+from src.services import parallel_evaluator
+from src.services.parallel_evaluator import ParallelEvaluator, _MISSING_RULE, _evaluate_chunk
+from src.services.rule_evaluator import RuleEvaluator
+from data import RECORDS, RULE
+
+
+def clear_worker_rules():
+    """Runs in a worker: forgets every compiled rule, as a restarted worker would"""
+    parallel_evaluator._worker_rules.clear()
+
+
+def expected(records):
+    evaluator = RuleEvaluator()
+    return [evaluator.evaluate(RULE, record) for record in records]
+
+
+@pytest.fixture
+def pool():
+    evaluator = ParallelEvaluator(max_workers=1, chunk_size=10, min_parallel_size=20)
+    yield evaluator
+    evaluator.shutdown()
+
+
+def test_worker_answers_missing_rule_without_payload():
+    key, payload = ParallelEvaluator.rule_key(RULE)
+    parallel_evaluator._worker_rules.pop(key, None)
+    assert _evaluate_chunk(key, RECORDS[:2])[1] == _MISSING_RULE
+    assert _evaluate_chunk(key, RECORDS[:2], payload)[1] == expected(RECORDS[:2])
+    # Once installed the payload is no longer needed
+    assert _evaluate_chunk(key, RECORDS[2:4])[1] == expected(RECORDS[2:4])
+    parallel_evaluator._worker_rules.pop(key, None)
+
+
+def test_chunks_are_reassembled_in_order(pool):
+    records = RECORDS + [{"age": 1}, "not a record"]
+    outcomes = pool.evaluate(RULE, records)
+    assert outcomes[:len(RECORDS)] == expected(RECORDS)
+    assert "error" in outcomes[-2] and "error" in outcomes[-1]
+
+
+def test_payload_is_only_shipped_until_every_worker_has_it(pool):
+    key, _ = ParallelEvaluator.rule_key(RULE)
+    pool.evaluate(RULE, RECORDS)
+    assert len(pool._installed[key]) == 1
+    assert pool._payload(key, RULE, None) is None
+
+
+def test_rule_is_resent_after_worker_cache_is_cleared(pool):
+    key, _ = ParallelEvaluator.rule_key(RULE)
+    assert pool.evaluate(RULE, RECORDS) == expected(RECORDS)
+    pool.executor.submit(clear_worker_rules).result()
+    # The parent still believes the worker holds the rule and ships no payload;
+    # the worker answers with the missing-rule marker and every chunk is resent
+    assert pool._payload(key, RULE, None) is None
+    assert pool.evaluate(RULE, RECORDS) == expected(RECORDS)
+    assert pool.evaluate(RULE, RECORDS, key="stored-fingerprint") == expected(RECORDS)
+
+
+def test_async_path_matches_sync_path(pool):
+    async def main():
+        return await pool.evaluate_async(RULE, RECORDS)
+
+    assert asyncio.run(main()) == pool.evaluate(RULE, RECORDS) == expected(RECORDS)
+
+
+def test_small_batches_stay_in_process(pool):
+    assert pool.evaluate(RULE, RECORDS[:5]) == expected(RECORDS[:5])
+    assert pool._executor is None
@@ -0,0 +1,41 @@
+# test/test_parse_cache.py
+import pytest
+from src.models.ast_node import Operator
+from src.services.parse_cache import ParseCache
+from src.utils.exceptions import RuleParsingError
+from src.utils.helpers import RuleHelper
+from data import RULE
+
+
+RULE_STRING = ("((age > 30 AND department = 'Sales') OR (age < 25 AND department = 'Marketing')) "
+               "AND (salary >= 50000 OR experience <= 5)")
+
+
+def test_normalization_ignores_whitespace_outside_quotes():
+    assert RuleHelper.format_rule_string("(age>=30   AND dept='Sales  Team')") == \
+        "( age >= 30 AND dept = 'Sales  Team' )"
+    assert RuleHelper.format_rule_string("a!=1") == "a != 1"
+
+
+def test_equivalent_strings_share_an_entry():
+    cache = ParseCache()
+    assert cache.parse(RULE_STRING) == RULE
+    assert cache.parse("  " + RULE_STRING.replace(" > ", ">")) == RULE
+    assert cache.stats()["hits"] == 1
+    assert len(cache) == 1
+
+
+def test_returned_copies_do_not_share_nodes():
+    cache = ParseCache()
+    first = cache.parse(RULE_STRING)
+    first.left.left.left.value = 99
+    first.right.operator = Operator.AND
+    assert cache.parse(RULE_STRING) == RULE
+    assert cache.parse_compact(RULE_STRING) is cache.parse_compact(RULE_STRING)
+
+
+def test_parse_errors_are_not_cached():
+    cache = ParseCache()
+    with pytest.raises(RuleParsingError):
+        cache.parse("age >")
+    assert len(cache) == 0
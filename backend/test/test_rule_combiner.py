@@ -0,0 +1,98 @@
+# test/test_rule_combiner.py
+import pytest
+from src.models.ast_node import NodeType, Operator
+from src.models.compact_node import CompactNode
+from src.models.node_interner import NodeInterner
+from src.services.rule_combiner import RuleCombiner
+from src.services.rule_evaluator import RuleEvaluator
+from src.utils.constants import RuleConstants
+from src.utils.exceptions import RuleCombiningError
+from data import RULE, RECORDS, comparison, operator
+
+
+def depth(node):
+    deepest = 0
+    stack = [(node, 1)]
+    while stack:
+        current, level = stack.pop()
+        deepest = max(deepest, level)
+        for child in (current.left, current.right):
+            if child is not None:
+                stack.append((child, level + 1))
+    return deepest
+
+
+def left_deep(rules, op):
+    result = rules[0]
+    for rule in rules[1:]:
+        result = operator(op, result, rule)
+    return result
+
+
+def assert_equivalent(combined, expected):
+    evaluator = RuleEvaluator()
+    for record in RECORDS:
+        assert evaluator.evaluate(combined, record) == evaluator.evaluate(expected, record)
+
+
+@pytest.mark.parametrize("strategy", ["AND", "OR"])
+def test_combination_is_balanced(strategy):
+    rules = [comparison("age", Operator.GT, age) for age in range(RuleConstants.MAX_COMBINED_RULES)]
+    combined = RuleCombiner().combine_rules(rules, strategy)
+    assert depth(combined) == 7  # ceil(log2(50)) operator levels above the leaves
+    assert_equivalent(combined, left_deep(rules, Operator[strategy]))
+
+
+def test_combination_keeps_clause_order():
+    rules = [comparison("age", Operator.GT, age) for age in range(7)]
+    combined = RuleCombiner().combine_rules(rules, "AND")
+    assert RuleCombiner()._collect_same_operator_nodes(combined, Operator.AND) == rules
+
+
+def test_optimize_keeps_anded_comparisons_anded():
+    rules = [comparison("age", Operator.GT, 25), comparison("age", Operator.LT, 35),
+             operator(Operator.AND, comparison("salary", Operator.GTE, 50000), comparison("age", Operator.GT, 25))]
+    combined = RuleCombiner().combine_rules(rules, "OPTIMIZE")
+    assert_equivalent(combined, left_deep(rules, Operator.AND))
+    # The repeated "age > 25" clause is kept once
+    assert len(RuleCombiner()._collect_same_operator_nodes(combined, Operator.AND)) == 3
+
+
+def test_optimize_uses_most_common_operator():
+    rules = [operator(Operator.OR, comparison("age", Operator.GT, 30), comparison("salary", Operator.LT, 45000)),
+             comparison("department", Operator.EQ, "Sales")]
+    combined = RuleCombiner().combine_rules(rules, "OPTIMIZE")
+    assert combined.operator == Operator.OR
+    assert_equivalent(combined, left_deep(rules, Operator.OR))
+
+    mixed = [RULE, comparison("age", Operator.GT, 40)]
+    assert_equivalent(RuleCombiner().combine_rules(mixed, "OPTIMIZE"), left_deep(mixed, Operator.AND))
+
+
+def test_optimize_scales_to_many_rules():
+    rules = [CompactNode.from_ast(comparison("age", Operator.GT, age % 1000)) for age in range(20000)]
+    combined = RuleCombiner().combine_rules(rules, "OPTIMIZE")
+    assert len(RuleCombiner()._collect_same_operator_nodes(combined, Operator.AND)) == 1000
+    assert depth(combined) == 11
+
+
+def test_simplify_flattens_into_a_balanced_tree():
+    chain = left_deep([comparison("age", Operator.GT, age) for age in range(16)], Operator.OR)
+    simplified = RuleCombiner().simplify_ast(chain)
+    assert depth(chain) == 16 and depth(simplified) == 5
+    assert_equivalent(simplified, chain)
+    # The input is left untouched
+    assert depth(chain) == 16
+
+
+def test_simplify_keeps_nodes_with_a_missing_child():
+    node = operator(Operator.AND, comparison("age", Operator.GT, 30), None)
+    simplified = RuleCombiner().simplify_ast(node)
+    assert simplified == node
+    interned = RuleCombiner(NodeInterner()).simplify_ast(node)
+    assert interned.type == NodeType.OPERATOR and interned.right is None
+
+
+def test_unknown_strategy():
+    with pytest.raises(RuleCombiningError):
+        RuleCombiner().combine_rules([RULE, RULE], "XOR")
@@ -0,0 +1,41 @@
+# test/test_rule_compiler.py
+import pytest
+from src.models.ast_node import ASTNode, NodeType, Operator
+from src.services.rule_compiler import RuleCompiler
+from src.services.rule_evaluator import RuleEvaluator
+from src.utils.exceptions import RuleEvaluationError
+from data import RECORDS, RULE, comparison, operator
+
+
+def test_compiled_matches_reference():
+    compiled = RuleCompiler().compile(RULE)
+    evaluator = RuleEvaluator()
+    for record in RECORDS:
+        assert compiled(record) == evaluator.evaluate(RULE, record)
+        assert compiled.cross_check(record) == compiled(record)
+
+
+def test_compiled_raises_same_errors():
+    compiled = RuleCompiler().compile(RULE)
+    for record in [{"age": 35}, {"age": [1], "department": "Sales", "salary": 1, "experience": 1}]:
+        with pytest.raises(RuleEvaluationError) as compiled_error:
+            compiled(record)
+        with pytest.raises(RuleEvaluationError) as reference_error:
+            RuleEvaluator().evaluate(RULE, record)
+        assert str(compiled_error.value) == str(reference_error.value)
+
+
+def test_malformed_nodes_fail_at_evaluation_time():
+    node = ASTNode(type=NodeType.OPERATOR, operator=Operator.GT,
+                   left=comparison("age", Operator.GT, 1), right=comparison("age", Operator.LT, 5))
+    compiled = RuleCompiler().compile(node)
+    with pytest.raises(RuleEvaluationError, match="Unknown operator"):
+        compiled({"age": 3})
+
+
+def test_short_circuit_skips_undecided_branch():
+    node = operator(Operator.AND, comparison("age", Operator.GT, 30), comparison("salary", Operator.GT, 1))
+    compiled = RuleCompiler().compile(node)
+    assert compiled.cross_check({"age": 20}) is False
+    with pytest.raises(RuleEvaluationError, match="salary"):
+        compiled.cross_check({"age": 40})
@@ -0,0 +1,77 @@
+# test/test_rule_index.py
+import itertools
+from src.models.ast_node import Operator
+from src.services.rule_compiler import RuleCompiler
+from src.services.rule_index import RuleMatchIndex
+from data import RECORDS, RULE, comparison, operator
+
+RULES = {
+    "combined": RULE,
+    "sales": comparison("department", Operator.EQ, "Sales"),
+    "senior": operator(Operator.AND, comparison("age", Operator.GTE, 30), comparison("experience", Operator.GT, 4)),
+    "band": operator(Operator.OR, comparison("salary", Operator.LT, 45000), comparison("salary", Operator.GTE, 60000)),
+    "spend": comparison("spend", Operator.GT, 100),
+}
+
+
+def expected_matches(record):
+    matches = []
+    for rule_id, ast in RULES.items():
+        try:
+            if RuleCompiler().compile(ast)(record):
+                matches.append(rule_id)
+        except Exception:
+            pass
+    return sorted(matches)
+
+
+def test_index_matches_direct_evaluation():
+    index = RuleMatchIndex(RULES)
+    assert index.indexed_rule_count == len(RULES)
+    for record in RECORDS:
+        assert index.match(record) == expected_matches(record)
+
+
+def test_rules_over_dnf_limit_fall_back():
+    wide = RULE
+    for field, value in itertools.product(["age", "salary"], [1, 2, 3]):
+        wide = operator(Operator.AND, wide, operator(Operator.OR, comparison(field, Operator.GT, value),
+                                                      comparison(field, Operator.LT, -value)))
+    index = RuleMatchIndex({"wide": wide}, max_terms=8)
+    assert index.fallback_rule_count == 1
+    for record in RECORDS:
+        assert (index.match(record) == ["wide"]) == RuleCompiler().compile(wide)(record)
+
+
+def test_nan_matches_nothing():
+    nan = float("nan")
+    rules = dict(RULES, at_least=comparison("age", Operator.GTE, 30), at_most=comparison("age", Operator.LTE, 30),
+                 never=comparison("age", Operator.LT, nan))
+    index = RuleMatchIndex(rules)
+    for record in ({"age": nan, "department": "Sales"}, {"age": 20, "department": "IT", "spend": nan}):
+        direct = []
+        for rule_id, ast in rules.items():
+            try:
+                if RuleCompiler().compile(ast)(record):
+                    direct.append(rule_id)
+            except Exception:
+                pass
+        assert index.match(record) == sorted(direct)
+
+
+def test_fallback_rules_match_like_indexed_rules():
+    rules = dict(RULES, either=operator(Operator.OR, comparison("age", Operator.GT, 30),
+                                        comparison("department", Operator.EQ, "Sales")))
+    indexed = RuleMatchIndex(rules)
+    fallback = RuleMatchIndex(rules, max_terms=0)
+    # Every rule but the single comparisons falls back
+    assert fallback.fallback_rule_count == len(rules) - 2
+    records = RECORDS + [
+        {"department": "Sales"},
+        {"age": "x", "department": "Sales", "experience": 5},
+        {"age": [40], "salary": None, "department": "Marketing"},
+        {"age": 35, "experience": "five", "salary": 30000},
+    ]
+    for record in records:
+        assert fallback.match(record) == indexed.match(record)
+    assert "either" in fallback.match({"department": "Sales"})
@@ -0,0 +1,141 @@
+# test/test_rule_optimizer.py
+import random
+import pytest
+from src.models.ast_node import NodeType, Operator
+from src.models.compact_node import CompactNode
+from src.models.node_interner import NodeInterner
+from src.services.batch_evaluator import BatchEvaluator
+from src.services.rule_combiner import RuleCombiner
+from src.services.rule_compiler import RuleCompiler
+from src.services.rule_evaluator import RuleEvaluator
+from src.services.rule_optimizer import RuleOptimizer, count_nodes
+from src.services.rule_set_evaluator import RuleSetEvaluator
+from data import RULE, RECORDS, comparison, operator
+
+COMPARISONS = [Operator.GT, Operator.GTE, Operator.LT, Operator.LTE, Operator.EQ]
+
+
+def outcome(node, record):
+    try:
+        return RuleEvaluator().evaluate(node, record)
+    except Exception:
+        return "error"
+
+
+def chain(op, *clauses):
+    return RuleCombiner()._combine_with_operator(list(clauses), op)
+
+
+@pytest.mark.parametrize("rule, expected", [
+    (chain(Operator.AND, comparison("age", Operator.GT, 30), comparison("age", Operator.GT, 40)),
+     comparison("age", Operator.GT, 40)),
+    (chain(Operator.OR, comparison("salary", Operator.GTE, 50000), comparison("salary", Operator.GT, 60000)),
+     comparison("salary", Operator.GTE, 50000)),
+    (chain(Operator.AND, comparison("age", Operator.GTE, 30), comparison("age", Operator.LTE, 30)),
+     comparison("age", Operator.EQ, 30)),
+    (chain(Operator.OR, comparison("age", Operator.GT, 30), comparison("age", Operator.EQ, 30),
+           comparison("age", Operator.GT, 40)),
+     comparison("age", Operator.GTE, 30)),
+    (chain(Operator.AND, comparison("age", Operator.GT, 20), comparison("department", Operator.EQ, "Sales"),
+           comparison("age", Operator.LT, 40), comparison("age", Operator.LT, 50)),
+     chain(Operator.AND, chain(Operator.AND, comparison("age", Operator.GT, 20), comparison("age", Operator.LT, 40)),
+           comparison("department", Operator.EQ, "Sales"))),
+])
+def test_merges_ranges(rule, expected):
+    optimized, report = RuleOptimizer().optimize(rule)
+    assert optimized == expected
+    assert report.nodes_removed == count_nodes(rule) - count_nodes(expected)
+
+
+def test_contradiction_folds_to_false():
+    rule = chain(Operator.OR,
+                 chain(Operator.AND, comparison("age", Operator.LT, 20), comparison("age", Operator.GT, 50)),
+                 comparison("department", Operator.EQ, "Sales"))
+    optimized, report = RuleOptimizer().optimize(rule)
+    assert optimized == comparison("department", Operator.EQ, "Sales")
+    assert report.contradictions == ["age < 20 AND age > 50 is never true"]
+    assert report.constant is None
+
+    optimized, report = RuleOptimizer().optimize(
+        chain(Operator.AND, comparison("department", Operator.EQ, "Sales"), rule.left)
+    )
+    assert optimized.type == NodeType.OPERAND and report.constant is False
+
+
+def test_constant_nodes_evaluate_everywhere():
+    folded, _ = RuleOptimizer().optimize(
+        chain(Operator.AND, comparison("age", Operator.LT, 20), comparison("age", Operator.GT, 50))
+    )
+    rule = chain(Operator.OR, folded, comparison("age", Operator.GT, 30))
+    expected = [RuleEvaluator().evaluate(rule, record) for record in RECORDS]
+    assert expected == [record["age"] > 30 for record in RECORDS]
+    assert [RuleCompiler().compile(rule)(record) for record in RECORDS] == expected
+    assert BatchEvaluator().evaluate_records(rule, RECORDS).tolist() == expected
+    prepared = RuleSetEvaluator().prepare({"rule": rule})
+    assert [prepared.evaluate(record)[0]["rule"] for record in RECORDS] == expected
+
+
+def test_tautologies():
+    strings = chain(Operator.OR, comparison("department", Operator.GTE, "M"),
+                    comparison("department", Operator.LT, "M"))
+    optimized, report = RuleOptimizer().optimize(chain(Operator.AND, strings, comparison("age", Operator.GT, 30)))
+    assert optimized == comparison("age", Operator.GT, 30)
+    assert report.tautologies == ["department >= 'M' OR department < 'M' is always true"]
+
+    # Numeric ranges covering every number stay comparisons, which are false for NaN
+    numbers = chain(Operator.OR, comparison("age", Operator.GT, 30), comparison("age", Operator.LTE, 30))
+    optimized, report = RuleOptimizer().optimize(numbers)
+    assert report.tautologies and report.constant is None
+    assert outcome(optimized, {"age": float("nan")}) is False
+
+
+def test_keeps_node_class_and_interning():
+    rule = CompactNode.from_ast(chain(Operator.AND, comparison("age", Operator.GT, 30),
+                                      comparison("age", Operator.GT, 40)))
+    optimized, _ = RuleOptimizer().optimize(rule)
+    assert isinstance(optimized, CompactNode)
+
+    interner = NodeInterner()
+    optimized, _ = RuleOptimizer(RuleCombiner(interner)).optimize(rule)
+    assert optimized is interner.intern(comparison("age", Operator.GT, 40))
+
+
+def test_sample_rule_is_unchanged_in_meaning():
+    optimized, report = RuleOptimizer().optimize(RULE)
+    assert report.nodes_removed == 0
+    for record in RECORDS:
+        assert outcome(optimized, record) == outcome(RULE, record)
+
+
+def random_rule(rng, depth):
+    if depth == 0 or rng.random() < 0.3:
+        field = rng.choice(["a", "b", "c"])
+        if rng.random() < 0.2:
+            value = rng.choice(["x", "y", "z"])
+        else:
+            value = rng.choice([0, 1, 2, 3, 2.5])
+        return comparison(field, rng.choice(COMPARISONS), value)
+    return operator(rng.choice([Operator.AND, Operator.OR]),
+                    random_rule(rng, depth - 1), random_rule(rng, depth - 1))
+
+
+def random_record(rng):
+    record = {}
+    for field in ("a", "b", "c"):
+        if rng.random() < 0.9:
+            record[field] = rng.choice([-1, 0, 1, 1.5, 2, 2.5, 3, 4, "x", "y", float("nan"), None])
+    return record
+
+
+def test_equivalent_wherever_the_original_evaluates():
+    rng = random.Random(17)
+    optimizer = RuleOptimizer()
+    for _ in range(400):
+        rule = random_rule(rng, 4)
+        optimized, report = optimizer.optimize(rule)
+        assert report.nodes_after <= report.nodes_before
+        for _ in range(25):
+            record = random_record(rng)
+            expected = outcome(rule, record)
+            if expected != "error":
+                assert outcome(optimized, record) == expected, (rule, optimized, record)
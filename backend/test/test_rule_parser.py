@@ -0,0 +1,43 @@
+# test/test_rule_parser.py
+import re
+import pytest
+from src.models.ast_node import Operator
+from src.services.rule_parser import RuleParser
+from src.utils.exceptions import RuleParsingError
+from data import RULE, comparison, operator
+
+
+def test_parses_nested_rule():
+    rule = ("((age > 30 AND department = 'Sales') OR (age < 25 AND department = 'Marketing')) "
+            "AND (salary >= 50000 OR experience <= 5)")
+    assert RuleParser().parse(rule) == RULE
+
+
+def test_and_binds_tighter_than_or():
+    expected = operator(
+        Operator.OR,
+        comparison("a", Operator.EQ, 1),
+        operator(Operator.AND, comparison("b", Operator.GT, 2.5), comparison("c", Operator.LT, "x y")),
+    )
+    assert RuleParser().parse("a = 1 OR b > 2.5 AND c < \"x y\"") == expected
+
+
+def test_deep_nesting_does_not_recurse():
+    depth = 5000
+    ast = RuleParser().parse("(" * depth + "age > 30" + ")" * depth)
+    assert ast == comparison("age", Operator.GT, 30)
+
+
+@pytest.mark.parametrize("rule, message, position", [
+    ("", "Empty expression", 0),
+    ("age >", "unexpected end of rule", 5),
+    ("(age > 30", "'(' at position 0 is never closed", 0),
+    ("age > 30)", "Unmatched ')' at position 8", 8),
+    ("age > 'Sales", "Unterminated string literal at position 6", 6),
+    ("age != 30", "Unsupported comparison operator '!='", 4),
+    ("age > 30 age < 40", "Expected AND, OR or ')'", 9),
+])
+def test_errors_report_position(rule, message, position):
+    with pytest.raises(RuleParsingError, match=re.escape(message)) as error:
+        RuleParser().parse(rule)
+    assert error.value.position == position
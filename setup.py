@@ -17,7 +17,13 @@ setup(
     author='Awnish Ranjan',
     author_email='ranjanawnish07@gmail.com',
     install_requires=get_requirements('requirements.txt'),
-    packages=find_packages()
+    package_dir={'': 'backend'},
+    packages=find_packages('backend'),
+    entry_points={
+        'console_scripts': [
+            'rule-engine-eval=src.cli:main',
+        ],
+    }
 
 )
 